@@ -0,0 +1,409 @@
+"""
+PROGRAMACIÓN AUTOMÁTICA
+Asignación en lote de pedidos de cita a los huecos libres
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Optional, Iterator, Iterable, Callable, Tuple, NamedTuple
+import heapq
+import json
+import os
+import time
+
+from entidades import Cita, Doctor, Paciente
+from fechas import (DURACION_CITA_MINUTOS, MINUTOS_POR_DIA, convertir_a_minutos,
+                    convertir_desde_minutos, minutos_actuales)
+from identificadores import GestorIDs
+from importacion import ImportadorMasivo
+from sistema import SistemaCitasMedicas
+
+
+class PedidoCita(NamedTuple):
+    """Pedido de cita para asignar en lote dentro de una ventana preferida"""
+    id: str
+    paciente_id: str
+    especialidad: str
+    desde: int          # minutos desde EPOCA, ventana [desde, hasta)
+    hasta: int
+    hora_desde: int     # franja horaria aceptada cada día, en minutos del día
+    hora_hasta: int
+    urgencia: int       # mayor es más urgente
+    motivo: str
+
+
+class Asignacion(NamedTuple):
+    pedido: PedidoCita
+    doctor: Doctor
+    inicio: int
+
+
+def json_asignacion(asignacion: Asignacion) -> dict:
+    fecha, hora = convertir_desde_minutos(asignacion.inicio)
+    return {"pedido_id": asignacion.pedido.id, "paciente_id": asignacion.pedido.paciente_id,
+            "doctor_id": asignacion.doctor.id, "fecha": fecha, "hora": hora}
+
+
+def json_pedido(pedido: PedidoCita) -> dict:
+    datos = pedido._asdict()
+    datos["desde"] = convertir_desde_minutos(pedido.desde)[0]
+    datos["hasta"] = convertir_desde_minutos(pedido.hasta - 1)[0]
+    datos["hora_desde"] = f"{pedido.hora_desde // 60:02d}:{pedido.hora_desde % 60:02d}"
+    datos["hora_hasta"] = f"{pedido.hora_hasta // 60:02d}:{pedido.hora_hasta % 60:02d}"
+    return datos
+
+
+class ResultadoAsignacion(NamedTuple):
+    asignadas: List[Asignacion]
+    sin_asignar: List[Tuple[PedidoCita, str]]   # (pedido, motivo)
+    utilizacion: Dict[str, dict]                # por especialidad
+    segundos: float
+    
+    def resumen(self) -> List[str]:
+        lineas = [f"{'Especialidad':<24} {'Pedidos':>8} {'Asignadas':>10} {'Huecos':>8} {'Uso':>7}"]
+        for especialidad, datos in self.utilizacion.items():
+            lineas.append(f"{especialidad:<24} {datos['pedidos']:>8} {datos['asignadas']:>10} "
+                          f"{datos['huecos_libres']:>8} {datos['utilizacion']:>7.1%}")
+        motivos = Counter(motivo for _, motivo in self.sin_asignar)
+        lineas.append(f"{len(self.asignadas)} asignadas, {len(self.sin_asignar)} sin asignar "
+                      f"en {self.segundos:.2f} s")
+        lineas.extend(f"   {cantidad} {motivo}" for motivo, cantidad in motivos.most_common())
+        return lineas
+    
+    def guardar(self, ruta: str):
+        """Guarda en JSON las asignaciones, los pedidos sin asignar y la utilización"""
+        with open(ruta, "w", encoding="utf-8") as archivo:
+            json.dump({"segundos": round(self.segundos, 3),
+                       "utilizacion": self.utilizacion,
+                       "asignadas": [json_asignacion(a) for a in self.asignadas],
+                       "sin_asignar": [{**json_pedido(pedido), "razon": motivo}
+                                       for pedido, motivo in self.sin_asignar]},
+                      archivo, ensure_ascii=False)
+
+
+def _asignar_especialidad(particion: tuple) -> Tuple[List[Tuple[int, int]], List[Tuple[int, str]]]:
+    """Asigna los pedidos de una especialidad a los huecos libres de sus doctores
+    
+    Corre en los procesos del pool, así que solo recibe datos planos: los
+    huecos libres ordenados por (inicio, doctor), los pedidos y los
+    intervalos ya ocupados de cada paciente. Retorna (pedido, hueco) por
+    cada asignación y (pedido, motivo) por cada pedido sin asignar.
+    
+    Primero una pasada voraz atiende a los pedidos más urgentes y, entre
+    ellos, a los que tienen menos huecos posibles, dando a cada uno el
+    primer hueco libre de su ventana. Los huecos tomados se saltan con una
+    unión-búsqueda (siguiente libre), sin recorrerlos otra vez. Luego,
+    mientras quede presupuesto y algún hueco libre, cada pedido sin hueco
+    intenta quitarle el suyo a un pedido ya asignado que pueda moverse a
+    otro hueco libre.
+    """
+    inicios, pedidos, ocupados, duracion, limite = particion
+    siguiente = list(range(len(inicios) + 1))
+    ocupante: Dict[int, int] = {}  # hueco -> pedido
+    lugar: Dict[int, int] = {}     # pedido -> hueco
+    
+    def libre_desde(posicion: int) -> int:
+        raiz = posicion
+        while siguiente[raiz] != raiz:
+            raiz = siguiente[raiz]
+        while siguiente[posicion] != raiz:
+            siguiente[posicion], posicion = raiz, siguiente[posicion]
+        return raiz
+    
+    def rangos(pedido: tuple) -> Iterator[Tuple[int, int]]:
+        """Posiciones [primera, última) de los huecos de la ventana, día por día"""
+        _, desde, hasta, hora_desde, hora_hasta, _ = pedido
+        for dia in range(desde // MINUTOS_POR_DIA, (hasta - 1) // MINUTOS_POR_DIA + 1):
+            base = dia * MINUTOS_POR_DIA
+            primera = bisect_left(inicios, max(desde, base + hora_desde))
+            ultima = bisect_right(inicios, min(hasta, base + hora_hasta) - duracion)
+            if primera < ultima:
+                yield primera, ultima
+    
+    ventanas = [list(rangos(pedido)) for pedido in pedidos]
+    
+    def puede(pedido: tuple, inicio: int) -> bool:
+        fin = inicio + duracion
+        return not any(a < fin and inicio < b for a, b in ocupados.get(pedido[0], ()))
+    
+    def buscar(numero: int) -> Optional[int]:
+        pedido = pedidos[numero]
+        for primera, ultima in ventanas[numero]:
+            posicion = libre_desde(primera)
+            while posicion < ultima:
+                if puede(pedido, inicios[posicion]):
+                    return posicion
+                posicion = libre_desde(posicion + 1)
+        return None
+    
+    def ubicar(numero: int, posicion: int):
+        ocupante[posicion] = numero
+        lugar[numero] = posicion
+        ocupados.setdefault(pedidos[numero][0], []).append(
+            (inicios[posicion], inicios[posicion] + duracion))
+    
+    def desubicar(numero: int) -> int:
+        posicion = lugar.pop(numero)
+        ocupados[pedidos[numero][0]].remove((inicios[posicion], inicios[posicion] + duracion))
+        return posicion
+    
+    def reubicar(numero: int) -> bool:
+        """Mueve a otro hueco al ocupante de uno de los huecos del pedido"""
+        pedido = pedidos[numero]
+        intentos = 0
+        for primera, ultima in ventanas[numero]:
+            for posicion in range(primera, ultima):
+                otro = ocupante.get(posicion)
+                if otro is None or not puede(pedido, inicios[posicion]):
+                    continue
+                intentos += 1
+                if intentos > AsignadorCitas.MAX_INTENTOS:
+                    return False
+                desubicar(otro)
+                nuevo = buscar(otro)
+                if nuevo is None:
+                    ubicar(otro, posicion)
+                    continue
+                siguiente[nuevo] = nuevo + 1
+                ubicar(otro, nuevo)
+                ubicar(numero, posicion)
+                return True
+        return False
+    
+    # Los pedidos con menos huecos posibles van antes para no quedarse sin lugar
+    capacidad = [sum(ultima - primera for primera, ultima in ventana) for ventana in ventanas]
+    orden = sorted(range(len(pedidos)),
+                   key=lambda n: (-pedidos[n][5], capacidad[n], pedidos[n][1], n))
+    sin_hueco, agotados = [], []
+    for paso, numero in enumerate(orden):
+        if paso % 64 == 0 and time.time() > limite:
+            agotados = orden[paso:]
+            break
+        posicion = buscar(numero)
+        if posicion is None:
+            sin_hueco.append(numero)
+        else:
+            siguiente[posicion] = posicion + 1
+            ubicar(numero, posicion)
+    sin_hueco = [numero for numero in sin_hueco if len(lugar) == len(inicios)
+                 or time.time() > limite or not reubicar(numero)]
+    
+    return (sorted(lugar.items()),
+            [(numero, "sin huecos libres en la ventana") for numero in sin_hueco]
+            + [(numero, "presupuesto de tiempo agotado") for numero in agotados])
+
+
+class AsignadorCitas:
+    """Asigna en lote muchos pedidos de cita a los huecos libres de los doctores
+    
+    Los pedidos se agrupan por especialidad y cada grupo se resuelve con
+    _asignar_especialidad sobre los huecos que da MotorDisponibilidad (en
+    varios procesos si hay suficientes pedidos). Todo el lote comparte un
+    presupuesto de tiempo: al agotarse, los pedidos que faltan quedan sin
+    asignar con ese motivo. Un paciente con pedidos en varias especialidades
+    podría quedar con dos citas a la vez; al unir los resultados se conserva
+    la del pedido más urgente.
+    """
+    
+    UMBRAL_PARALELO = 2_000
+    MAX_DIAS_VENTANA = 60
+    MAX_INTENTOS = 32  # huecos ocupados a revisar por pedido al intentar reubicar
+    RONDAS = 3         # para volver a planificar los pedidos que chocan entre especialidades
+    
+    def __init__(self, sistema: SistemaCitasMedicas, procesos: Optional[int] = None,
+                 presupuesto: float = 10.0, duracion: int = DURACION_CITA_MINUTOS,
+                 reloj: Callable[[], float] = minutos_actuales):
+        self._sistema = sistema
+        self._procesos = max(1, procesos or os.cpu_count() or 1)
+        self._presupuesto = presupuesto
+        self._duracion = duracion
+        self._reloj = reloj
+    
+    @staticmethod
+    def _hora(texto: str, campo: str) -> int:
+        try:
+            horas, minutos = map(int, texto.split(":"))
+        except ValueError:
+            raise ValueError(f"El campo '{campo}' debe tener el formato HH:MM") from None
+        if not (0 <= minutos < 60 and 0 <= horas * 60 + minutos <= MINUTOS_POR_DIA):
+            raise ValueError(f"El campo '{campo}' no es una hora válida")
+        return horas * 60 + minutos
+    
+    def crear_pedido(self, fila: dict, numero: int) -> PedidoCita:
+        """Convierte una fila en un pedido
+        
+        Columnas: paciente_id, especialidad, desde y hasta (DD/MM/AAAA, ambas
+        incluidas; por defecto una semana), hora_desde y hora_hasta (HH:MM),
+        urgencia y motivo.
+        """
+        texto = ImportadorMasivo._texto
+        desde = convertir_a_minutos(texto(fila, "desde"), "00:00")
+        hasta_texto = texto(fila, "hasta", False)
+        hasta = (convertir_a_minutos(hasta_texto, "00:00") + MINUTOS_POR_DIA if hasta_texto
+                 else desde + 7 * MINUTOS_POR_DIA)
+        if hasta <= desde:
+            raise ValueError("La ventana termina antes de empezar")
+        if hasta - desde > self.MAX_DIAS_VENTANA * MINUTOS_POR_DIA:
+            raise ValueError(f"La ventana no puede superar {self.MAX_DIAS_VENTANA} días")
+        hora_desde = self._hora(texto(fila, "hora_desde", False) or "00:00", "hora_desde")
+        hora_hasta = self._hora(texto(fila, "hora_hasta", False) or "24:00", "hora_hasta")
+        if hora_hasta - hora_desde < self._duracion:
+            raise ValueError("La franja horaria es más corta que una cita")
+        urgencia = texto(fila, "urgencia", False)
+        try:
+            urgencia = int(urgencia) if urgencia else 0
+        except ValueError:
+            raise ValueError("La urgencia debe ser un número entero") from None
+        return PedidoCita(texto(fila, "id", False) or f"L{numero}", texto(fila, "paciente_id"),
+                          texto(fila, "especialidad"), desde, hasta, hora_desde, hora_hasta,
+                          urgencia, texto(fila, "motivo", False) or "Consulta")
+    
+    def leer_pedidos(self, ruta: str) -> Tuple[List[PedidoCita], List[Tuple[int, str]]]:
+        """Lee pedidos de un archivo .csv o .jsonl; retorna (pedidos, [(línea, error)])"""
+        pedidos, errores = [], []
+        for numero, fila in ImportadorMasivo.leer_filas(ruta):
+            if "__error__" in fila:
+                errores.append((numero, fila["__error__"]))
+                continue
+            try:
+                pedidos.append(self.crear_pedido(fila, numero))
+            except ValueError as e:
+                errores.append((numero, str(e)))
+        return pedidos, errores
+    
+    def planificar(self, pedidos: Iterable[PedidoCita]) -> ResultadoAsignacion:
+        """Decide el doctor y el horario de cada pedido sin reservar nada"""
+        inicio = time.perf_counter()
+        limite = time.time() + self._presupuesto
+        ahora = int(self._reloj()) + 1
+        sin_asignar: List[Tuple[PedidoCita, str]] = []
+        grupos: Dict[str, List[PedidoCita]] = {}
+        pacientes: Dict[str, Paciente] = {}
+        for pedido in pedidos:
+            paciente = pacientes.get(pedido.paciente_id) or \
+                self._sistema.buscar_paciente_por_id(pedido.paciente_id)
+            doctores = self._sistema.doctores_de_especialidad(pedido.especialidad)
+            if paciente is None:
+                sin_asignar.append((pedido, "paciente no encontrado"))
+            elif not doctores:
+                sin_asignar.append((pedido, "no hay doctores de la especialidad"))
+            elif pedido.hasta - self._duracion < ahora:
+                sin_asignar.append((pedido, "la ventana ya pasó"))
+            else:
+                # Las distintas grafías de una especialidad comparten los mismos huecos
+                especialidad = doctores[0].especialidad
+                pacientes[pedido.paciente_id] = paciente
+                grupos.setdefault(especialidad, []).append(
+                    pedido._replace(especialidad=especialidad, desde=max(pedido.desde, ahora)))
+        
+        utilizacion = {especialidad: {"pedidos": len(grupo), "doctores": len(
+            self._sistema.doctores_de_especialidad(especialidad))}
+            for especialidad, grupo in sorted(grupos.items())}
+        aceptadas: List[Asignacion] = []
+        horas: Dict[str, List[int]] = {}                # inicios ya asignados a cada paciente
+        tomados: set = set()                            # (doctor_id, inicio) ya asignados
+        for ronda in range(self.RONDAS):
+            especialidades = sorted(grupos)
+            preparados = [self._preparar(grupos[especialidad], pacientes, limite, horas, tomados)
+                          for especialidad in especialidades]
+            if ronda == 0:
+                for especialidad, (huecos, _) in zip(especialidades, preparados):
+                    utilizacion[especialidad]["huecos_libres"] = len(huecos)
+            particiones = [particion for _, particion in preparados]
+            total = sum(len(grupo) for grupo in grupos.values())
+            if self._procesos > 1 and len(particiones) > 1 and total >= self.UMBRAL_PARALELO:
+                with ProcessPoolExecutor(min(self._procesos, len(particiones))) as pool:
+                    resultados = list(pool.map(_asignar_especialidad, particiones))
+            else:
+                resultados = list(map(_asignar_especialidad, particiones))
+            
+            asignadas: List[Asignacion] = []
+            for especialidad, (huecos, _), (lugares, rechazados) in zip(especialidades, preparados,
+                                                                         resultados):
+                grupo = grupos[especialidad]
+                asignadas.extend(Asignacion(grupo[numero], *huecos[posicion])
+                                 for numero, posicion in lugares)
+                sin_asignar.extend((grupo[numero], motivo) for numero, motivo in rechazados)
+            
+            # Un paciente no puede quedar en dos especialidades a la misma hora: se queda
+            # con el pedido más urgente y los demás vuelven a planificarse en otra ronda
+            grupos = {}
+            for asignacion in sorted(asignadas, key=lambda a: -a.pedido.urgencia):
+                propias = horas.setdefault(asignacion.pedido.paciente_id, [])
+                if any(abs(otra - asignacion.inicio) < self._duracion for otra in propias):
+                    grupos.setdefault(asignacion.pedido.especialidad, []).append(asignacion.pedido)
+                    continue
+                propias.append(asignacion.inicio)
+                tomados.add((asignacion.doctor.id, asignacion.inicio))
+                aceptadas.append(asignacion)
+            if not grupos or time.time() > limite:
+                break
+        sin_asignar.extend((pedido, "el paciente ya tiene otra cita a esa hora")
+                           for grupo in grupos.values() for pedido in grupo)
+        
+        por_especialidad = Counter(asignacion.pedido.especialidad for asignacion in aceptadas)
+        for especialidad, datos in utilizacion.items():
+            datos["asignadas"] = por_especialidad[especialidad]
+            self._calcular_uso(datos)
+        aceptadas.sort(key=lambda a: (a.inicio, a.doctor.id))
+        return ResultadoAsignacion(aceptadas, sin_asignar, utilizacion, time.perf_counter() - inicio)
+    
+    @staticmethod
+    def _calcular_uso(datos: dict):
+        datos["utilizacion"] = round(datos["asignadas"] / datos["huecos_libres"], 4) \
+            if datos["huecos_libres"] else 0.0
+    
+    def _preparar(self, grupo: List[PedidoCita], pacientes: Dict[str, Paciente], limite: float,
+                  horas: Dict[str, List[int]], tomados: set) -> Tuple[List[Tuple[Doctor, int]], tuple]:
+        """Arma la partición plana de una especialidad y la tabla de sus huecos
+        
+        Los huecos y horas ya asignados en rondas anteriores (horas, tomados)
+        cuentan como ocupados.
+        """
+        desde = min(pedido.desde for pedido in grupo)
+        hasta = max(pedido.hasta for pedido in grupo)
+        disponibilidad = self._sistema.disponibilidad
+        huecos = [(inicio, doctor) for inicio, doctor in heapq.merge(
+            *(disponibilidad.iterar_huecos(doctor, desde, hasta, self._duracion)
+              for doctor in self._sistema.doctores_de_especialidad(grupo[0].especialidad)),
+            key=lambda hueco: hueco[0]) if (doctor.id, inicio) not in tomados]
+        ocupados: Dict[str, List[Tuple[int, int]]] = {}
+        for pedido in grupo:
+            if pedido.paciente_id not in ocupados:
+                ocupados[pedido.paciente_id] = [
+                    (cita.inicio, cita.fin) for cita in pacientes[pedido.paciente_id].obtener_citas_activas()
+                    if cita.fin > desde and cita.inicio < hasta
+                ] + [(otra, otra + self._duracion) for otra in horas.get(pedido.paciente_id, ())]
+        planos = [(pedido.paciente_id, pedido.desde, pedido.hasta, pedido.hora_desde,
+                   pedido.hora_hasta, pedido.urgencia) for pedido in grupo]
+        return ([(doctor, inicio) for inicio, doctor in huecos],
+                (array("q", [inicio for inicio, _ in huecos]), planos, ocupados, self._duracion, limite))
+    
+    def aplicar(self, resultado: ResultadoAsignacion) -> List[Cita]:
+        """Reserva las citas planificadas en un solo lote
+        
+        Si un horario se ocupó después de planificar, su pedido pasa a
+        sin_asignar.
+        """
+        if not resultado.asignadas:
+            return []
+        ids = GestorIDs.reservar_bloque("cita", len(resultado.asignadas))
+        citas, fallidas = [], []
+        for asignacion in resultado.asignadas:
+            paciente = self._sistema.buscar_paciente_por_id(asignacion.pedido.paciente_id)
+            fecha, hora = convertir_desde_minutos(asignacion.inicio)
+            try:
+                citas.append(Cita(ids.siguiente(), paciente, asignacion.doctor, fecha, hora,
+                                  asignacion.pedido.motivo, duracion=self._duracion))
+            except ValueError as e:
+                fallidas.append(asignacion)
+                resultado.sin_asignar.append((asignacion.pedido, str(e)))
+        for asignacion in fallidas:
+            resultado.asignadas.remove(asignacion)
+            datos = resultado.utilizacion[asignacion.pedido.especialidad]
+            datos["asignadas"] -= 1
+            self._calcular_uso(datos)
+        self._sistema.cargar_lote(citas=citas)
+        return citas
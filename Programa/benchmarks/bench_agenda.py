@@ -0,0 +1,75 @@
+"""
+BENCHMARK DE LA AGENDA DIARIA
+Mide la agenda del día de una clínica de 200 doctores con 60 días de citas
+(16 por doctor y día) usando el índice temporal, frente a recorrer todas las citas
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from entidades import Cita, Doctor, Paciente
+from fechas import MINUTOS_POR_DIA, convertir_a_minutos, convertir_desde_minutos
+from sistema import SistemaCitasMedicas
+
+DOCTORES = 200
+DIAS = 60
+CITAS_POR_DIA = 16
+REPETICIONES = 100
+OBJETIVO_MS = 10
+
+
+def preparar() -> tuple:
+    """Crea el sistema con las citas de todos los doctores"""
+    sistema = SistemaCitasMedicas(datos_ejemplo=False)
+    pacientes = [Paciente(f"AP{i:05d}", f"Paciente {i}", "555-0000", 40) for i in range(2000)]
+    doctores = [Doctor(f"AD{i:04d}", f"Doctor {i}", "555-1111", "General") for i in range(DOCTORES)]
+    desde = convertir_a_minutos("06/01/2025", "00:00")  # Lunes
+    citas, numero = [], 0
+    for dia in range(DIAS):
+        base = desde + dia * MINUTOS_POR_DIA + 9 * 60
+        for doctor in doctores:
+            for slot in range(CITAS_POR_DIA):
+                fecha, hora = convertir_desde_minutos(base + slot * 30)
+                numero += 1
+                citas.append(Cita(f"AC{numero:08d}", pacientes[numero % len(pacientes)],
+                                  doctor, fecha, hora, "Control"))
+    sistema.cargar_lote(pacientes, doctores, citas)
+    return sistema, desde
+
+
+def medir_ms(funcion) -> float:
+    inicio = time.perf_counter()
+    for _ in range(REPETICIONES):
+        funcion()
+    return (time.perf_counter() - inicio) * 1000 / REPETICIONES
+
+
+def main():
+    inicio = time.perf_counter()
+    sistema, desde = preparar()
+    print(f"Preparación: {len(sistema.citas):,} citas en {time.perf_counter() - inicio:.1f} s")
+    fecha, _ = convertir_desde_minutos(desde + 30 * MINUTOS_POR_DIA)
+
+    agenda = sistema.agenda_del_dia(fecha)
+    indice = medir_ms(lambda: sistema.agenda_del_dia(fecha))
+    doctor = medir_ms(lambda: sistema.agenda_doctor("AD0100", fecha))
+    rango = medir_ms(lambda: sum(1 for _ in sistema.citas_entre(fecha, fecha)))
+
+    inicio = time.perf_counter()
+    recorrido = sorted((c for c in sistema.citas if c.fecha == fecha and c.estado == "Programada"),
+                       key=lambda c: c.inicio)
+    lineal = (time.perf_counter() - inicio) * 1000
+    assert [c.id for c in recorrido] == [c.id for c in agenda]
+
+    print(f"Agenda del {fecha}: {len(agenda):,} citas")
+    print(f"{'Índice temporal (clínica)':<32} {indice:>8.2f} ms  (objetivo < {OBJETIVO_MS} ms)")
+    print(f"{'Índice temporal (un doctor)':<32} {doctor:>8.3f} ms")
+    print(f"{'Rango de un día (citas_entre)':<32} {rango:>8.2f} ms")
+    print(f"{'Recorrido completo':<32} {lineal:>8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
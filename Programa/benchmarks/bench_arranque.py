@@ -0,0 +1,70 @@
+"""
+BENCHMARK DE ARRANQUE EN FRÍO
+Mide en procesos nuevos cuánto tarda importar main y construir el sistema,
+descontando el arranque del intérprete. Termina con código 1 si se supera el objetivo.
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+PROGRAMA = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROGRAMA)
+
+REPETICIONES = 15
+OBJETIVO_MS = 60  # importar main + SistemaCitasMedicas() por encima del intérprete
+
+
+def medir_ms(codigo: str) -> float:
+    """Mediana del tiempo total de un proceso que ejecuta el código"""
+    tiempos = []
+    for _ in range(REPETICIONES):
+        inicio = time.perf_counter()
+        subprocess.run([sys.executable, "-c", codigo], cwd=PROGRAMA, check=True)
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tiempos)
+
+
+def preparar_bd(ruta: str) -> str:
+    """Crea una base SQLite con una población mínima y retorna el ID de una cita"""
+    from generador import ESCALAS, GeneradorDatos
+    from persistencia_sqlite import RepositorioSQLite
+    from sistema import SistemaCitasMedicas
+    sistema = GeneradorDatos().poblar(SistemaCitasMedicas(RepositorioSQLite(ruta)),
+                                      *ESCALAS["pequena"])
+    cita_id = sistema.citas[len(sistema.citas) // 2].id
+    sistema.cerrar()
+    return cita_id
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "citas.db")
+        cita_id = preparar_bd(ruta)
+        base = medir_ms("pass")
+        escenarios = [
+            ("import main", "import main"),
+            ("SistemaCitasMedicas()", "import main; main.SistemaCitasMedicas()"),
+            ("Con datos de ejemplo", "import main; main.SistemaCitasMedicas(datos_ejemplo=True)"),
+            ("SQLite (100.000 citas) + 1 búsqueda",
+             "import main; from persistencia_sqlite import RepositorioSQLite; "
+             f"s = main.SistemaCitasMedicas(RepositorioSQLite({ruta!r})); "
+             f"s.buscar_cita_por_id({cita_id!r})"),
+        ]
+        print(f"Intérprete sin código: {base:.1f} ms (se descuenta)")
+        resultados = {}
+        for nombre, codigo in escenarios:
+            resultados[nombre] = medir_ms(codigo) - base
+            print(f"{nombre:<38} {resultados[nombre]:>8.1f} ms")
+
+    arranque = resultados["SistemaCitasMedicas()"]
+    print(f"\nObjetivo: {OBJETIVO_MS} ms -> {'OK' if arranque <= OBJETIVO_MS else 'SUPERADO'}")
+    if arranque > OBJETIVO_MS:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
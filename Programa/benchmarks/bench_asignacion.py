@@ -0,0 +1,123 @@
+"""
+BENCHMARK DE ASIGNACIÓN EN LOTE
+Genera una semana de pedidos de cita (paciente, especialidad, ventana de días
+y franja horaria, urgencia) sobre una población sintética y compara:
+- Reservar uno por uno en orden de llegada el primer hueco libre de la
+  ventana, como haría la recepción con cada pedido
+- AsignadorCitas en un proceso y en varios (uno por núcleo)
+Mide pedidos asignados (y cuántos de los urgentes), utilización y tiempo
+"""
+
+import argparse
+import heapq
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from generador import ESCALAS, GeneradorDatos
+from asignacion import AsignadorCitas, PedidoCita
+from entidades import Cita
+from fechas import MINUTOS_POR_DIA, convertir_desde_minutos
+from identificadores import GestorIDs
+from sistema import SistemaCitasMedicas
+
+FRANJAS = ((0, MINUTOS_POR_DIA), (8 * 60, 12 * 60), (13 * 60, 20 * 60))
+
+
+def preparar(escala: tuple, semilla: int) -> SistemaCitasMedicas:
+    sistema = SistemaCitasMedicas()
+    GeneradorDatos(semilla).poblar(sistema, *escala)
+    return sistema
+
+
+def generar_pedidos(sistema: SistemaCitasMedicas, ahora: int, cantidad: int, semilla: int) -> list:
+    """Pedidos de la próxima semana con ventanas de 1 a 7 días
+
+    Cada población nueva reserva otros ids, así que los pedidos se generan de
+    nuevo (con la misma semilla) para cada sistema.
+    """
+    rng = random.Random(semilla)
+    especialidades = list(sistema.especialidades())
+    pesos = [len(sistema.doctores_de_especialidad(especialidad)) for especialidad in especialidades]
+    pacientes = sistema.pacientes
+    hoy = ahora // MINUTOS_POR_DIA + 1
+    pedidos = []
+    for numero in range(cantidad):
+        desde = (hoy + rng.randrange(7)) * MINUTOS_POR_DIA
+        hora_desde, hora_hasta = rng.choice(FRANJAS)
+        pedidos.append(PedidoCita(f"L{numero}", rng.choice(pacientes).id,
+                                  rng.choices(especialidades, pesos)[0], desde,
+                                  desde + rng.randint(1, 7) * MINUTOS_POR_DIA, hora_desde, hora_hasta,
+                                  rng.choice((0, 0, 0, 1, 2)), "Consulta"))
+    return pedidos
+
+
+def uno_por_uno(sistema: SistemaCitasMedicas, pedidos: list) -> list:
+    """Reserva cada pedido en orden de llegada en el primer hueco válido"""
+    disponibilidad = sistema.disponibilidad
+    ids = GestorIDs.reservar_bloque("cita", len(pedidos))
+    asignados = []
+    for pedido in pedidos:
+        paciente = sistema.buscar_paciente_por_id(pedido.paciente_id)
+        ocupados = [(cita.inicio, cita.fin) for cita in paciente.obtener_citas_activas()]
+        flujos = [disponibilidad.iterar_huecos(doctor, pedido.desde, pedido.hasta)
+                  for doctor in sistema.doctores_de_especialidad(pedido.especialidad)]
+        for inicio, doctor in heapq.merge(*flujos, key=lambda hueco: hueco[0]):
+            if not pedido.hora_desde <= inicio % MINUTOS_POR_DIA <= pedido.hora_hasta - 30:
+                continue
+            if any(a < inicio + 30 and inicio < b for a, b in ocupados):
+                continue
+            fecha, hora = convertir_desde_minutos(inicio)
+            sistema.agregar_cita(Cita(ids.siguiente(), paciente, doctor, fecha, hora, pedido.motivo))
+            asignados.append(pedido)
+            break
+    return asignados
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--escala", choices=ESCALAS, default="pequena")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--pedidos", type=int, default=20_000)
+    parser.add_argument("--presupuesto", type=float, default=30.0, metavar="SEGUNDOS")
+    argumentos = parser.parse_args()
+    escala = ESCALAS[argumentos.escala]
+
+    sistema = preparar(escala, argumentos.semilla)
+    # El "presente" simulado queda al inicio del periodo de las citas
+    ahora = min(cita.inicio for cita in sistema.obtener_citas_activas()) - 1
+    pedidos = generar_pedidos(sistema, ahora, argumentos.pedidos, argumentos.semilla)
+    urgentes = sum(1 for pedido in pedidos if pedido.urgencia)
+    print(f"Pedidos: {len(pedidos):,} ({urgentes:,} urgentes) para {escala[0]:,} doctores")
+    print(f"{'Método':<26} {'Asignados':>10} {'Urgentes':>10} {'Uso':>7} {'Segundos':>9}")
+
+    inicio = time.perf_counter()
+    asignados = uno_por_uno(sistema, pedidos)
+    segundos = time.perf_counter() - inicio
+    print(f"{'uno por uno':<26} {len(asignados):>10,} "
+          f"{sum(1 for pedido in asignados if pedido.urgencia):>10,} {'':>7} {segundos:>9.2f}")
+
+    procesos = sorted({1, os.cpu_count() or 1})
+    for cantidad in procesos:
+        sistema = preparar(escala, argumentos.semilla)
+        pedidos = generar_pedidos(sistema, ahora, argumentos.pedidos, argumentos.semilla)
+        asignador = AsignadorCitas(sistema, cantidad, argumentos.presupuesto, reloj=lambda: ahora)
+        inicio = time.perf_counter()
+        resultado = asignador.planificar(pedidos)
+        planificado = time.perf_counter() - inicio
+        asignador.aplicar(resultado)
+        segundos = time.perf_counter() - inicio
+        huecos = sum(datos["huecos_libres"] for datos in resultado.utilizacion.values())
+        print(f"{f'AsignadorCitas ({cantidad} proc.)':<26} {len(resultado.asignadas):>10,} "
+              f"{sum(1 for a in resultado.asignadas if a.pedido.urgencia):>10,} "
+              f"{len(resultado.asignadas) / max(huecos, 1):>7.1%} {segundos:>9.2f}"
+              f"   (planificar {planificado:.2f} s)")
+    print()
+    print("\n".join(resultado.resumen()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+BENCHMARK DE LA BÚSQUEDA DE PACIENTES
+Mide el tiempo por consulta del índice de pacientes sobre 1.000.000 de registros
+con nombres, teléfonos y emails sintéticos
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from entidades import Paciente
+from sistema import SistemaCitasMedicas
+
+PACIENTES = 1_000_000
+REPETICIONES = 200
+NOMBRES = ["Ana", "Carlos", "José", "María", "Lucía", "Pedro", "Sofía", "Andrés", "Valentina",
+           "Mateo", "Camila", "Diego", "Isabel", "Julián", "Mónica", "Tomás", "Elena", "Raúl"]
+APELLIDOS = ["García", "López", "Martínez", "Rodríguez", "Pérez", "Gómez", "Sánchez", "Díaz",
+             "Fernández", "Ramírez", "Torres", "Flores", "Rivera", "Castillo", "Ortiz", "Núñez"]
+
+
+def preparar() -> SistemaCitasMedicas:
+    """Crea pacientes con nombre, dos apellidos y un apellido poco común"""
+    rng = random.Random(7)
+    sistema = SistemaCitasMedicas(datos_ejemplo=False)
+    pacientes = []
+    for i in range(PACIENTES):
+        nombre = (f"{rng.choice(NOMBRES)} {rng.choice(APELLIDOS)} {rng.choice(APELLIDOS)} "
+                  f"Apellido{i % 50_000}")
+        pacientes.append(Paciente(f"BP{i:07d}", nombre, f"555-{i:07d}", 30,
+                                  email=f"paciente{i}@correo.com"))
+    sistema.cargar_lote(pacientes)
+    return sistema
+
+
+def medir_ms(sistema: SistemaCitasMedicas, consulta: str) -> float:
+    sistema.buscar_pacientes(consulta)
+    inicio = time.perf_counter()
+    for _ in range(REPETICIONES):
+        sistema.buscar_pacientes(consulta)
+    return (time.perf_counter() - inicio) * 1000 / REPETICIONES
+
+
+def main():
+    inicio = time.perf_counter()
+    sistema = preparar()
+    print(f"Preparación: {len(sistema.pacientes):,} pacientes en {time.perf_counter() - inicio:.1f} s")
+    consultas = [
+        ("Teléfono exacto", "555-0777777"),
+        ("Email exacto", "paciente424242@correo.com"),
+        ("Palabra poco común", "apellido31337"),
+        ("Prefijo + acento", "garcía apellido3133"),
+        ("Con error de tipeo", "apelido31337"),
+        ("Nombre completo", "Sofia Nunez Apellido31337"),
+        ("Palabra muy común", "garcia"),
+    ]
+    print(f"{'Consulta':<22} {'ms/consulta':>12}  resultados")
+    for nombre, consulta in consultas:
+        resultados = sistema.buscar_pacientes(consulta)
+        print(f"{nombre:<22} {medir_ms(sistema, consulta):>12.3f}  {len(resultados)}")
+
+
+if __name__ == "__main__":
+    main()
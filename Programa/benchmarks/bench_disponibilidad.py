@@ -0,0 +1,80 @@
+"""
+BENCHMARK DEL MOTOR DE DISPONIBILIDAD
+Mide la consulta "próximo especialista disponible" sobre 500 doctores y 90 días,
+con los primeros días de la agenda casi completos
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from entidades import Cita, Doctor, Paciente
+from fechas import MINUTOS_POR_DIA, convertir_a_minutos, convertir_desde_minutos
+from sistema import SistemaCitasMedicas
+
+DOCTORES = 500
+DIAS = 90
+DIAS_LLENOS = 5
+REPETICIONES = 50
+
+
+def preparar() -> tuple:
+    """Crea el sistema con 500 electrofisiólogos y sus primeros días reservados"""
+    rng = random.Random(42)
+    sistema = SistemaCitasMedicas()
+    paciente = Paciente("BP0001", "Paciente Benchmark", "555-0000", 40)
+    sistema.agregar_paciente(paciente)
+    desde = convertir_a_minutos("06/01/2025", "00:00")  # Lunes
+
+    numero = 0
+    for i in range(DOCTORES):
+        doctor = Doctor(f"BD{i:04d}", f"Doctor {i}", "555-1111", "Electrofisiología")
+        sistema.agregar_doctor(doctor)
+        for dia in range(DIAS_LLENOS):
+            base = desde + dia * MINUTOS_POR_DIA + 9 * 60
+            for slot in range(16):
+                # Se deja libre aproximadamente un hueco de cada 200
+                if rng.random() < 0.005:
+                    continue
+                fecha, hora = convertir_desde_minutos(base + slot * 30)
+                numero += 1
+                cita = Cita(f"BC{numero:07d}", paciente, doctor, fecha, hora, "Control")
+                sistema.agregar_cita(cita)
+    return sistema, desde
+
+
+def main():
+    inicio = time.perf_counter()
+    sistema, desde = preparar()
+    print(f"Preparación: {len(sistema.citas):,} citas en {time.perf_counter() - inicio:.1f} s")
+    hasta = desde + DIAS * MINUTOS_POR_DIA
+
+    motor = sistema.disponibilidad
+    inicio = time.perf_counter()
+    huecos = motor.proximos_huecos_especialidad("Electrofisiología", desde, hasta, 1)
+    frio = (time.perf_counter() - inicio) * 1000
+
+    inicio = time.perf_counter()
+    for _ in range(REPETICIONES):
+        huecos = motor.proximos_huecos_especialidad("Electrofisiología", desde, hasta, 1)
+    caliente = (time.perf_counter() - inicio) * 1000 / REPETICIONES
+
+    fecha, hora = convertir_desde_minutos(huecos[0][0])
+    print(f"Próximo hueco: {fecha} {hora} con {huecos[0][1].nombre}")
+    print(f"Consulta en frío: {frio:.2f} ms")
+    print(f"Consulta con caché: {caliente:.2f} ms")
+
+    # Una reserva solo invalida el día afectado
+    doctor = huecos[0][1]
+    cita = Cita("BC-NUEVA", sistema.pacientes[-1], doctor, fecha, hora, "Control")
+    sistema.agregar_cita(cita)
+    inicio = time.perf_counter()
+    motor.proximos_huecos_especialidad("Electrofisiología", desde, hasta, 1)
+    print(f"Consulta tras una reserva: {(time.perf_counter() - inicio) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+BENCHMARK DE LISTA DE ESPERA
+Llena una población sintética de solicitudes en espera (por especialidad y
+por doctor, con distintas urgencias), cancela citas futuras al azar y mide:
+- Costo de cancelar_cita con y sin lista de espera
+- Tasa de relleno y latencia de la reserva automática (ListaEspera.metricas)
+- La alternativa sin colas: recorrer todas las solicitudes buscando la mejor
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from generador import ESCALAS, GeneradorDatos
+from espera import ListaEspera
+from fechas import MINUTOS_POR_DIA, convertir_desde_minutos
+from sistema import SistemaCitasMedicas
+
+
+def cancelar(sistema: SistemaCitasMedicas, citas: list) -> float:
+    """Cancela las citas y retorna los microsegundos promedio por cancelación"""
+    inicio = time.perf_counter()
+    for cita in citas:
+        sistema.cancelar_cita(cita.id)
+    return (time.perf_counter() - inicio) * 1e6 / max(len(citas), 1)
+
+
+def mejor_recorriendo(solicitudes: list, doctor, dia: int):
+    """Busca el mejor candidato recorriendo todas las solicitudes (sin índices)"""
+    candidatas = [s for s in solicitudes if s.desde <= dia <= s.hasta and
+                  (s.doctor_id == doctor.id or not s.doctor_id and s.especialidad == doctor.especialidad)]
+    return min(candidatas, key=lambda s: s.prioridad, default=None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--escala", choices=ESCALAS, default="pequena")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--solicitudes", type=int, default=50_000)
+    parser.add_argument("--cancelaciones", type=int, default=5_000)
+    argumentos = parser.parse_args()
+    rng = random.Random(argumentos.semilla)
+
+    sistema = SistemaCitasMedicas()
+    GeneradorDatos(argumentos.semilla).poblar(sistema, *ESCALAS[argumentos.escala])
+    activas = sorted(sistema.obtener_citas_activas(), key=lambda cita: cita.inicio)
+    # El "presente" simulado queda al inicio del periodo de las citas
+    ahora = activas[0].inicio - 1
+    primer_dia = activas[0].inicio // MINUTOS_POR_DIA
+    ultimo_dia = activas[-1].inicio // MINUTOS_POR_DIA
+    print(f"Estado: {len(activas):,} citas activas entre {convertir_desde_minutos(activas[0].inicio)[0]} "
+          f"y {convertir_desde_minutos(activas[-1].inicio)[0]}")
+
+    canceladas = rng.sample(activas, min(2 * argumentos.cancelaciones, len(activas)))
+    sin_lista = cancelar(sistema, canceladas[:argumentos.cancelaciones])
+
+    lista = ListaEspera(sistema, reloj=lambda: ahora)
+    lista.iniciar()
+    pacientes, doctores = sistema.pacientes, sistema.doctores
+    especialidades = list(sistema.especialidades())
+    inicio = time.perf_counter()
+    for _ in range(argumentos.solicitudes):
+        desde = rng.randint(primer_dia, ultimo_dia)
+        hasta = min(desde + rng.randint(0, ListaEspera.MAX_DIAS_VENTANA - 1), ultimo_dia)
+        opciones = {"doctor_id": rng.choice(doctores).id} if rng.random() < 0.3 else \
+            {"especialidad": rng.choice(especialidades)}
+        lista.agregar(rng.choice(pacientes).id, desde_fecha=convertir_desde_minutos(desde * MINUTOS_POR_DIA)[0],
+                      hasta_fecha=convertir_desde_minutos(hasta * MINUTOS_POR_DIA)[0],
+                      urgencia=rng.choice((0, 0, 0, 1, 2)), **opciones)
+    segundos = time.perf_counter() - inicio
+    print(f"Solicitudes: {len(lista):,} en {segundos:.2f} s ({len(lista) / segundos:,.0f}/s)")
+
+    solicitudes = [lista.obtener(f"E{numero:08d}") for numero in range(1, len(lista) + 1)]
+    muestra = canceladas[argumentos.cancelaciones:][:200]
+    inicio = time.perf_counter()
+    for cita in muestra:
+        mejor_recorriendo(solicitudes, cita.doctor, cita.inicio // MINUTOS_POR_DIA)
+    recorriendo = (time.perf_counter() - inicio) * 1e6 / max(len(muestra), 1)
+
+    con_lista = cancelar(sistema, canceladas[argumentos.cancelaciones:])
+    print(f"cancelar_cita: {sin_lista:.1f} µs sin lista de espera, {con_lista:.1f} µs con lista "
+          f"(incluye reservar la cita nueva)")
+    print(f"Buscar el candidato recorriendo las solicitudes: {recorriendo:,.1f} µs por hueco")
+    for clave, valor in lista.metricas().items():
+        print(f"  {clave:<24} {valor}")
+
+
+if __name__ == "__main__":
+    main()
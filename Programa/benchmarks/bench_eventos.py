@@ -0,0 +1,88 @@
+"""
+BENCHMARK DEL BUS DE EVENTOS
+Mide cuánto agrega BusEventos a agregar_cita y cancelar_cita según quién
+escuche (nadie, un suscriptor síncrono, uno en cola o el registro en disco),
+la velocidad para ponerse al día leyendo el registro desde un offset, y el
+costo de la alternativa sin eventos: recorrer todas las citas para detectar
+cambios
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from generador import ESCALAS, GeneradorDatos
+from eventos import BusEventos, RegistroEventos
+from sistema import SistemaCitasMedicas
+
+CONFIGURACIONES = ("sin suscriptores", "síncrono", "en cola", "registro en disco")
+
+
+def ejecutar(configuracion: str, escala: tuple, semilla: int, ruta_registro: str):
+    """Agrega y cancela citas una por una; retorna (µs por operación, sistema, bus)"""
+    doctores, pacientes, citas = escala
+    generador = GeneradorDatos(semilla)
+    bus = BusEventos(RegistroEventos(ruta_registro) if configuracion == "registro en disco" else None)
+    sistema = SistemaCitasMedicas(eventos=bus)
+    lista_doctores = list(generador.doctores(doctores))
+    lista_pacientes = list(generador.pacientes(pacientes))
+    sistema.cargar_lote(lista_pacientes, lista_doctores)
+    recibidos = []
+    if configuracion == "síncrono":
+        bus.suscribir(recibidos.append)
+    elif configuracion == "en cola":
+        bus.suscribir_en_cola(recibidos.extend)
+
+    nuevas = list(generador.citas(lista_pacientes, lista_doctores, citas))
+    inicio = time.perf_counter()
+    for cita in nuevas:
+        sistema.agregar_cita(cita)
+    for cita in nuevas[::10]:
+        sistema.cancelar_cita(cita.id)
+    operaciones = len(nuevas) + len(nuevas[::10])
+    segundos = time.perf_counter() - inicio
+    bus.cerrar()
+    return segundos * 1e6 / operaciones, sistema, bus
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--escala", choices=ESCALAS, default="minima")
+    parser.add_argument("--semilla", type=int, default=42)
+    argumentos = parser.parse_args()
+
+    directorio = tempfile.mkdtemp(prefix="bench_eventos_")
+    try:
+        ruta = os.path.join(directorio, "eventos.log")
+        print(f"{'Configuración':<20} {'µs por operación':>17}")
+        for configuracion in CONFIGURACIONES:
+            por_operacion, sistema, bus = ejecutar(configuracion, ESCALAS[argumentos.escala],
+                                                   argumentos.semilla, ruta)
+            print(f"{configuracion:<20} {por_operacion:>17.1f}")
+
+        registro = RegistroEventos(ruta, solo_lectura=True)
+        total = registro.ultimo_offset
+        print(f"\nRegistro: {total:,} eventos, {os.path.getsize(ruta) / 1e6:.1f} MB")
+        for desde in (0, total // 2, total - 1000):
+            inicio = time.perf_counter()
+            leidos = sum(1 for _ in registro.leer(desde))
+            segundos = time.perf_counter() - inicio
+            print(f"Ponerse al día desde el offset {desde:>9,}: {leidos:>9,} eventos en "
+                  f"{segundos * 1000:8.1f} ms")
+
+        # Sin eventos, un consumidor tiene que recorrer las citas para ver qué cambió
+        inicio = time.perf_counter()
+        {cita.id: cita.estado for cita in sistema.citas}
+        print(f"Recorrer todas las citas para detectar cambios: "
+              f"{(time.perf_counter() - inicio) * 1000:.1f} ms por consulta")
+    finally:
+        shutil.rmtree(directorio, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
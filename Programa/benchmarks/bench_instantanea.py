@@ -0,0 +1,135 @@
+"""
+BENCHMARK DE INSTANTÁNEAS
+Compara la instantánea binaria (RepositorioInstantanea) con la instantánea
+JSON de RepositorioDiario y con pickle del sistema completo:
+- Tamaño en disco y tiempo de escritura
+- Abrir el archivo y responder una consulta por ID
+- Cargar todos los pacientes, doctores y citas como objetos
+"""
+
+import argparse
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from generador import ESCALAS, GeneradorDatos
+from persistencia import Repositorio
+from persistencia_diario import RepositorioDiario
+from persistencia_instantanea import RepositorioInstantanea
+from sistema import SistemaCitasMedicas
+
+
+def medir(funcion) -> tuple:
+    """Retorna (milisegundos, resultado) de una llamada"""
+    inicio = time.perf_counter()
+    resultado = funcion()
+    return (time.perf_counter() - inicio) * 1000, resultado
+
+
+def con_pila_grande(funcion):
+    """Ejecuta `funcion` en un hilo con pila amplia: pickle recorre el grafo de forma recursiva"""
+    resultado = {}
+
+    def ejecutar():
+        try:
+            resultado["valor"] = funcion()
+        except RecursionError as e:
+            resultado["error"] = e
+
+    sys.setrecursionlimit(10_000_000)
+    threading.stack_size(1 << 30)
+    hilo = threading.Thread(target=ejecutar)
+    hilo.start()
+    hilo.join()
+    threading.stack_size(0)
+    if "error" in resultado:
+        raise resultado["error"]
+    return resultado["valor"]
+
+
+def cargar_todo(sistema: SistemaCitasMedicas) -> SistemaCitasMedicas:
+    for registro in (sistema.pacientes, sistema.doctores, sistema.citas):
+        registro.cargar_todo()
+    return sistema
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--escala", choices=ESCALAS, default="pequena")
+    parser.add_argument("--semilla", type=int, default=42)
+    argumentos = parser.parse_args()
+
+    sistema = SistemaCitasMedicas()
+    GeneradorDatos(argumentos.semilla).poblar(sistema, *ESCALAS[argumentos.escala])
+    cita_id = sistema.citas[len(sistema.citas) // 2].id
+    print(f"Estado: {len(sistema.pacientes):,} pacientes, {len(sistema.doctores):,} doctores, "
+          f"{len(sistema.citas):,} citas")
+
+    directorio = tempfile.mkdtemp(prefix="bench_instantanea_")
+    try:
+        ruta_binaria = os.path.join(directorio, "estado.scmb")
+        ruta_pickle = os.path.join(directorio, "estado.pickle")
+        directorio_json = os.path.join(directorio, "diario")
+        resultados = {}
+
+        escritura, _ = medir(lambda: sistema.exportar_instantanea(ruta_binaria))
+        abrir, fila = medir(lambda: RepositorioInstantanea(ruta_binaria).fila_por_id("cita", cita_id))
+        completa, copia = medir(lambda: cargar_todo(SistemaCitasMedicas(RepositorioInstantanea(ruta_binaria))))
+        assert fila == Repositorio.fila_cita(sistema.buscar_cita_por_id(cita_id))
+        assert list(map(Repositorio.fila_cita, copia.citas)) == list(map(Repositorio.fila_cita, sistema.citas))
+        copia.cerrar()
+        resultados["binaria (mmap)"] = (os.path.getsize(ruta_binaria), escritura, abrir, completa)
+
+        def escribir_json():
+            repositorio = RepositorioDiario(directorio_json)
+            sistema_json = SistemaCitasMedicas(repositorio)
+            repositorio.compactar(sistema._filas())
+            sistema_json.cerrar()
+
+        def abrir_json():
+            sistema_json = SistemaCitasMedicas(RepositorioDiario(directorio_json))
+            sistema_json.buscar_cita_por_id(cita_id)
+            return sistema_json
+
+        escritura, _ = medir(escribir_json)
+        abrir, sistema_json = medir(abrir_json)
+        sistema_json.cerrar()
+        # RepositorioDiario ya carga todo al abrir
+        completa, sistema_json = medir(abrir_json)
+        sistema_json.cerrar()
+        tamano = os.path.getsize(os.path.join(directorio_json, RepositorioDiario.ARCHIVO_INSTANTANEA))
+        resultados["JSON (diario)"] = (tamano, escritura, abrir, completa)
+
+        def escribir_pickle():
+            with open(ruta_pickle, "wb") as archivo:
+                pickle.dump(sistema, archivo, pickle.HIGHEST_PROTOCOL)
+
+        def abrir_pickle():
+            with open(ruta_pickle, "rb") as archivo:
+                copia = pickle.load(archivo)
+            copia.buscar_cita_por_id(cita_id)
+            return copia
+
+        try:
+            escritura, _ = medir(lambda: con_pila_grande(escribir_pickle))
+            abrir, _ = medir(lambda: con_pila_grande(abrir_pickle))
+            resultados["pickle"] = (os.path.getsize(ruta_pickle), escritura, abrir, abrir)
+        except RecursionError:
+            print("pickle: el grafo Paciente-Cita-Doctor excede la recursión disponible")
+
+        print(f"\n{'Formato':<16} {'Tamaño (MB)':>12} {'Escritura (ms)':>15} "
+              f"{'Abrir y consultar (ms)':>23} {'Carga completa (ms)':>20}")
+        for formato, (tamano, escritura, abrir, completa) in resultados.items():
+            print(f"{formato:<16} {tamano / 1e6:>12.1f} {escritura:>15.0f} {abrir:>23.1f} {completa:>20.0f}")
+    finally:
+        shutil.rmtree(directorio, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
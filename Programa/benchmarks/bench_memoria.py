@@ -0,0 +1,116 @@
+"""
+BENCHMARK DE MEMORIA DE LAS CITAS
+Compara los bytes por cita de tres representaciones:
+- La clase Cita original (con __dict__, fecha/hora como texto y estado como texto)
+- La clase Cita actual (__slots__, minutos enteros y estado como código)
+- AlmacenColumnarCitas (arreglos tipados con vistas VistaCita)
+"""
+
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from entidades import AlmacenColumnarCitas, Cita, Doctor, Paciente
+from fechas import convertir_a_minutos, convertir_desde_minutos
+
+CITAS = 100_000
+DOCTORES = 200
+PACIENTES = 20_000
+MOTIVOS = ["Control", "Consulta general", "Seguimiento", "Resultados", "Urgencia"]
+
+
+class CitaOriginal:
+    """Réplica del diseño original de Cita (sin __slots__ y con textos)"""
+
+    def __init__(self, id, paciente, doctor, fecha, hora, motivo, estado="Programada"):
+        self._id = id
+        self._paciente = paciente
+        self._doctor = doctor
+        self._fecha = fecha
+        self._hora = hora
+        self._motivo = motivo
+        self._estado = estado
+        paciente.citas_originales.append(self)
+        doctor.citas_originales.append(self)
+
+
+class Referencia:
+    """Paciente o doctor mínimo para la réplica original"""
+
+    def __init__(self, id):
+        self.id = id
+        self.citas_originales = []
+
+
+def datos():
+    """Genera las filas (id, paciente, doctor, inicio, motivo) de las citas"""
+    base = convertir_a_minutos("06/01/2025", "08:00")
+    for i in range(CITAS):
+        doctor = i % DOCTORES
+        inicio = base + (i // DOCTORES) * 30
+        # Motivo como texto nuevo en cada fila, como llegaría de una entrada o base de datos
+        motivo = MOTIVOS[i % len(MOTIVOS)]
+        yield f"C{i:08d}", (i * 7) % PACIENTES, doctor, inicio, motivo[:1] + motivo[1:]
+
+
+def medir(construir) -> float:
+    """Retorna los bytes por cita que retiene la estructura construida"""
+    gc.collect()
+    tracemalloc.start()
+    antes = tracemalloc.get_traced_memory()[0]
+    estructura = construir()
+    gc.collect()
+    despues = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del estructura
+    return (despues - antes) / CITAS
+
+
+def construir_original():
+    pacientes = [Referencia(f"P{i}") for i in range(PACIENTES)]
+    doctores = [Referencia(f"D{i}") for i in range(DOCTORES)]
+    citas = []
+    for id, p, d, inicio, motivo in datos():
+        fecha, hora = convertir_desde_minutos(inicio)
+        citas.append(CitaOriginal(id, pacientes[p], doctores[d], fecha, hora, motivo))
+    return pacientes, doctores, citas
+
+
+def construir_slots(pacientes, doctores):
+    def construir():
+        citas = []
+        for id, p, d, inicio, motivo in datos():
+            fecha, hora = convertir_desde_minutos(inicio)
+            citas.append(Cita(id, pacientes[p], doctores[d], fecha, hora, motivo))
+        return citas
+    return construir
+
+
+def construir_columnar(pacientes, doctores):
+    def construir():
+        almacen = AlmacenColumnarCitas()
+        for id, p, d, inicio, motivo in datos():
+            almacen.agregar_fila(id, pacientes[p], doctores[d], inicio, 30, motivo, "Programada")
+        return almacen
+    return construir
+
+
+def main():
+    print(f"Citas: {CITAS:,}")
+    print(f"{'Original (__dict__ + textos)':<32} {medir(construir_original):>8.0f} bytes/cita")
+
+    pacientes = [Paciente(f"P{i}", f"Paciente {i}", "555-0000", 30) for i in range(PACIENTES)]
+    doctores = [Doctor(f"D{i}", f"Doctor {i}", "555-0000", "General") for i in range(DOCTORES)]
+    print(f"{'Cita con __slots__':<32} {medir(construir_slots(pacientes, doctores)):>8.0f} bytes/cita")
+
+    # Las citas del paso anterior siguen en los historiales; se usan entidades nuevas
+    pacientes = [Paciente(f"P{i}", f"Paciente {i}", "555-0000", 30) for i in range(PACIENTES)]
+    doctores = [Doctor(f"D{i}", f"Doctor {i}", "555-0000", "General") for i in range(DOCTORES)]
+    print(f"{'AlmacenColumnarCitas':<32} {medir(construir_columnar(pacientes, doctores)):>8.0f} bytes/cita")
+
+
+if __name__ == "__main__":
+    main()
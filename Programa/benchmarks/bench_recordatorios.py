@@ -0,0 +1,90 @@
+"""
+BENCHMARK DE RECORDATORIOS
+Mide ProgramadorRecordatorios con un reloj simulado sobre una población
+sintética:
+- Encolar los avisos de todas las citas activas
+- Costo que agrega a cancelar_cita quitar los avisos de la cola
+- Despachar todos los avisos avanzando el reloj hora por hora, comparado con
+  recorrer las citas activas en cada paso
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from generador import ESCALAS, GeneradorDatos
+from recordatorios import ProgramadorRecordatorios
+from sistema import SistemaCitasMedicas
+
+PASO_MINUTOS = 60
+PASOS_RECORRIDO = 20
+
+
+def cancelar(sistema: SistemaCitasMedicas, ids: list) -> float:
+    """Cancela las citas y retorna los microsegundos promedio por cancelación"""
+    inicio = time.perf_counter()
+    for cita_id in ids:
+        sistema.cancelar_cita(cita_id)
+    return (time.perf_counter() - inicio) * 1e6 / max(len(ids), 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--escala", choices=ESCALAS, default="pequena")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--antes", type=int, action="append", metavar="MINUTOS")
+    argumentos = parser.parse_args()
+    antes = argumentos.antes or ProgramadorRecordatorios.ANTICIPACIONES
+
+    sistema = SistemaCitasMedicas()
+    GeneradorDatos(argumentos.semilla).poblar(sistema, *ESCALAS[argumentos.escala])
+    activas = sistema.obtener_citas_activas()
+    primera = min(cita.inicio for cita in activas)
+    ultima = max(cita.inicio for cita in activas)
+    print(f"Estado: {len(activas):,} citas activas, anticipaciones {list(antes)} min")
+
+    ids = [cita.id for cita in random.Random(argumentos.semilla).sample(activas, len(activas) // 5)]
+    mitad = len(ids) // 2
+    sin_programador = cancelar(sistema, ids[:mitad])
+
+    reloj = [primera - max(antes) - 1]
+    enviados = []
+    programador = ProgramadorRecordatorios(sistema, enviados.append, antes, reloj=lambda: reloj[0])
+    inicio = time.perf_counter()
+    programador.iniciar(en_segundo_plano=False)
+    segundos = time.perf_counter() - inicio
+    print(f"Encolar: {len(programador):,} avisos en {segundos:.2f} s "
+          f"({len(programador) / segundos:,.0f} avisos/s)")
+
+    con_programador = cancelar(sistema, ids[mitad:])
+    print(f"cancelar_cita: {con_programador:.1f} µs con recordatorios, {sin_programador:.1f} µs sin "
+          f"({len(programador):,} avisos pendientes)")
+
+    pasos = 0
+    inicio = time.perf_counter()
+    while reloj[0] <= ultima:
+        reloj[0] += PASO_MINUTOS
+        programador.despachar_vencidos()
+        pasos += 1
+    segundos = time.perf_counter() - inicio
+    print(f"Despachar: {len(enviados):,} avisos en {pasos:,} pasos de {PASO_MINUTOS} min, "
+          f"{segundos:.2f} s ({len(enviados) / segundos:,.0f} avisos/s)")
+
+    # Alternativa sin cola: buscar en cada paso los avisos vencidos entre todas las citas activas
+    activas = sistema.obtener_citas_activas()
+    inicio = time.perf_counter()
+    for paso in range(PASOS_RECORRIDO):
+        ahora = primera + paso * PASO_MINUTOS
+        [cita for cita in activas for minutos in antes
+         if ahora - PASO_MINUTOS < cita.inicio - minutos <= ahora]
+    por_paso = (time.perf_counter() - inicio) / PASOS_RECORRIDO
+    print(f"Recorrer citas activas: {por_paso * 1000:.1f} ms por paso, "
+          f"{por_paso * pasos:.1f} s estimados para los mismos {pasos:,} pasos")
+
+
+if __name__ == "__main__":
+    main()
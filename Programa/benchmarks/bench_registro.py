@@ -0,0 +1,52 @@
+"""
+BENCHMARK DEL REGISTRO DE ENTIDADES
+Mide el costo por operación de insertar y buscar pacientes por ID
+en SistemaCitasMedicas desde 1.000 hasta 1.000.000 de registros
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from entidades import Paciente
+from sistema import SistemaCitasMedicas
+
+TAMANOS = [1_000, 10_000, 100_000, 1_000_000]
+BUSQUEDAS = 100_000
+
+
+def medir(tamano: int) -> tuple:
+    """Retorna los nanosegundos por inserción y por búsqueda para un tamaño"""
+    sistema = SistemaCitasMedicas()
+    pacientes = [
+        Paciente(f"B{i:07d}", f"Paciente {i}", "555-0000", 30)
+        for i in range(tamano)
+    ]
+
+    inicio = time.perf_counter_ns()
+    for paciente in pacientes:
+        sistema.agregar_paciente(paciente)
+    ns_insercion = (time.perf_counter_ns() - inicio) / tamano
+
+    rng = random.Random(tamano)
+    ids = [f"B{rng.randrange(tamano):07d}" for _ in range(BUSQUEDAS)]
+    inicio = time.perf_counter_ns()
+    for paciente_id in ids:
+        sistema.buscar_paciente_por_id(paciente_id)
+    ns_busqueda = (time.perf_counter_ns() - inicio) / BUSQUEDAS
+
+    return ns_insercion, ns_busqueda
+
+
+def main():
+    print(f"{'Registros':>12} {'Inserción (ns/op)':>20} {'Búsqueda (ns/op)':>20}")
+    for tamano in TAMANOS:
+        ns_insercion, ns_busqueda = medir(tamano)
+        print(f"{tamano:>12,} {ns_insercion:>20.0f} {ns_busqueda:>20.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+BENCHMARK DE REPORTES PARALELOS
+Mide GeneradorReportes (citas por doctor, por paciente y resumen por periodo)
+con 1, 2, 4... procesos hasta el número de núcleos, y comprueba que el
+resultado sea idéntico sin importar cuántos procesos se usen
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from generador import ESCALAS, GeneradorDatos
+from reportes import GeneradorReportes
+from sistema import SistemaCitasMedicas
+
+
+def procesos_a_medir() -> list:
+    nucleos = os.cpu_count() or 1
+    cantidades, procesos = [], 1
+    while procesos < nucleos:
+        cantidades.append(procesos)
+        procesos *= 2
+    return cantidades + [nucleos]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--escala", choices=ESCALAS, default="pequena")
+    parser.add_argument("--semilla", type=int, default=42)
+    argumentos = parser.parse_args()
+
+    sistema = SistemaCitasMedicas()
+    generador = GeneradorDatos(argumentos.semilla)
+    inicio = time.perf_counter()
+    generador.poblar(sistema, *ESCALAS[argumentos.escala])
+    print(f"Preparación: {len(sistema.citas):,} citas en {time.perf_counter() - inicio:.1f} s")
+
+    desde = min(sistema.citas, key=lambda cita: cita.inicio).fecha
+    hasta = max(sistema.citas, key=lambda cita: cita.inicio).fecha
+    reportes = {
+        "citas por doctor": lambda g: g.citas_por_doctor(),
+        "citas por paciente": lambda g: g.citas_por_paciente(),
+        "resumen por periodo": lambda g: g.resumen_periodo(desde, hasta),
+    }
+
+    print(f"{'Reporte':<22} {'Procesos':>8} {'Segundos':>10} {'Aceleración':>12}")
+    for nombre, generar in reportes.items():
+        base = referencia = None
+        for procesos in procesos_a_medir():
+            inicio = time.perf_counter()
+            reporte = generar(GeneradorReportes(sistema, procesos))
+            segundos = time.perf_counter() - inicio
+            if base is None:
+                base, referencia = segundos, reporte
+            elif reporte != referencia:
+                raise SystemExit(f"El reporte '{nombre}' cambia con {procesos} procesos")
+            print(f"{nombre:<22} {procesos:>8} {segundos:>10.2f} {base / segundos:>11.2f}x")
+
+
+if __name__ == "__main__":
+    main()
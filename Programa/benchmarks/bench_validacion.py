@@ -0,0 +1,95 @@
+"""
+BENCHMARK DE VALIDACIÓN
+Mide el rendimiento (registros por segundo y segundos por millón) de la
+validación de emails y teléfonos: el patrón original sin compilar, las
+funciones canonizar_* con y sin caché LRU, y ValidadorRegistros validando
+filas completas de pacientes por bloques
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from validacion import ValidadorRegistros, canonizar_email, canonizar_telefono
+
+PATRON_ORIGINAL = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+DOMINIOS = ["correo.com", "Mail.ES", "salud.org", "clinica.net"]
+TAMANO_BLOQUE = 5000
+
+
+def filas_pacientes(cantidad: int, distintos: int, semilla: int) -> list:
+    """Genera filas con ~5% de teléfonos y ~3% de emails no válidos
+
+    Con `distintos` menor que `cantidad` los valores se repiten, como en
+    exportaciones con contactos compartidos o reimportaciones.
+    """
+    rng = random.Random(semilla)
+    filas = []
+    for i in range(cantidad):
+        n = rng.randrange(distintos)
+        telefono = rng.choice([f"555-{n:07d}", f"+34 6{n:08d}", f"(01) {n:08d}"])
+        if rng.random() < 0.05:
+            telefono = f"tel {n}"
+        email = f"paciente.{n}@{rng.choice(DOMINIOS)}" if rng.random() < 0.6 else ""
+        if email and rng.random() < 0.03:
+            email = email.replace("@", " at ")
+        filas.append({"nombre": f"Paciente {i}", "telefono": telefono, "edad": str(n % 90),
+                      "email": email})
+    return filas
+
+
+def medir(nombre: str, cantidad: int, funcion):
+    inicio = time.perf_counter()
+    funcion()
+    segundos = time.perf_counter() - inicio
+    print(f"{nombre:<44} {cantidad / segundos:>14,.0f} {segundos * 1_000_000 / cantidad:>14.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--registros", type=int, default=1_000_000)
+    parser.add_argument("--semilla", type=int, default=42)
+    argumentos = parser.parse_args()
+    cantidad = argumentos.registros
+
+    print(f"{'Validación':<44} {'Registros/s':>14} {'s por millón':>14}")
+    for etiqueta, distintos in (("valores únicos", cantidad), ("1.000 valores repetidos", 1000)):
+        filas = filas_pacientes(cantidad, distintos, argumentos.semilla)
+        emails = [fila["email"] for fila in filas if fila["email"]]
+        telefonos = [fila["telefono"] for fila in filas]
+        print(f"--- {etiqueta} ---")
+
+        medir("email: re.match sin compilar (original)", len(emails),
+              lambda: [re.match(PATRON_ORIGINAL, email) is not None for email in emails])
+        medir("email: patrón compilado, sin caché", len(emails),
+              lambda: list(map(canonizar_email.__wrapped__, emails)))
+        canonizar_email.cache_clear()
+        medir("email: canonizar_email (caché LRU)", len(emails),
+              lambda: list(map(canonizar_email, emails)))
+        medir("teléfono: patrón compilado, sin caché", len(telefonos),
+              lambda: list(map(canonizar_telefono.__wrapped__, telefonos)))
+        canonizar_telefono.cache_clear()
+        medir("teléfono: canonizar_telefono (caché LRU)", len(telefonos),
+              lambda: list(map(canonizar_telefono, telefonos)))
+
+        validador = ValidadorRegistros()
+        invalidas = []
+
+        def validar_bloques():
+            for inicio in range(0, len(filas), TAMANO_BLOQUE):
+                errores = validador.validar("pacientes", filas[inicio:inicio + TAMANO_BLOQUE])
+                invalidas.extend(inicio + i for i, propios in enumerate(errores) if propios)
+
+        canonizar_email.cache_clear()
+        canonizar_telefono.cache_clear()
+        medir(f"filas: ValidadorRegistros (bloques de {TAMANO_BLOQUE})", len(filas), validar_bloques)
+        print(f"{'':<44} {len(invalidas):,} filas no válidas reportadas")
+
+
+if __name__ == "__main__":
+    main()
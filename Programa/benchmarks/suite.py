@@ -0,0 +1,195 @@
+"""
+SUITE DE BENCHMARKS
+Mide las operaciones principales de SistemaCitasMedicas sobre una población
+sintética reproducible y escribe los resultados en JSON. Con --comparar se
+contrasta contra un resultado anterior y se marcan las regresiones.
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from entidades import Cita
+from fechas import MINUTOS_POR_DIA, convertir_desde_minutos
+from interfaz import ModuloReportes
+from sistema import SistemaCitasMedicas
+from generador import ESCALAS, GeneradorDatos
+
+try:
+    import resource  # Memoria máxima del proceso (solo POSIX)
+except ImportError:
+    resource = None
+
+OPERACIONES = 2_000
+UMBRAL_REGRESION = 1.10
+
+
+def percentil(valores: list, p: float) -> float:
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(p / 100 * len(ordenados)))]
+
+
+def medir(nombre: str, funcion, argumentos: list, resultados: dict):
+    """Ejecuta la función una vez por argumento y guarda el tiempo de cada llamada"""
+    tiempos = []
+    reloj = time.perf_counter_ns
+    for argumento in argumentos:
+        inicio = reloj()
+        funcion(argumento)
+        tiempos.append(reloj() - inicio)
+    total = sum(tiempos)
+    resultados[nombre] = {
+        "n": len(tiempos),
+        "total_s": round(total / 1e9, 6),
+        "ns_por_op": round(total / len(tiempos)),
+        "p50_ns": percentil(tiempos, 50),
+        "p99_ns": percentil(tiempos, 99),
+    }
+    print(f"  {nombre:<32} {resultados[nombre]['ns_por_op']:>14,} ns/op")
+
+
+class EntradaContinuar:
+    """Entrada que responde Enter a cada pregunta del paginador"""
+
+    def readline(self) -> str:
+        return "\n"
+
+
+def reporte_completo(metodo):
+    """Ejecuta un reporte de ModuloReportes descartando la salida y pasando todas las páginas"""
+    def ejecutar(_):
+        salida, entrada = sys.stdout, sys.stdin
+        sys.stdout, sys.stdin = io.StringIO(), EntradaContinuar()
+        try:
+            metodo()
+        finally:
+            sys.stdout, sys.stdin = salida, entrada
+    return ejecutar
+
+
+def version_git() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        return ""
+
+
+def ejecutar_suite(escala: str, semilla: int, memoria: bool) -> dict:
+    doctores, pacientes, citas = ESCALAS[escala]
+    generador = GeneradorDatos(semilla)
+    rng = random.Random(semilla)
+    resultado = {
+        "version": version_git(),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "escala": escala,
+        "semilla": semilla,
+        "poblacion": {"doctores": doctores, "pacientes": pacientes, "citas": citas},
+    }
+
+    print(f"Poblando escala '{escala}' ({doctores:,} doctores, {pacientes:,} pacientes, {citas:,} citas)")
+    if memoria:
+        tracemalloc.start()
+    inicio = time.perf_counter()
+    sistema = generador.poblar(SistemaCitasMedicas(datos_ejemplo=False), doctores, pacientes, citas)
+    resultado["poblacion"]["segundos"] = round(time.perf_counter() - inicio, 3)
+    if memoria:
+        resultado["memoria"] = {"bytes_retenidos": tracemalloc.get_traced_memory()[0]}
+        resultado["memoria"]["bytes_por_cita"] = round(resultado["memoria"]["bytes_retenidos"] / citas)
+        tracemalloc.stop()
+
+    operaciones = {}
+    print("Operaciones:")
+    ids_pacientes = [sistema.pacientes[rng.randrange(pacientes)].id for _ in range(OPERACIONES)]
+    ids_doctores = [sistema.doctores[rng.randrange(doctores)].id for _ in range(OPERACIONES)]
+    ids_citas = [sistema.citas[rng.randrange(citas)].id for _ in range(OPERACIONES)]
+    medir("buscar_paciente_por_id", sistema.buscar_paciente_por_id, ids_pacientes, operaciones)
+    medir("buscar_doctor_por_id", sistema.buscar_doctor_por_id, ids_doctores, operaciones)
+    medir("buscar_cita_por_id", sistema.buscar_cita_por_id, ids_citas, operaciones)
+
+    nuevos_pacientes = list(generador.pacientes(OPERACIONES))
+    nuevos_doctores = list(generador.doctores(OPERACIONES // 10))
+    medir("agregar_paciente", sistema.agregar_paciente, nuevos_pacientes, operaciones)
+    medir("agregar_doctor", sistema.agregar_doctor, nuevos_doctores, operaciones)
+
+    # Citas nuevas en días sin ocupar, después de toda la población generada
+    ultimo = max(cita.inicio for cita in sistema.citas)
+    base = (ultimo // MINUTOS_POR_DIA + 7) * MINUTOS_POR_DIA + 9 * 60
+    nuevas_citas = []
+    for numero in range(OPERACIONES):
+        doctor = nuevos_doctores[numero % len(nuevos_doctores)]
+        fecha, hora = convertir_desde_minutos(base + (numero // len(nuevos_doctores)) * 30)
+        nuevas_citas.append((f"BENCH{numero:07d}", nuevos_pacientes[numero], doctor, fecha, hora))
+    medir("agregar_cita",
+          lambda datos: sistema.agregar_cita(Cita(*datos, "Control")), nuevas_citas, operaciones)
+
+    activas = [cita.id for cita in sistema.citas if cita.estado == "Programada"]
+    medir("cancelar_cita", sistema.cancelar_cita, rng.sample(activas, OPERACIONES), operaciones)
+    medir("obtener_citas_activas", lambda _: sistema.obtener_citas_activas(), range(20), operaciones)
+
+    reportes = ModuloReportes(sistema)
+    medir("reporte_estadisticas_generales",
+          reporte_completo(reportes._estadisticas_generales), range(100), operaciones)
+    medir("reporte_citas_por_doctor",
+          reporte_completo(reportes._citas_por_doctor), range(3), operaciones)
+    medir("reporte_citas_por_paciente",
+          reporte_completo(reportes._citas_por_paciente), range(3), operaciones)
+
+    resultado["operaciones"] = operaciones
+    if resource:
+        # ru_maxrss está en KiB en Linux y en bytes en macOS
+        maximo = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        resultado.setdefault("memoria", {})["rss_maximo_bytes"] = (
+            maximo if sys.platform == "darwin" else maximo * 1024)
+    return resultado
+
+
+def comparar(actual: dict, anterior: dict) -> list:
+    """Retorna las operaciones que empeoraron más que el umbral"""
+    regresiones = []
+    print(f"\nComparación con la versión {anterior.get('version') or '(desconocida)'}:")
+    for nombre, medida in actual["operaciones"].items():
+        previa = anterior.get("operaciones", {}).get(nombre)
+        if not previa:
+            continue
+        razon = medida["ns_por_op"] / max(previa["ns_por_op"], 1)
+        marca = "  ⚠ REGRESIÓN" if razon > UMBRAL_REGRESION else ""
+        print(f"  {nombre:<32} {razon:>6.2f}x{marca}")
+        if marca:
+            regresiones.append(nombre)
+    return regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Suite de benchmarks del sistema de citas")
+    parser.add_argument("--escala", choices=ESCALAS, default="pequena")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--salida", metavar="ARCHIVO", help="archivo JSON de resultados")
+    parser.add_argument("--comparar", metavar="ARCHIVO", help="resultado anterior para comparar")
+    parser.add_argument("--memoria", action="store_true",
+                        help="medir la memoria retenida con tracemalloc (más lento)")
+    argumentos = parser.parse_args()
+
+    resultado = ejecutar_suite(argumentos.escala, argumentos.semilla, argumentos.memoria)
+    if argumentos.salida:
+        with open(argumentos.salida, "w", encoding="utf-8") as archivo:
+            json.dump(resultado, archivo, ensure_ascii=False, indent=2)
+        print(f"\nResultados guardados en {argumentos.salida}")
+    if argumentos.comparar:
+        with open(argumentos.comparar, encoding="utf-8") as archivo:
+            if comparar(resultado, json.load(archivo)):
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
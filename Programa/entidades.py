@@ -0,0 +1,535 @@
+"""
+CLASES BASE Y ENTIDADES
+Pacientes, doctores y citas, su almacenamiento columnar y su forma JSON
+"""
+
+from abc import ABC, abstractmethod
+from array import array
+from typing import List, Dict, Optional, Iterator, Iterable, Callable, Tuple
+import sys
+
+from fechas import (AgendaDoctor, CANCELADA, CODIGOS_ESTADO, DURACION_CITA_MINUTOS, ESTADOS_CITA,
+                    PROGRAMADA, compilar_horario, convertir_a_minutos, convertir_desde_minutos)
+from validacion import canonizar_email, validar_email, validar_telefono
+
+
+class Persona(ABC):
+    """Clase abstracta que representa a una persona"""
+    
+    __slots__ = ("_id", "_nombre", "_telefono", "_email", "_oyente_email")
+    
+    def __init__(self, id: str, nombre: str, telefono: str, email: str = "", *, validar: bool = True):
+        # Las filas del repositorio ya se validaron al guardarse
+        if validar:
+            telefono = validar_telefono(telefono)
+            email = validar_email(email) if email else ""
+        self._id = id
+        self._nombre = nombre
+        self._telefono = telefono
+        self._email = email
+        self._oyente_email: Optional[Callable[['Persona', str], None]] = None
+    
+    @property
+    def id(self) -> str:
+        return self._id
+    
+    @property
+    def nombre(self) -> str:
+        return self._nombre
+    
+    @property
+    def telefono(self) -> str:
+        return self._telefono
+    
+    @property
+    def email(self) -> str:
+        return self._email
+    
+    @email.setter
+    def email(self, value: str):
+        anterior, self._email = self._email, validar_email(value)
+        if self._oyente_email is not None:
+            self._oyente_email(self, anterior)
+    
+    def fijar_oyente_email(self, oyente: Optional[Callable[['Persona', str], None]]):
+        """Registra la función que se llama con (persona, email_anterior) al cambiar el email"""
+        self._oyente_email = oyente
+    
+    @staticmethod
+    def _validar_email(email: str) -> bool:
+        """Valida el formato del email"""
+        return canonizar_email(email) is not None
+    
+    def _quitar_de_historial(self, cita: 'Cita'):
+        """Quita del historial esa cita (por identidad) y restaura la activa con su ID"""
+        for posicion in range(len(self._citas) - 1, -1, -1):
+            if self._citas[posicion] is cita:
+                del self._citas[posicion]
+                break
+        if self._activas.get(cita.id) is cita:
+            del self._activas[cita.id]
+            for otra in self._citas:
+                if otra.id == cita.id and otra.estado == "Programada":
+                    self._activas[cita.id] = otra
+    
+    @abstractmethod
+    def mostrar_info(self) -> str:
+        pass
+    
+    def __str__(self) -> str:
+        return self.mostrar_info()
+
+
+class Paciente(Persona):
+    """Clase que representa a un paciente"""
+    
+    __slots__ = ("_edad", "_historial_medico", "_citas", "_activas", "_cargador_citas")
+    
+    def __init__(self, id: str, nombre: str, telefono: str, edad: int, 
+                 historial_medico: str = "", email: str = "", *, validar: bool = True):
+        super().__init__(id, nombre, telefono, email, validar=validar)
+        self._edad = edad
+        self._historial_medico = historial_medico
+        self._citas: List[Cita] = []
+        self._activas: Dict[str, Cita] = {}
+        self._cargador_citas: Optional[Callable[[], None]] = None
+    
+    @property
+    def edad(self) -> int:
+        return self._edad
+    
+    @property
+    def historial_medico(self) -> str:
+        return self._historial_medico
+    
+    @historial_medico.setter
+    def historial_medico(self, value: str):
+        self._historial_medico = value
+    
+    @property
+    def citas(self) -> List['Cita']:
+        self._asegurar_citas()
+        return self._citas
+    
+    def _asegurar_citas(self):
+        """Hidrata el historial de citas pendiente de cargar desde el repositorio"""
+        if self._cargador_citas is not None:
+            cargador, self._cargador_citas = self._cargador_citas, None
+            cargador()
+    
+    def agregar_cita(self, cita: 'Cita'):
+        """Agrega una cita al historial del paciente"""
+        self._citas.append(cita)
+        if cita.estado == "Programada":
+            self._activas[cita.id] = cita
+    
+    def quitar_cita(self, cita: 'Cita'):
+        """Deshace agregar_cita para una cita que el sistema rechazó"""
+        self._quitar_de_historial(cita)
+    
+    def notificar_cambio_estado(self, cita: 'Cita', anterior: str):
+        """Actualiza las citas activas cuando una cita cambia de estado"""
+        if cita.estado == "Programada":
+            self._activas[cita.id] = cita
+        else:
+            self._activas.pop(cita.id, None)
+    
+    def mostrar_info(self) -> str:
+        return f"Paciente {self._id}: {self._nombre} ({self._edad} años) - Tel: {self._telefono}"
+    
+    def obtener_citas_activas(self) -> List['Cita']:
+        """Retorna las citas activas del paciente"""
+        self._asegurar_citas()
+        return list(self._activas.values())
+
+
+class Doctor(Persona):
+    """Clase que representa a un doctor"""
+    
+    __slots__ = ("_especialidad", "_horario", "_horario_compilado", "_citas", "_agenda",
+                 "_activas", "_oyentes_estado", "_cargador_citas")
+    
+    def __init__(self, id: str, nombre: str, telefono: str, especialidad: str, 
+                 email: str = "", horario: Dict[str, List[str]] = None, *, validar: bool = True):
+        super().__init__(id, nombre, telefono, email, validar=validar)
+        self._especialidad = especialidad
+        self._horario = horario or self._generar_horario_default()
+        self._horario_compilado = compilar_horario(self._horario)
+        self._citas: List[Cita] = []
+        self._agenda = AgendaDoctor()
+        self._activas: Dict[str, Cita] = {}
+        self._oyentes_estado: List[Callable[['Cita', str], None]] = []
+        self._cargador_citas: Optional[Callable[[], None]] = None
+    
+    @property
+    def especialidad(self) -> str:
+        return self._especialidad
+    
+    @property
+    def horario(self) -> Dict[str, List[str]]:
+        return self._horario
+    
+    @horario.setter
+    def horario(self, value: Dict[str, List[str]]):
+        self._horario_compilado = compilar_horario(value)
+        self._horario = value
+    
+    @property
+    def horario_compilado(self) -> Tuple[Tuple[Tuple[int, int], ...], ...]:
+        """Rangos de atención en minutos por día de la semana (0 = Lunes)"""
+        return self._horario_compilado
+    
+    @property
+    def citas(self) -> List['Cita']:
+        self._asegurar_citas()
+        return self._citas
+    
+    @property
+    def agenda(self) -> AgendaDoctor:
+        self._asegurar_citas()
+        return self._agenda
+    
+    def _asegurar_citas(self):
+        """Hidrata el historial (y la agenda) pendiente de cargar desde el repositorio"""
+        if self._cargador_citas is not None:
+            cargador, self._cargador_citas = self._cargador_citas, None
+            cargador()
+    
+    def _generar_horario_default(self) -> Dict[str, List[str]]:
+        """Genera un horario por defecto"""
+        return {
+            "Lunes": ["09:00-17:00"],
+            "Martes": ["09:00-17:00"],
+            "Miércoles": ["09:00-17:00"],
+            "Jueves": ["09:00-17:00"],
+            "Viernes": ["09:00-17:00"]
+        }
+    
+    def agregar_cita(self, cita: 'Cita'):
+        """Agrega una cita al historial del doctor reservando su horario"""
+        self._asegurar_citas()
+        if cita.estado != "Cancelada":
+            self.reservar_horario(cita)
+        self._citas.append(cita)
+        if cita.estado == "Programada":
+            self._activas[cita.id] = cita
+    
+    def quitar_cita(self, cita: 'Cita'):
+        """Deshace agregar_cita (y su reserva en la agenda) para una cita que el sistema rechazó"""
+        if cita.estado != "Cancelada":
+            self.liberar_horario(cita)
+        self._quitar_de_historial(cita)
+    
+    def reservar_horario(self, cita: 'Cita'):
+        """Ocupa en la agenda el intervalo de la cita"""
+        if not self._agenda.reservar(cita.inicio, cita.fin, cita.id):
+            raise ValueError(f"El Dr. {self._nombre} ya tiene una cita en ese horario")
+    
+    def liberar_horario(self, cita: 'Cita'):
+        """Libera en la agenda el intervalo de la cita"""
+        self._agenda.liberar(cita.inicio, cita.id)
+    
+    def agregar_oyente_estado(self, oyente: Callable[['Cita', str], None]):
+        """Registra una función que se llama con (cita, estado_anterior) en cada cambio"""
+        if oyente not in self._oyentes_estado:
+            self._oyentes_estado.append(oyente)
+    
+    def notificar_cambio_estado(self, cita: 'Cita', anterior: str):
+        """Actualiza las citas activas y avisa a los oyentes del cambio de estado"""
+        if cita.estado == "Programada":
+            self._activas[cita.id] = cita
+        else:
+            self._activas.pop(cita.id, None)
+        for oyente in self._oyentes_estado:
+            oyente(cita, anterior)
+    
+    @property
+    def cantidad_citas_activas(self) -> int:
+        self._asegurar_citas()
+        return len(self._activas)
+    
+    def esta_disponible(self, inicio: int, duracion: int = DURACION_CITA_MINUTOS) -> bool:
+        """Indica si el doctor está libre en el intervalo que empieza en inicio"""
+        return self.agenda.esta_libre(inicio, inicio + duracion)
+    
+    def carga_entre(self, desde: int, hasta: int) -> int:
+        """Cantidad de citas programadas que empiezan dentro de [desde, hasta)
+        
+        La agenda también guarda las completadas, que siguen ocupando su
+        horario; solo se cuentan las que están entre las activas.
+        """
+        agenda = self.agenda
+        return sum(1 for cita_id in agenda.ids_que_empiezan_entre(desde, hasta)
+                   if cita_id in self._activas)
+    
+    def mostrar_info(self) -> str:
+        return f"Doctor {self._id}: Dr. {self._nombre} - {self._especialidad}"
+    
+    def obtener_citas_activas(self) -> List['Cita']:
+        """Retorna las citas activas del doctor"""
+        self._asegurar_citas()
+        return list(self._activas.values())
+
+
+class Cita:
+    """Clase que representa una cita médica
+    
+    Para ocupar poco espacio con millones de citas se usan __slots__, la fecha
+    y hora se guardan como un entero (minutos desde EPOCA), el estado como un
+    código de ESTADOS_CITA y los motivos repetidos se internan.
+    """
+    
+    __slots__ = ("_id", "_paciente", "_doctor", "_inicio", "_duracion", "_motivo", "_estado")
+    
+    def __init__(self, id: str, paciente: Paciente, doctor: Doctor, 
+                 fecha: str, hora: str, motivo: str, estado: str = "Programada",
+                 duracion: int = DURACION_CITA_MINUTOS):
+        if estado not in CODIGOS_ESTADO:
+            raise ValueError("Estado no válido")
+        self._id = id
+        self._paciente = paciente
+        self._doctor = doctor
+        self._inicio = convertir_a_minutos(fecha, hora)
+        self._duracion = duracion
+        self._motivo = sys.intern(motivo)
+        self._estado = CODIGOS_ESTADO[estado]
+        
+        # Agregar la cita al doctor (valida el horario) y al paciente
+        doctor.agregar_cita(self)
+        paciente.agregar_cita(self)
+    
+    @property
+    def id(self) -> str:
+        return self._id
+    
+    @property
+    def paciente(self) -> Paciente:
+        return self._paciente
+    
+    @property
+    def doctor(self) -> Doctor:
+        return self._doctor
+    
+    @property
+    def fecha(self) -> str:
+        return convertir_desde_minutos(self._inicio)[0]
+    
+    @property
+    def hora(self) -> str:
+        return convertir_desde_minutos(self._inicio)[1]
+    
+    @property
+    def inicio(self) -> int:
+        return self._inicio
+    
+    @property
+    def fin(self) -> int:
+        return self._inicio + self._duracion
+    
+    @property
+    def duracion(self) -> int:
+        return self._duracion
+    
+    @property
+    def motivo(self) -> str:
+        return self._motivo
+    
+    @property
+    def estado(self) -> str:
+        return ESTADOS_CITA[self._estado]
+    
+    @estado.setter
+    def estado(self, value: str):
+        codigo = CODIGOS_ESTADO.get(value)
+        if codigo is None:
+            raise ValueError("Estado no válido")
+        anterior = self._estado
+        if codigo == anterior:
+            return
+        
+        # Una cita cancelada deja de ocupar la agenda del doctor
+        if codigo == CANCELADA:
+            self._doctor.liberar_horario(self)
+        elif anterior == CANCELADA:
+            self._doctor.reservar_horario(self)
+        self._estado = codigo
+        self._paciente.notificar_cambio_estado(self, ESTADOS_CITA[anterior])
+        self._doctor.notificar_cambio_estado(self, ESTADOS_CITA[anterior])
+    
+    @property
+    def codigo_estado(self) -> int:
+        """Índice del estado en ESTADOS_CITA (para columnas compactas)"""
+        return self._estado
+    
+    def desvincular(self):
+        """Deshace lo que el constructor hizo en el doctor y el paciente"""
+        self._doctor.quitar_cita(self)
+        self._paciente.quitar_cita(self)
+    
+    def mostrar_info(self) -> str:
+        estado_icono = "✅" if self._estado == PROGRAMADA else "❌"
+        fecha, hora = convertir_desde_minutos(self._inicio)
+        return (f"Cita {self._id}: {self._paciente.nombre} con Dr. {self._doctor.nombre}\n"
+                f"   📅 {fecha} {hora} - {self._motivo}\n"
+                f"   Estado: {estado_icono} {ESTADOS_CITA[self._estado]}")
+    
+    def __str__(self) -> str:
+        return self.mostrar_info()
+
+
+class AlmacenColumnarCitas:
+    """Almacén compacto de citas en columnas (arreglos) para históricos grandes
+    
+    Cada cita ocupa unas pocas posiciones de arreglos tipados en lugar de un
+    objeto; pacientes, doctores y motivos se guardan una sola vez y las
+    columnas solo contienen su índice. Se accede a las citas mediante vistas
+    (VistaCita) que exponen las mismas propiedades que Cita, de solo lectura:
+    el almacén es una copia para consultar históricos, no reserva agendas ni
+    avisa cambios, así que los estados se cambian en la Cita original.
+    """
+    
+    def __init__(self):
+        self._ids: List[str] = []
+        self._posiciones: Dict[str, int] = {}
+        self._paciente = array("I")
+        self._doctor = array("I")
+        self._inicio = array("q")
+        self._duracion = array("H")
+        self._estado = array("B")
+        self._motivo = array("I")
+        self._pacientes: List[Paciente] = []
+        self._doctores: List[Doctor] = []
+        self._motivos: List[str] = []
+        self._indices: Dict[str, Dict[object, int]] = {"paciente": {}, "doctor": {}, "motivo": {}}
+    
+    @classmethod
+    def desde_citas(cls, citas: Iterable[Cita]) -> 'AlmacenColumnarCitas':
+        almacen = cls()
+        for cita in citas:
+            almacen.agregar(cita)
+        return almacen
+    
+    def _referencia(self, tabla: str, valores: list, clave, valor) -> int:
+        indice = self._indices[tabla].get(clave)
+        if indice is None:
+            indice = self._indices[tabla][clave] = len(valores)
+            valores.append(valor)
+        return indice
+    
+    def agregar_fila(self, id: str, paciente: Paciente, doctor: Doctor, inicio: int,
+                     duracion: int, motivo: str, estado: str) -> bool:
+        """Agrega una cita a partir de sus valores; retorna False si el ID ya existe"""
+        if id in self._posiciones:
+            return False
+        self._posiciones[id] = len(self._ids)
+        self._ids.append(id)
+        self._paciente.append(self._referencia("paciente", self._pacientes, paciente.id, paciente))
+        self._doctor.append(self._referencia("doctor", self._doctores, doctor.id, doctor))
+        self._motivo.append(self._referencia("motivo", self._motivos, motivo, motivo))
+        self._inicio.append(inicio)
+        self._duracion.append(duracion)
+        self._estado.append(CODIGOS_ESTADO[estado])
+        return True
+    
+    def agregar(self, cita: Cita) -> bool:
+        """Copia una cita al almacén"""
+        return self.agregar_fila(cita.id, cita.paciente, cita.doctor, cita.inicio,
+                                 cita.duracion, cita.motivo, cita.estado)
+    
+    def obtener(self, cita_id: str) -> Optional['VistaCita']:
+        posicion = self._posiciones.get(cita_id)
+        return VistaCita(self, posicion) if posicion is not None else None
+    
+    def __getitem__(self, posicion: int) -> 'VistaCita':
+        if posicion < 0:
+            posicion += len(self._ids)
+        if not 0 <= posicion < len(self._ids):
+            raise IndexError("Posición fuera de rango")
+        return VistaCita(self, posicion)
+    
+    def __iter__(self) -> Iterator['VistaCita']:
+        for posicion in range(len(self._ids)):
+            yield VistaCita(self, posicion)
+    
+    def __len__(self) -> int:
+        return len(self._ids)
+
+
+class VistaCita:
+    """Vista ligera de solo lectura sobre una fila de AlmacenColumnarCitas con la interfaz de Cita"""
+    
+    __slots__ = ("_almacen", "_posicion")
+    
+    def __init__(self, almacen: AlmacenColumnarCitas, posicion: int):
+        self._almacen = almacen
+        self._posicion = posicion
+    
+    @property
+    def id(self) -> str:
+        return self._almacen._ids[self._posicion]
+    
+    @property
+    def paciente(self) -> Paciente:
+        return self._almacen._pacientes[self._almacen._paciente[self._posicion]]
+    
+    @property
+    def doctor(self) -> Doctor:
+        return self._almacen._doctores[self._almacen._doctor[self._posicion]]
+    
+    @property
+    def fecha(self) -> str:
+        return convertir_desde_minutos(self.inicio)[0]
+    
+    @property
+    def hora(self) -> str:
+        return convertir_desde_minutos(self.inicio)[1]
+    
+    @property
+    def inicio(self) -> int:
+        return self._almacen._inicio[self._posicion]
+    
+    @property
+    def fin(self) -> int:
+        return self.inicio + self.duracion
+    
+    @property
+    def duracion(self) -> int:
+        return self._almacen._duracion[self._posicion]
+    
+    @property
+    def motivo(self) -> str:
+        return self._almacen._motivos[self._almacen._motivo[self._posicion]]
+    
+    @property
+    def estado(self) -> str:
+        return ESTADOS_CITA[self._almacen._estado[self._posicion]]
+    
+    @property
+    def codigo_estado(self) -> int:
+        return self._almacen._estado[self._posicion]
+    
+    def mostrar_info(self) -> str:
+        estado_icono = "✅" if self.estado == "Programada" else "❌"
+        return (f"Cita {self.id}: {self.paciente.nombre} con Dr. {self.doctor.nombre}\n"
+                f"   📅 {self.fecha} {self.hora} - {self.motivo}\n"
+                f"   Estado: {estado_icono} {self.estado}")
+    
+    def __str__(self) -> str:
+        return self.mostrar_info()
+
+
+def json_paciente(paciente: Paciente) -> dict:
+    return {"id": paciente.id, "nombre": paciente.nombre, "telefono": paciente.telefono,
+            "email": paciente.email, "edad": paciente.edad,
+            "historial_medico": paciente.historial_medico}
+
+
+def json_doctor(doctor: Doctor) -> dict:
+    return {"id": doctor.id, "nombre": doctor.nombre, "telefono": doctor.telefono,
+            "email": doctor.email, "especialidad": doctor.especialidad, "horario": doctor.horario}
+
+
+def json_cita(cita: Cita) -> dict:
+    return {"id": cita.id, "paciente_id": cita.paciente.id, "doctor_id": cita.doctor.id,
+            "fecha": cita.fecha, "hora": cita.hora, "duracion": cita.duracion,
+            "motivo": cita.motivo, "estado": cita.estado}
@@ -0,0 +1,220 @@
+"""
+LISTA DE ESPERA
+Pacientes en espera por especialidad que ocupan los huecos liberados
+"""
+
+from typing import List, Dict, Optional, Iterator, Callable, Tuple, NamedTuple
+import time
+
+from entidades import Cita, Doctor
+from eventos import Evento
+from fechas import (ColaPrioridadIndexada, DURACION_CITA_MINUTOS, MINUTOS_POR_DIA,
+                    convertir_a_minutos, convertir_desde_minutos, minutos_actuales)
+from identificadores import GestorIDs
+from indices import normalizar_texto
+from metricas import HistogramaLatencias
+
+
+class SolicitudEspera(NamedTuple):
+    """Pedido de un paciente para ocupar un hueco que se libere entre dos días"""
+    id: str
+    paciente_id: str
+    especialidad: str
+    doctor_id: str      # vacío: cualquier doctor de la especialidad
+    desde: int          # días desde EPOCA, ambos incluidos
+    hasta: int
+    urgencia: int       # mayor es más urgente
+    creada: float       # time.time() al pedirla
+    motivo: str
+    
+    @property
+    def prioridad(self) -> tuple:
+        """Primero la más urgente y, a igual urgencia, la más antigua"""
+        return (-self.urgencia, self.creada, self.id)
+
+
+def json_solicitud(solicitud: SolicitudEspera) -> dict:
+    datos = solicitud._asdict()
+    datos["desde"] = convertir_desde_minutos(solicitud.desde * MINUTOS_POR_DIA)[0]
+    datos["hasta"] = convertir_desde_minutos(solicitud.hasta * MINUTOS_POR_DIA)[0]
+    return datos
+
+
+class ListaEspera:
+    """Lista de espera que ofrece cada hueco liberado al mejor candidato
+    
+    Cada solicitud entra en una ColaPrioridadIndexada por día de su ventana,
+    de su doctor si lo pidió o de la especialidad (normalizada) si no. Al
+    cancelarse una cita futura (evento cita.estado) se comparan las cimas de
+    las colas del doctor y de su especialidad para ese día, así que cada
+    candidato sale en O(log n) sin recorrer la lista. Se saltan los que ya
+    tienen otra cita a esa hora, revisando sus citas activas, hasta
+    MAX_CANDIDATOS por hueco. La cita nueva se reserva dentro de la misma
+    cancelación, antes de que otra escritura pueda tomar el hueco, pero
+    recién después de guardarla (SistemaCitasMedicas.al_guardar): así el
+    repositorio nunca tiene la cita nueva sin la cancelación que le dejó
+    lugar. Dentro de un lote el relleno espera a confirmarlo.
+    
+    Una solicitud atendida o retirada sale del índice de inmediato, pero sus
+    entradas en las colas de otros días se descartan al llegar a la cima o al
+    pasar el día: quitarlas todas encarecería cada relleno por el ancho de la
+    ventana.
+    
+    Las solicitudes viven en memoria mientras corre el proceso.
+    """
+    
+    MAX_DIAS_VENTANA = 60
+    MAX_CANDIDATOS = 20  # candidatos a revisar por hueco antes de dejarlo libre
+    
+    def __init__(self, sistema: 'SistemaCitasMedicas', reloj: Callable[[], float] = minutos_actuales):
+        self._sistema = sistema
+        self._reloj = reloj
+        self._colas: Dict[Tuple[str, str, int], ColaPrioridadIndexada] = {}
+        self._solicitudes: Dict[str, SolicitudEspera] = {}
+        self._secuencia = 0
+        self._dia_purgado = 0
+        self.liberados = 0
+        self.rellenados = 0
+        self.latencias = HistogramaLatencias()  # de la cancelación a la cita nueva
+        self._espera_total = 0.0                # segundos en lista de las solicitudes atendidas
+    
+    def iniciar(self):
+        self._sistema.eventos.suscribir(self._al_cambiar_cita, ("cita.estado",))
+    
+    def detener(self):
+        self._sistema.eventos.desuscribir(self._al_cambiar_cita)
+    
+    @staticmethod
+    def _claves(solicitud: SolicitudEspera) -> Iterator[Tuple[str, str, int]]:
+        grupo = ("doctor", solicitud.doctor_id) if solicitud.doctor_id else \
+            ("especialidad", normalizar_texto(solicitud.especialidad))
+        for dia in range(solicitud.desde, solicitud.hasta + 1):
+            yield (*grupo, dia)
+    
+    def agregar(self, paciente_id: str, especialidad: str = "", doctor_id: str = "",
+                desde_fecha: Optional[str] = None, hasta_fecha: Optional[str] = None,
+                urgencia: int = 0, motivo: str = "Lista de espera") -> SolicitudEspera:
+        """Anota al paciente para el primer hueco que se libere en la ventana (por defecto 30 días)"""
+        if self._sistema.buscar_paciente_por_id(paciente_id) is None:
+            raise ValueError(f"Paciente {paciente_id} no encontrado")
+        if doctor_id:
+            doctor = self._sistema.buscar_doctor_por_id(doctor_id)
+            if doctor is None:
+                raise ValueError(f"Doctor {doctor_id} no encontrado")
+            especialidad = doctor.especialidad
+        else:
+            doctores = self._sistema.doctores_de_especialidad(especialidad)
+            if not doctores:
+                raise ValueError(f"Especialidad no encontrada: {especialidad or '(vacía)'}")
+            especialidad = doctores[0].especialidad
+        hoy = int(self._reloj()) // MINUTOS_POR_DIA
+        desde = convertir_a_minutos(desde_fecha, "00:00") // MINUTOS_POR_DIA if desde_fecha else hoy
+        hasta = convertir_a_minutos(hasta_fecha, "00:00") // MINUTOS_POR_DIA if hasta_fecha else desde + 30
+        desde = max(desde, hoy)
+        if hasta < desde:
+            raise ValueError("La ventana de espera ya pasó o termina antes de empezar")
+        if hasta - desde >= self.MAX_DIAS_VENTANA:
+            raise ValueError(f"La ventana de espera no puede superar {self.MAX_DIAS_VENTANA} días")
+        
+        self._secuencia += 1
+        solicitud = SolicitudEspera(f"E{self._secuencia:08d}", paciente_id, especialidad, doctor_id,
+                                    desde, hasta, int(urgencia), time.time(), motivo)
+        self._solicitudes[solicitud.id] = solicitud
+        for clave in self._claves(solicitud):
+            cola = self._colas.get(clave)
+            if cola is None:
+                cola = self._colas[clave] = ColaPrioridadIndexada()
+            cola.poner(solicitud.id, solicitud.prioridad)
+        return solicitud
+    
+    def retirar(self, solicitud_id: str) -> bool:
+        """Da de baja una solicitud; sus entradas en las colas quedan sin efecto"""
+        return self._solicitudes.pop(solicitud_id, None) is not None
+    
+    def obtener(self, solicitud_id: str) -> Optional[SolicitudEspera]:
+        return self._solicitudes.get(solicitud_id)
+    
+    def _purgar(self, hoy: int):
+        """Descarta las colas de días pasados y las solicitudes ya vencidas"""
+        if hoy <= self._dia_purgado:
+            return
+        self._dia_purgado = hoy
+        for solicitud in [s for s in self._solicitudes.values() if s.hasta < hoy]:
+            self.retirar(solicitud.id)
+        for clave in [clave for clave in self._colas if clave[2] < hoy]:
+            del self._colas[clave]
+    
+    def _al_cambiar_cita(self, evento: Evento):
+        if evento.datos.get("estado") != "Cancelada":
+            return
+        cita = self._sistema.buscar_cita_por_id(evento.id)
+        ahora = self._reloj()
+        if cita is None or cita.inicio <= ahora:
+            return
+        self._purgar(int(ahora) // MINUTOS_POR_DIA)
+        self.liberados += 1
+        inicio = time.perf_counter()
+        self._sistema.al_guardar(lambda: self._rellenar_liberado(cita, inicio))
+    
+    def _rellenar_liberado(self, cita: Cita, inicio: float):
+        if self.rellenar(cita.doctor, cita.inicio, cita.duracion) is not None:
+            self.rellenados += 1
+            self.latencias.observar(time.perf_counter() - inicio)
+    
+    def rellenar(self, doctor: Doctor, inicio: int, duracion: int = DURACION_CITA_MINUTOS) -> Optional[Cita]:
+        """Reserva el hueco para el mejor candidato en espera; retorna la cita o None"""
+        dia = inicio // MINUTOS_POR_DIA
+        especialidad = normalizar_texto(doctor.especialidad)
+        colas = [cola for cola in (self._colas.get(("doctor", doctor.id, dia)),
+                                   self._colas.get(("especialidad", especialidad, dia)))
+                 if cola]
+        saltadas: List[Tuple[ColaPrioridadIndexada, tuple, str]] = []
+        try:
+            while len(saltadas) < self.MAX_CANDIDATOS:
+                cimas = [(cola.cima(), cola) for cola in colas if cola]
+                if not cimas:
+                    return None
+                (prioridad, solicitud_id), cola = min(cimas, key=lambda cima: cima[0])
+                solicitud = self._solicitudes.get(solicitud_id)
+                if solicitud is None:
+                    cola.quitar(solicitud_id)  # ya atendida o retirada
+                    continue
+                paciente = self._sistema.buscar_paciente_por_id(solicitud.paciente_id)
+                if paciente is None or any(otra.inicio < inicio + duracion and inicio < otra.fin
+                                           for otra in paciente.obtener_citas_activas()):
+                    cola.quitar(solicitud_id)
+                    saltadas.append((cola, prioridad, solicitud_id))
+                    continue
+                fecha, hora = convertir_desde_minutos(inicio)
+                try:
+                    cita = Cita(GestorIDs.generar_id("cita"), paciente, doctor, fecha, hora,
+                                solicitud.motivo, duracion=duracion)
+                except ValueError:
+                    return None  # el hueco no admite la cita (p. ej. ya se volvió a ocupar)
+                cola.quitar(solicitud_id)
+                self.retirar(solicitud_id)
+                self._sistema.agregar_cita(cita)
+                self._espera_total += time.time() - solicitud.creada
+                return cita
+            return None
+        finally:
+            for cola, prioridad, solicitud_id in saltadas:
+                if solicitud_id in self._solicitudes:
+                    cola.poner(solicitud_id, prioridad)
+    
+    def metricas(self) -> dict:
+        """Huecos liberados y rellenados, latencia del relleno y espera promedio"""
+        return {
+            "solicitudes_pendientes": len(self._solicitudes),
+            "huecos_liberados": self.liberados,
+            "huecos_rellenados": self.rellenados,
+            "tasa_relleno": round(self.rellenados / self.liberados, 4) if self.liberados else 0.0,
+            "latencia_p50_ms": round(self.latencias.percentil(50) * 1000, 3),
+            "latencia_p99_ms": round(self.latencias.percentil(99) * 1000, 3),
+            "latencia_max_ms": round(self.latencias.maximo * 1000, 3),
+            "espera_promedio_h": round(self._espera_total / self.rellenados / 3600, 2)
+            if self.rellenados else 0.0,
+        }
+    
+    def __len__(self) -> int:
+        return len(self._solicitudes)
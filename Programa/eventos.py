@@ -0,0 +1,307 @@
+"""
+EVENTOS
+Registro de eventos con offsets en disco y bus de publicación a suscriptores
+"""
+
+from collections import deque
+from itertools import islice
+from typing import List, Optional, Iterator, Iterable, Callable, Tuple, NamedTuple
+import json
+import os
+import struct
+import sys
+import threading
+import time
+
+
+# Tipos de evento que publica SistemaCitasMedicas; los cambios de estado
+# (incluida la cancelación) llevan en sus datos el estado anterior y el nuevo
+TIPOS_EVENTO = ("paciente.agregado", "doctor.agregado", "cita.agregada", "cita.estado")
+
+
+class Evento(NamedTuple):
+    """Cambio del sistema con su posición (offset) en el orden de publicación"""
+    offset: int
+    tipo: str
+    id: str
+    datos: dict
+    momento: float
+
+
+class RegistroEventos:
+    """Registro de eventos en disco, de solo anexado y legible desde cualquier offset
+    
+    Cada evento es una línea JSON en `ruta`; el archivo `ruta + '.idx'` guarda
+    por offset (desde 1) la posición en bytes de su línea como un entero de 8
+    bytes, así que leer desde un offset es un salto directo sin recorrer lo
+    anterior. Al abrir para escribir se descarta una línea que quedó sin
+    índice o incompleta tras una caída. Otros procesos pueden leerlo mientras
+    se escribe.
+    """
+    
+    def __init__(self, ruta: str, solo_lectura: bool = False):
+        self._ruta = ruta
+        self._ruta_indice = ruta + ".idx"
+        self._archivo = self._indice = None
+        self._ultimo = 0
+        if solo_lectura:
+            return
+        with open(ruta, "ab"), open(self._ruta_indice, "ab"):
+            pass
+        self._ultimo, fin = self._reparar()
+        self._archivo = open(ruta, "ab")
+        self._indice = open(self._ruta_indice, "ab")
+        self._posicion = fin
+    
+    def _reparar(self) -> Tuple[int, int]:
+        """Recorta registro e índice hasta el último evento completo; retorna (offset, fin)"""
+        cantidad = os.path.getsize(self._ruta_indice) // 8
+        fin = 0
+        with open(self._ruta_indice, "rb") as indice, open(self._ruta, "rb") as archivo:
+            while cantidad:
+                indice.seek((cantidad - 1) * 8)
+                fin, = struct.unpack("<Q", indice.read(8))
+                archivo.seek(fin)
+                linea = archivo.readline()
+                if linea.endswith(b"\n"):
+                    fin += len(linea)
+                    break
+                cantidad -= 1
+        for ruta, tamano in ((self._ruta, fin), (self._ruta_indice, cantidad * 8)):
+            if os.path.getsize(ruta) != tamano:
+                os.truncate(ruta, tamano)
+        return cantidad, fin
+    
+    @property
+    def ruta(self) -> str:
+        return self._ruta
+    
+    @property
+    def ultimo_offset(self) -> int:
+        """Offset del último evento escrito (al leer, el visible en disco)"""
+        if self._archivo is None:
+            return os.path.getsize(self._ruta_indice) // 8 if os.path.exists(self._ruta_indice) else 0
+        return self._ultimo
+    
+    def anexar(self, eventos: List[Evento]):
+        """Escribe los eventos, que deben continuar la numeración del registro"""
+        if self._archivo is None:
+            raise ValueError("El registro de eventos está abierto en modo de solo lectura")
+        lineas, posiciones = [], []
+        for evento in eventos:
+            if evento.offset != self._ultimo + 1:
+                raise ValueError(f"Offset fuera de orden: {evento.offset} tras {self._ultimo}")
+            linea = (json.dumps(evento._asdict(), ensure_ascii=False) + "\n").encode("utf-8")
+            posiciones.append(self._posicion)
+            lineas.append(linea)
+            self._posicion += len(linea)
+            self._ultimo = evento.offset
+        # Primero las líneas y luego el índice: un offset indexado siempre tiene su línea
+        self._archivo.write(b"".join(lineas))
+        self._archivo.flush()
+        self._indice.write(struct.pack(f"<{len(posiciones)}Q", *posiciones))
+        self._indice.flush()
+    
+    def leer(self, desde: int = 0, hasta: Optional[int] = None) -> Iterator[Evento]:
+        """Itera en orden los eventos con offset en (desde, hasta]"""
+        hasta = self.ultimo_offset if hasta is None else min(hasta, self.ultimo_offset)
+        if desde >= hasta:
+            return
+        with open(self._ruta_indice, "rb") as indice:
+            indice.seek(max(desde, 0) * 8)
+            posicion, = struct.unpack("<Q", indice.read(8))
+        with open(self._ruta, "rb") as archivo:
+            archivo.seek(posicion)
+            for linea in islice(archivo, hasta - max(desde, 0)):
+                yield Evento(**json.loads(linea))
+    
+    def cerrar(self):
+        for archivo in (self._archivo, self._indice):
+            if archivo is not None:
+                archivo.close()
+
+
+class SuscriptorEnCola:
+    """Suscriptor que recibe los eventos en lotes desde un hilo propio
+    
+    Quien publica solo agrega los eventos a la cola. El hilo espera hasta
+    `espera` segundos a que se junten `tamano_lote` eventos y llama a `oyente`
+    con la lista; los errores del oyente se cuentan y no detienen la entrega.
+    """
+    
+    def __init__(self, oyente: Callable[[List[Evento]], None], tipos: Iterable[str] = (),
+                 tamano_lote: int = 500, espera: float = 0.05):
+        self._oyente = oyente
+        self._tipos = frozenset(tipos)
+        self._tamano_lote = tamano_lote
+        self._espera = espera
+        self._cola: deque = deque()
+        self._condicion = threading.Condition()
+        self._hilo: Optional[threading.Thread] = None
+        self._detenido = False
+        self.entregados = 0
+        self.fallidos = 0
+        self.ultimo_offset = 0
+    
+    def acepta_tipo(self, tipo: str) -> bool:
+        return not self._tipos or tipo in self._tipos
+    
+    def acepta(self, evento: Evento) -> bool:
+        return self.acepta_tipo(evento.tipo)
+    
+    def encolar(self, eventos: List[Evento]):
+        with self._condicion:
+            antes = len(self._cola)
+            self._cola.extend(evento for evento in eventos if self.acepta(evento))
+            # Despertar al hilo solo si estaba sin trabajo o ya hay un lote completo
+            if not antes or len(self._cola) >= self._tamano_lote:
+                self._condicion.notify()
+    
+    def iniciar(self, recuperar: Optional[Iterator[Evento]] = None):
+        """Arranca el hilo; `recuperar` son eventos pasados a entregar antes que los nuevos"""
+        self._hilo = threading.Thread(target=self._ejecutar, args=(recuperar,),
+                                      name="eventos", daemon=True)
+        self._hilo.start()
+    
+    def _ejecutar(self, recuperar: Optional[Iterator[Evento]]):
+        if recuperar is not None:
+            filtrados = filter(self.acepta, recuperar)
+            while lote := list(islice(filtrados, self._tamano_lote)):
+                self._entregar(lote)
+        while True:
+            with self._condicion:
+                while not self._cola and not self._detenido:
+                    self._condicion.wait()
+                if not self._cola:
+                    return
+                if len(self._cola) < self._tamano_lote and not self._detenido:
+                    self._condicion.wait(self._espera)
+                lote = [self._cola.popleft() for _ in range(min(self._tamano_lote, len(self._cola)))]
+            self._entregar(lote)
+    
+    def _entregar(self, lote: List[Evento]):
+        try:
+            self._oyente(lote)
+            self.entregados += len(lote)
+        except Exception as e:
+            self.fallidos += len(lote)
+            print(f"❌ Suscriptor de eventos: {e}", file=sys.stderr)
+        self.ultimo_offset = lote[-1].offset
+    
+    @property
+    def pendientes(self) -> int:
+        return len(self._cola)
+    
+    def detener(self):
+        """Entrega lo que queda en la cola y termina el hilo"""
+        with self._condicion:
+            self._detenido = True
+            self._condicion.notify()
+        if self._hilo is not None:
+            self._hilo.join()
+            self._hilo = None
+
+
+class BusEventos:
+    """Publica los cambios de SistemaCitasMedicas para quien quiera reaccionar a ellos
+    
+    Los suscriptores síncronos se llaman dentro de la operación que generó el
+    evento, en el mismo hilo. Los suscriptores en cola reciben los eventos en
+    lotes desde su propio hilo sin frenar a quien publica. Con un
+    RegistroEventos cada evento queda en disco con su offset y un consumidor
+    puede ponerse al día desde el último que procesó. Sin suscriptores ni
+    registro el sistema no arma los eventos.
+    """
+    
+    def __init__(self, registro: Optional[RegistroEventos] = None):
+        self._registro = registro
+        self._offset = registro.ultimo_offset if registro else 0
+        self._sincronos: List[Tuple[Callable[[Evento], None], frozenset]] = []
+        self._en_cola: List[SuscriptorEnCola] = []
+        self._bloqueo = threading.Lock()
+    
+    def escucha(self, tipo: str) -> bool:
+        """Indica si un evento de este tipo llegaría a alguien (registro o suscriptor)"""
+        return (self._registro is not None
+                or any(not tipos or tipo in tipos for _, tipos in self._sincronos)
+                or any(suscriptor.acepta_tipo(tipo) for suscriptor in self._en_cola))
+    
+    @property
+    def registro(self) -> Optional[RegistroEventos]:
+        return self._registro
+    
+    @property
+    def ultimo_offset(self) -> int:
+        return self._offset
+    
+    def suscribir(self, oyente: Callable[[Evento], None], tipos: Iterable[str] = ()):
+        """Llama a `oyente` con cada evento de los tipos indicados (todos si no se indican)"""
+        if all(registrado is not oyente for registrado, _ in self._sincronos):
+            self._sincronos.append((oyente, frozenset(tipos)))
+    
+    def desuscribir(self, oyente: Callable[[Evento], None]):
+        self._sincronos = [(registrado, tipos) for registrado, tipos in self._sincronos
+                           if registrado is not oyente]
+    
+    def suscribir_en_cola(self, oyente: Callable[[List[Evento]], None], tipos: Iterable[str] = (),
+                          tamano_lote: int = 500, espera: float = 0.05,
+                          desde: Optional[int] = None) -> SuscriptorEnCola:
+        """Entrega los eventos en lotes desde otro hilo
+        
+        Con `desde` primero se entregan los eventos del registro posteriores a
+        ese offset y luego, sin huecos ni repetidos, los que se publiquen.
+        """
+        suscriptor = SuscriptorEnCola(oyente, tipos, tamano_lote, espera)
+        with self._bloqueo:
+            recuperar = None
+            if desde is not None:
+                if self._registro is None:
+                    raise ValueError("Sin registro de eventos no hay desde dónde recuperar")
+                recuperar = self._registro.leer(desde, self._offset)
+            self._en_cola.append(suscriptor)
+            suscriptor.iniciar(recuperar)
+        return suscriptor
+    
+    def desuscribir_en_cola(self, suscriptor: SuscriptorEnCola):
+        with self._bloqueo:
+            if suscriptor in self._en_cola:
+                self._en_cola.remove(suscriptor)
+        suscriptor.detener()
+    
+    def publicar(self, tipo: str, id: str, datos: dict) -> Evento:
+        return self.publicar_lote([(tipo, id, datos)])[0]
+    
+    def publicar_lote(self, cambios: Iterable[Tuple[str, str, dict]]) -> List[Evento]:
+        """Numera y publica varios eventos con una sola escritura al registro"""
+        momento = time.time()
+        with self._bloqueo:
+            eventos = []
+            for tipo, id, datos in cambios:
+                self._offset += 1
+                eventos.append(Evento(self._offset, tipo, id, datos, momento))
+            if not eventos:
+                return eventos
+            if self._registro is not None:
+                self._registro.anexar(eventos)
+            for suscriptor in self._en_cola:
+                suscriptor.encolar(eventos)
+        for oyente, tipos in self._sincronos:
+            for evento in eventos:
+                if not tipos or evento.tipo in tipos:
+                    oyente(evento)
+        return eventos
+    
+    def leer(self, desde: int = 0) -> Iterator[Evento]:
+        """Itera los eventos del registro posteriores al offset `desde`"""
+        if self._registro is None:
+            raise ValueError("Sin registro de eventos no hay historial que leer")
+        return self._registro.leer(desde, self._offset)
+    
+    def cerrar(self):
+        """Entrega lo pendiente a los suscriptores en cola y cierra el registro"""
+        with self._bloqueo:
+            suscriptores, self._en_cola = self._en_cola, []
+        for suscriptor in suscriptores:
+            suscriptor.detener()
+        if self._registro is not None:
+            self._registro.cerrar()
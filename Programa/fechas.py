@@ -0,0 +1,332 @@
+"""
+FECHAS Y AGENDAS
+Conversión entre fecha/hora y minutos, horarios, agendas y estructuras ordenadas por tiempo
+"""
+
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import List, Dict, Optional, Iterator, Tuple
+
+
+FORMATO_FECHA = "%d/%m/%Y"
+FORMATO_HORA = "%H:%M"
+DURACION_CITA_MINUTOS = 30
+MINUTOS_POR_DIA = 24 * 60
+EPOCA = datetime(1970, 1, 1)
+DIAS_SEMANA = ["Lunes", "Martes", "Miércoles", "Jueves", "Viernes", "Sábado", "Domingo"]
+
+
+# Las citas guardan su estado como un código entero (índice en ESTADOS_CITA)
+ESTADOS_CITA = ("Programada", "Cancelada", "Completada")
+CODIGOS_ESTADO = {estado: codigo for codigo, estado in enumerate(ESTADOS_CITA)}
+PROGRAMADA, CANCELADA, COMPLETADA = range(len(ESTADOS_CITA))
+
+
+def convertir_a_minutos(fecha: str, hora: str) -> int:
+    """Convierte una fecha DD/MM/AAAA y una hora HH:MM en minutos desde EPOCA"""
+    return _convertir_a_minutos(fecha.strip(), hora.strip())
+
+
+# Las cargas masivas repiten pocas combinaciones de fecha y hora; strptime es lo costoso
+@lru_cache(maxsize=1 << 16)
+def _convertir_a_minutos(fecha: str, hora: str) -> int:
+    try:
+        momento = datetime.strptime(f"{fecha} {hora}", f"{FORMATO_FECHA} {FORMATO_HORA}")
+    except ValueError:
+        raise ValueError("Fecha u hora no válida (use DD/MM/AAAA y HH:MM)") from None
+    return (momento - EPOCA) // timedelta(minutes=1)
+
+
+def convertir_desde_minutos(minutos: int) -> Tuple[str, str]:
+    """Convierte minutos desde EPOCA en una tupla (fecha, hora)"""
+    momento = EPOCA + timedelta(minutes=minutos)
+    return momento.strftime(FORMATO_FECHA), momento.strftime(FORMATO_HORA)
+
+
+def dia_semana(dia: int) -> int:
+    """Retorna el día de la semana (0 = Lunes) de un número de día desde EPOCA"""
+    return (EPOCA.weekday() + dia) % 7
+
+
+def compilar_horario(horario: Dict[str, List[str]]) -> Tuple[Tuple[Tuple[int, int], ...], ...]:
+    """Convierte un horario semanal {"Lunes": ["09:00-17:00"]} en rangos de minutos
+    
+    El resultado es una tupla de 7 elementos (Lunes a Domingo) con los rangos
+    (inicio, fin) del día expresados en minutos desde las 00:00.
+    """
+    semana: List[List[Tuple[int, int]]] = [[] for _ in DIAS_SEMANA]
+    for dia, rangos in horario.items():
+        if dia not in DIAS_SEMANA:
+            raise ValueError(f"Día de horario no válido: {dia}")
+        for rango in rangos:
+            try:
+                desde, hasta = (datetime.strptime(parte.strip(), FORMATO_HORA)
+                                for parte in rango.split("-"))
+            except ValueError:
+                raise ValueError(f"Rango de horario no válido: {rango}") from None
+            inicio = desde.hour * 60 + desde.minute
+            fin = hasta.hour * 60 + hasta.minute
+            if fin <= inicio:
+                raise ValueError(f"Rango de horario no válido: {rango}")
+            semana[DIAS_SEMANA.index(dia)].append((inicio, fin))
+    return tuple(tuple(sorted(rangos)) for rangos in semana)
+
+
+class AgendaDoctor:
+    """Índice ordenado de los intervalos ocupados de un doctor
+    
+    Los intervalos [inicio, fin) se guardan en listas paralelas ordenadas por
+    inicio. Como la agenda nunca contiene solapamientos, también quedan
+    ordenados por fin y cualquier conflicto se detecta con una búsqueda
+    binaria sobre los vecinos del intervalo candidato.
+    """
+    
+    __slots__ = ("_inicios", "_fines", "_ids", "_versiones")
+    
+    def __init__(self):
+        self._inicios: List[int] = []
+        self._fines: List[int] = []
+        self._ids: List[str] = []
+        self._versiones: Dict[int, int] = {}
+    
+    def version_dia(self, dia: int) -> int:
+        """Retorna un contador que cambia cada vez que se modifica el día"""
+        return self._versiones.get(dia, 0)
+    
+    def _marcar_cambio(self, inicio: int, fin: int):
+        for dia in range(inicio // MINUTOS_POR_DIA, (fin - 1) // MINUTOS_POR_DIA + 1):
+            self._versiones[dia] = self._versiones.get(dia, 0) + 1
+    
+    def ocupados_entre(self, inicio: int, fin: int) -> Iterator[Tuple[int, int]]:
+        """Itera los intervalos ocupados que se solapan con [inicio, fin)"""
+        posicion = bisect_right(self._inicios, inicio)
+        if posicion > 0 and self._fines[posicion - 1] > inicio:
+            posicion -= 1
+        while posicion < len(self._inicios) and self._inicios[posicion] < fin:
+            yield self._inicios[posicion], self._fines[posicion]
+            posicion += 1
+    
+    def ids_entre(self, inicio: int, fin: int) -> Iterator[str]:
+        """Itera en orden los IDs de las citas que se solapan con [inicio, fin)"""
+        posicion = bisect_right(self._inicios, inicio)
+        if posicion > 0 and self._fines[posicion - 1] > inicio:
+            posicion -= 1
+        while posicion < len(self._inicios) and self._inicios[posicion] < fin:
+            yield self._ids[posicion]
+            posicion += 1
+    
+    def contar_entre(self, inicio: int, fin: int) -> int:
+        """Cuenta las citas que empiezan dentro de [inicio, fin)"""
+        return bisect_left(self._inicios, fin) - bisect_left(self._inicios, inicio)
+    
+    def ids_que_empiezan_entre(self, inicio: int, fin: int) -> List[str]:
+        """Retorna en orden los IDs de las citas que empiezan dentro de [inicio, fin)"""
+        return self._ids[bisect_left(self._inicios, inicio):bisect_left(self._inicios, fin)]
+    
+    def buscar_conflicto(self, inicio: int, fin: int) -> Optional[str]:
+        """Retorna el ID de la cita que se solapa con [inicio, fin) o None"""
+        posicion = bisect_right(self._inicios, inicio)
+        if posicion > 0 and self._fines[posicion - 1] > inicio:
+            return self._ids[posicion - 1]
+        if posicion < len(self._inicios) and self._inicios[posicion] < fin:
+            return self._ids[posicion]
+        return None
+    
+    def esta_libre(self, inicio: int, fin: int) -> bool:
+        """Indica si el intervalo [inicio, fin) no se solapa con ninguna cita"""
+        return self.buscar_conflicto(inicio, fin) is None
+    
+    def reservar(self, inicio: int, fin: int, cita_id: str) -> bool:
+        """Ocupa el intervalo si está libre"""
+        if fin <= inicio or not self.esta_libre(inicio, fin):
+            return False
+        posicion = bisect_right(self._inicios, inicio)
+        self._inicios.insert(posicion, inicio)
+        self._fines.insert(posicion, fin)
+        self._ids.insert(posicion, cita_id)
+        self._marcar_cambio(inicio, fin)
+        return True
+    
+    def liberar(self, inicio: int, cita_id: str) -> bool:
+        """Libera el intervalo que ocupa la cita indicada"""
+        posicion = bisect_left(self._inicios, inicio)
+        if posicion < len(self._inicios) and self._ids[posicion] == cita_id:
+            self._marcar_cambio(self._inicios[posicion], self._fines[posicion])
+            del self._inicios[posicion]
+            del self._fines[posicion]
+            del self._ids[posicion]
+            return True
+        return False
+    
+    def __len__(self) -> int:
+        return len(self._inicios)
+
+
+class IndiceTemporal:
+    """Índice global de elementos ordenados por minuto de inicio
+    
+    Los elementos se agrupan en cubetas por día, cada una con listas paralelas
+    de inicios y elementos ordenadas por inicio; los días con datos se guardan
+    en una lista ordenada. Una consulta por rango localiza el primer día con
+    búsqueda binaria y recorre solo las cubetas que caen dentro del rango.
+    """
+    
+    __slots__ = ("_dias", "_cubetas", "_cantidad")
+    
+    def __init__(self):
+        self._dias: List[int] = []
+        self._cubetas: Dict[int, Tuple[List[int], list]] = {}
+        self._cantidad = 0
+    
+    def agregar(self, inicio: int, elemento):
+        """Inserta un elemento manteniendo el orden por inicio"""
+        dia = inicio // MINUTOS_POR_DIA
+        cubeta = self._cubetas.get(dia)
+        if cubeta is None:
+            cubeta = self._cubetas[dia] = ([], [])
+            insort(self._dias, dia)
+        inicios, elementos = cubeta
+        posicion = bisect_right(inicios, inicio)
+        inicios.insert(posicion, inicio)
+        elementos.insert(posicion, elemento)
+        self._cantidad += 1
+    
+    def quitar(self, inicio: int, elemento) -> bool:
+        """Quita un elemento agregado con ese mismo inicio"""
+        cubeta = self._cubetas.get(inicio // MINUTOS_POR_DIA)
+        if cubeta is None:
+            return False
+        inicios, elementos = cubeta
+        for posicion in range(bisect_left(inicios, inicio), bisect_right(inicios, inicio)):
+            if elementos[posicion] is elemento:
+                del inicios[posicion]
+                del elementos[posicion]
+                self._cantidad -= 1
+                return True
+        return False
+    
+    def entre(self, desde: int, hasta: int) -> Iterator:
+        """Itera en orden los elementos con inicio en [desde, hasta)"""
+        posicion = bisect_left(self._dias, desde // MINUTOS_POR_DIA)
+        while posicion < len(self._dias):
+            dia = self._dias[posicion]
+            if dia * MINUTOS_POR_DIA >= hasta:
+                break
+            inicios, elementos = self._cubetas[dia]
+            yield from elementos[bisect_left(inicios, desde):bisect_left(inicios, hasta)]
+            posicion += 1
+    
+    def del_dia(self, dia: int) -> list:
+        """Retorna en orden los elementos que empiezan en el día indicado"""
+        cubeta = self._cubetas.get(dia)
+        return list(cubeta[1]) if cubeta else []
+    
+    def __iter__(self) -> Iterator:
+        for dia in self._dias:
+            yield from self._cubetas[dia][1]
+    
+    def __len__(self) -> int:
+        return self._cantidad
+
+
+class ColaPrioridadIndexada:
+    """Montículo binario de claves únicas con índice de posiciones
+    
+    Funciona como heapq, pero guarda la posición de cada clave en el
+    montículo: quitar una clave o cambiar su prioridad cuesta O(log n) y no
+    deja entradas muertas que haya que descartar al extraer. A igual
+    prioridad sale primero la clave menor.
+    """
+    
+    __slots__ = ("_monticulo", "_posiciones")
+    
+    def __init__(self):
+        self._monticulo: List[list] = []  # entradas [prioridad, clave]
+        self._posiciones: Dict[object, int] = {}
+    
+    def poner(self, clave, prioridad):
+        """Agrega la clave o actualiza su prioridad si ya estaba"""
+        posicion = self._posiciones.get(clave)
+        if posicion is None:
+            posicion = len(self._monticulo)
+            self._monticulo.append([prioridad, clave])
+            self._posiciones[clave] = posicion
+            self._subir(posicion)
+            return
+        entrada = self._monticulo[posicion]
+        anterior, entrada[0] = entrada[0], prioridad
+        if (prioridad, clave) < (anterior, clave):
+            self._subir(posicion)
+        else:
+            self._bajar(posicion)
+    
+    def quitar(self, clave) -> bool:
+        """Quita la clave; retorna False si no estaba"""
+        posicion = self._posiciones.pop(clave, None)
+        if posicion is None:
+            return False
+        ultima = self._monticulo.pop()
+        if posicion < len(self._monticulo):
+            self._monticulo[posicion] = ultima
+            self._posiciones[ultima[1]] = posicion
+            self._subir(posicion)
+            self._bajar(self._posiciones[ultima[1]])
+        return True
+    
+    def prioridad(self, clave):
+        posicion = self._posiciones.get(clave)
+        return None if posicion is None else self._monticulo[posicion][0]
+    
+    def cima(self) -> Optional[tuple]:
+        """Retorna (prioridad, clave) del menor elemento sin quitarlo"""
+        return tuple(self._monticulo[0]) if self._monticulo else None
+    
+    def extraer(self) -> tuple:
+        """Quita y retorna (prioridad, clave) del menor elemento"""
+        if not self._monticulo:
+            raise IndexError("La cola está vacía")
+        prioridad, clave = self._monticulo[0]
+        self.quitar(clave)
+        return prioridad, clave
+    
+    def _subir(self, posicion: int):
+        monticulo, posiciones = self._monticulo, self._posiciones
+        entrada = monticulo[posicion]
+        while posicion:
+            padre = (posicion - 1) >> 1
+            if monticulo[padre] <= entrada:
+                break
+            monticulo[posicion] = monticulo[padre]
+            posiciones[monticulo[posicion][1]] = posicion
+            posicion = padre
+        monticulo[posicion] = entrada
+        posiciones[entrada[1]] = posicion
+    
+    def _bajar(self, posicion: int):
+        monticulo, posiciones = self._monticulo, self._posiciones
+        entrada, cantidad = monticulo[posicion], len(monticulo)
+        while True:
+            hijo = 2 * posicion + 1
+            if hijo >= cantidad:
+                break
+            if hijo + 1 < cantidad and monticulo[hijo + 1] < monticulo[hijo]:
+                hijo += 1
+            if entrada <= monticulo[hijo]:
+                break
+            monticulo[posicion] = monticulo[hijo]
+            posiciones[monticulo[posicion][1]] = posicion
+            posicion = hijo
+        monticulo[posicion] = entrada
+        posiciones[entrada[1]] = posicion
+    
+    def __contains__(self, clave) -> bool:
+        return clave in self._posiciones
+    
+    def __len__(self) -> int:
+        return len(self._monticulo)
+
+
+def minutos_actuales() -> float:
+    """Minutos desde EPOCA según el reloj local (la misma escala que Cita.inicio)"""
+    return (datetime.now() - EPOCA) / timedelta(minutes=1)
@@ -0,0 +1,148 @@
+"""
+IDENTIFICADORES
+Reserva de identificadores por bloques, opcionalmente persistida entre procesos
+"""
+
+from typing import Dict, Optional, Iterator
+import json
+import os
+import threading
+
+try:
+    import fcntl  # Bloqueo de archivos entre procesos (solo POSIX)
+except ImportError:
+    fcntl = None
+
+
+class BloqueIDs:
+    """Rango de IDs reservado para un solo trabajador
+    
+    Se obtiene con GestorIDs.reservar_bloque y entrega sus IDs sin bloqueos;
+    no debe compartirse entre hilos.
+    """
+    
+    def __init__(self, prefijo: str, inicio: int, fin: int):
+        self._prefijo = prefijo
+        self._siguiente = inicio
+        self._fin = fin
+    
+    @property
+    def restantes(self) -> int:
+        return self._fin - self._siguiente
+    
+    def siguiente(self) -> str:
+        """Retorna el siguiente ID del bloque"""
+        if self._siguiente >= self._fin:
+            raise ValueError("Bloque de IDs agotado")
+        numero = self._siguiente
+        self._siguiente += 1
+        return GestorIDs.formatear(self._prefijo, numero)
+    
+    def __iter__(self) -> Iterator[str]:
+        while self._siguiente < self._fin:
+            yield self.siguiente()
+
+
+class GestorIDs:
+    """Clase para la gestión y generación de IDs únicos
+    
+    Los IDs tienen ancho fijo (P00000001) para que el orden alfabético
+    coincida con el orden de creación. La generación es segura entre hilos y,
+    si se configura un archivo de persistencia, también entre procesos: cada
+    proceso reserva en el archivo tramos de números y reparte IDs de su tramo,
+    así que al reiniciar se continúa después de la marca guardada.
+    """
+    
+    ANCHO = 8
+    TRAMO_PERSISTIDO = 1000
+    
+    _prefijos = {
+        "paciente": "P",
+        "doctor": "D",
+        "cita": "C"
+    }
+    _contadores = {
+        "paciente": 1,
+        "doctor": 1,
+        "cita": 1
+    }
+    _reservado_hasta: Dict[str, int] = {}
+    _ruta_persistencia: Optional[str] = None
+    _bloqueo = threading.Lock()
+    
+    @classmethod
+    def formatear(cls, prefijo: str, numero: int) -> str:
+        return f"{prefijo}{numero:0{cls.ANCHO}d}"
+    
+    @classmethod
+    def _validar_tipo(cls, tipo: str):
+        if tipo not in cls._contadores:
+            raise ValueError("Tipo de ID no válido")
+    
+    @classmethod
+    def _tomar(cls, tipo: str, cantidad: int) -> int:
+        """Avanza el contador y retorna el primer número tomado (llamar con el bloqueo)"""
+        inicio = cls._contadores[tipo]
+        if cls._ruta_persistencia and inicio + cantidad - 1 > cls._reservado_hasta.get(tipo, 0):
+            inicio = cls._reservar_tramo(tipo, cantidad)
+        cls._contadores[tipo] = inicio + cantidad
+        return inicio
+    
+    @classmethod
+    def _reservar_tramo(cls, tipo: str, cantidad: int) -> int:
+        """Reserva en el archivo de persistencia un tramo de al menos `cantidad` números"""
+        descriptor = os.open(cls._ruta_persistencia, os.O_RDWR | os.O_CREAT, 0o644)
+        with os.fdopen(descriptor, "r+", encoding="utf-8") as archivo:
+            if fcntl:
+                fcntl.flock(archivo, fcntl.LOCK_EX)
+            contenido = archivo.read()
+            marcas = json.loads(contenido) if contenido.strip() else {}
+            inicio = max(cls._contadores[tipo], marcas.get(tipo, 0) + 1)
+            marcas[tipo] = inicio + max(cantidad, cls.TRAMO_PERSISTIDO) - 1
+            archivo.seek(0)
+            archivo.truncate()
+            json.dump(marcas, archivo)
+            archivo.flush()
+            os.fsync(archivo.fileno())
+        cls._reservado_hasta[tipo] = marcas[tipo]
+        return inicio
+    
+    @classmethod
+    def configurar_persistencia(cls, ruta: Optional[str]):
+        """Guarda la marca de agua de cada tipo en `ruta` (None para desactivar)"""
+        with cls._bloqueo:
+            cls._ruta_persistencia = ruta
+            cls._reservado_hasta = {}
+    
+    @classmethod
+    def generar_id(cls, tipo: str) -> str:
+        """Genera un ID único para el tipo especificado"""
+        cls._validar_tipo(tipo)
+        with cls._bloqueo:
+            numero = cls._tomar(tipo, 1)
+        return cls.formatear(cls._prefijos[tipo], numero)
+    
+    @classmethod
+    def reservar_bloque(cls, tipo: str, tamano: int) -> BloqueIDs:
+        """Reserva `tamano` IDs consecutivos para repartirlos sin bloqueos"""
+        cls._validar_tipo(tipo)
+        if tamano <= 0:
+            raise ValueError("El tamaño del bloque debe ser positivo")
+        with cls._bloqueo:
+            inicio = cls._tomar(tipo, tamano)
+        return BloqueIDs(cls._prefijos[tipo], inicio, inicio + tamano)
+    
+    @classmethod
+    def numero_de(cls, tipo: str, id: str) -> Optional[int]:
+        """Retorna la parte numérica de un ID con el prefijo del tipo, o None"""
+        cls._validar_tipo(tipo)
+        prefijo = cls._prefijos[tipo]
+        numero = id[len(prefijo):]
+        return int(numero) if id.startswith(prefijo) and numero.isdigit() else None
+    
+    @classmethod
+    def asegurar_minimo(cls, tipo: str, ultimo: int):
+        """Evita generar IDs ya usados cuando se cargan datos existentes"""
+        cls._validar_tipo(tipo)
+        with cls._bloqueo:
+            cls._contadores[tipo] = max(cls._contadores[tipo], ultimo + 1)
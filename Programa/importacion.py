@@ -0,0 +1,187 @@
+"""
+IMPORTACIÓN MASIVA
+Carga de pacientes, doctores y citas desde CSV o JSONL en lotes validados
+"""
+
+from itertools import islice
+from typing import Optional, Iterator, Callable, Tuple
+import csv
+import json
+import time
+
+from entidades import Cita, Doctor, Paciente
+from fechas import CODIGOS_ESTADO, DURACION_CITA_MINUTOS
+from identificadores import BloqueIDs, GestorIDs
+from validacion import ValidadorRegistros
+
+
+class ResumenImportacion:
+    """Resultado de una importación masiva"""
+    
+    def __init__(self, leidas: int = 0, aceptadas: int = 0, rechazadas: int = 0,
+                 segundos: float = 0.0):
+        self.leidas = leidas
+        self.aceptadas = aceptadas
+        self.rechazadas = rechazadas
+        self.segundos = segundos
+    
+    @property
+    def filas_por_segundo(self) -> float:
+        return self.leidas / self.segundos if self.segundos else 0.0
+    
+    def __str__(self) -> str:
+        return (f"{self.leidas} filas leídas, {self.aceptadas} aceptadas, "
+                f"{self.rechazadas} rechazadas en {self.segundos:.2f} s "
+                f"({self.filas_por_segundo:,.0f} filas/s)")
+
+
+class ImportadorMasivo:
+    """Importa pacientes, doctores o citas desde archivos CSV o JSONL
+    
+    Los archivos se leen en streaming y se procesan en lotes de tamaño fijo,
+    cada uno guardado con SistemaCitasMedicas.cargar_lote. Cada lote se valida
+    primero por columnas con ValidadorRegistros y luego con las mismas reglas
+    que el registro interactivo; las filas rechazadas se escriben en un
+    archivo de errores (JSONL) con su número de línea y todos sus errores.
+    """
+    
+    TIPOS = ("pacientes", "doctores", "citas")
+    
+    def __init__(self, sistema: 'SistemaCitasMedicas', tamano_lote: int = 5000):
+        self._sistema = sistema
+        self._tamano_lote = tamano_lote
+        self._validador = ValidadorRegistros()
+    
+    @staticmethod
+    def leer_filas(ruta: str) -> Iterator[Tuple[int, dict]]:
+        """Genera (número de línea, fila) de un archivo .csv o .jsonl"""
+        with open(ruta, encoding="utf-8", newline="") as archivo:
+            if ruta.lower().endswith(".csv"):
+                lector = csv.DictReader(archivo)
+                for fila in lector:
+                    yield lector.line_num, fila
+            else:
+                for numero, linea in enumerate(archivo, 1):
+                    if linea.strip():
+                        try:
+                            fila = json.loads(linea)
+                        except json.JSONDecodeError as e:
+                            fila = {"__error__": f"JSON no válido: {e.msg}",
+                                    "__texto__": linea.rstrip("\n")}
+                        if not isinstance(fila, dict):
+                            fila = {"__error__": "Se esperaba un objeto JSON",
+                                    "__texto__": linea.rstrip("\n")}
+                        yield numero, fila
+    
+    @staticmethod
+    def _texto(fila: dict, campo: str, obligatorio: bool = True) -> str:
+        valor = fila.get(campo)
+        valor = "" if valor is None else str(valor).strip()
+        if obligatorio and not valor:
+            raise ValueError(f"El campo '{campo}' es obligatorio")
+        return valor
+    
+    def crear_paciente(self, fila: dict, ids: BloqueIDs) -> Paciente:
+        edad_texto = self._texto(fila, "edad")
+        try:
+            edad = int(edad_texto)
+        except ValueError:
+            raise ValueError("La edad debe ser un número válido") from None
+        if edad < 0:
+            raise ValueError("La edad debe ser un número válido")
+        return Paciente(self._texto(fila, "id", False) or ids.siguiente(),
+                        self._texto(fila, "nombre"), self._texto(fila, "telefono"), edad,
+                        self._texto(fila, "historial_medico", False), self._texto(fila, "email", False))
+    
+    def crear_doctor(self, fila: dict, ids: BloqueIDs) -> Doctor:
+        horario = fila.get("horario") or None
+        if isinstance(horario, str):
+            try:
+                horario = json.loads(horario)
+            except json.JSONDecodeError:
+                raise ValueError("Horario no válido (se espera JSON)") from None
+        return Doctor(self._texto(fila, "id", False) or ids.siguiente(),
+                      self._texto(fila, "nombre"), self._texto(fila, "telefono"),
+                      self._texto(fila, "especialidad"), self._texto(fila, "email", False), horario)
+    
+    def crear_cita(self, fila: dict, ids: BloqueIDs) -> Cita:
+        paciente_id = self._texto(fila, "paciente_id")
+        doctor_id = self._texto(fila, "doctor_id")
+        paciente = self._sistema.buscar_paciente_por_id(paciente_id)
+        if paciente is None:
+            raise ValueError(f"Paciente {paciente_id} no encontrado")
+        doctor = self._sistema.buscar_doctor_por_id(doctor_id)
+        if doctor is None:
+            raise ValueError(f"Doctor {doctor_id} no encontrado")
+        estado = self._texto(fila, "estado", False) or "Programada"
+        if estado not in CODIGOS_ESTADO:
+            raise ValueError("Estado no válido")
+        duracion_texto = self._texto(fila, "duracion", False)
+        try:
+            duracion = int(duracion_texto) if duracion_texto else DURACION_CITA_MINUTOS
+        except ValueError:
+            raise ValueError("La duración debe ser un número de minutos") from None
+        return Cita(self._texto(fila, "id", False) or ids.siguiente(), paciente, doctor,
+                    self._texto(fila, "fecha"), self._texto(fila, "hora"),
+                    self._texto(fila, "motivo"), estado, duracion)
+    
+    def importar(self, ruta: str, tipo: str, ruta_errores: Optional[str] = None,
+                 progreso: Optional[Callable[[ResumenImportacion], None]] = None
+                 ) -> ResumenImportacion:
+        """Importa un archivo completo y retorna el resumen"""
+        if tipo not in self.TIPOS:
+            raise ValueError(f"Tipo no válido: {tipo} (use {', '.join(self.TIPOS)})")
+        crear, registro, tipo_id = {
+            "pacientes": (self.crear_paciente, self._sistema.pacientes, "paciente"),
+            "doctores": (self.crear_doctor, self._sistema.doctores, "doctor"),
+            "citas": (self.crear_cita, self._sistema.citas, "cita"),
+        }[tipo]
+        
+        resumen = ResumenImportacion()
+        inicio = time.perf_counter()
+        errores = open(ruta_errores, "w", encoding="utf-8") if ruta_errores else None
+        try:
+            filas = self.leer_filas(ruta)
+            while True:
+                lote_filas = list(islice(filas, self._tamano_lote))
+                if not lote_filas:
+                    break
+                validacion = self._validador.validar(tipo, [fila for _, fila in lote_filas])
+                # Los IDs explícitos suben el contador antes de reservar el bloque,
+                # así los generados no repiten uno del archivo
+                explicitos = [GestorIDs.numero_de(tipo_id, self._texto(fila, "id", False))
+                              for (_, fila), errores_fila in zip(lote_filas, validacion)
+                              if not errores_fila and "__error__" not in fila]
+                GestorIDs.asegurar_minimo(tipo_id, max(filter(None, explicitos), default=0))
+                ids = GestorIDs.reservar_bloque(tipo_id, len(lote_filas))
+                lote, vistos = [], set()
+                for (numero, fila), errores_fila in zip(lote_filas, validacion):
+                    resumen.leidas += 1
+                    try:
+                        if "__error__" in fila:
+                            raise ValueError(fila["__error__"])
+                        if errores_fila:
+                            raise ValueError("; ".join(errores_fila))
+                        entidad_id = self._texto(fila, "id", False)
+                        if entidad_id and (entidad_id in vistos or entidad_id in registro):
+                            raise ValueError(f"ID duplicado: {entidad_id}")
+                        entidad = crear(fila, ids)
+                    except (ValueError, TypeError) as e:
+                        resumen.rechazadas += 1
+                        if errores:
+                            original = fila.get("__texto__", fila)
+                            errores.write(json.dumps({"linea": numero, "error": str(e), "fila": original},
+                                                     ensure_ascii=False) + "\n")
+                        continue
+                    vistos.add(entidad.id)
+                    lote.append(entidad)
+                
+                resumen.aceptadas += self._sistema.cargar_lote(**{tipo: lote})
+                resumen.segundos = time.perf_counter() - inicio
+                if progreso:
+                    progreso(resumen)
+        finally:
+            if errores:
+                errores.close()
+        resumen.segundos = time.perf_counter() - inicio
+        return resumen
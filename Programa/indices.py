@@ -0,0 +1,371 @@
+"""
+ÍNDICES
+Registro ordenado de entidades e índices de búsqueda y disponibilidad
+"""
+
+from bisect import bisect_left
+from collections import Counter
+from collections.abc import Sequence
+from itertools import islice
+from typing import List, Dict, Optional, Iterator, Callable, Generic, TypeVar, Tuple
+import heapq
+import sys
+import unicodedata
+
+from entidades import Doctor, Paciente
+from fechas import DURACION_CITA_MINUTOS, MINUTOS_POR_DIA, dia_semana
+from persistencia import Repositorio
+from validacion import canonizar_telefono
+
+
+E = TypeVar("E")
+
+
+class RegistroEntidades(Sequence, Generic[E]):
+    """Registro indexado por ID que conserva el orden de inserción
+    
+    Combina un diccionario (búsqueda y control de duplicados en O(1)) con una
+    lista (orden de inserción y acceso por posición para los listados).
+    
+    Con un repositorio de carga diferida el registro actúa como caché: las
+    entidades se hidratan al buscarlas por ID y la colección completa solo se
+    lee del repositorio la primera vez que se recorre. Las entidades agregadas
+    antes de ese recorrido (que quizá aún no llegaron al repositorio por un
+    lote abierto) se anotan aparte y se suman al final del listado.
+    """
+    
+    def __init__(self, tipo: str = "", repositorio: Optional[Repositorio] = None,
+                 hidratar: Optional[Callable[[tuple], E]] = None):
+        self._por_id: Dict[str, E] = {}
+        self._orden: List[E] = []
+        self._nuevas: List[E] = []
+        self._tipo = tipo
+        self._repositorio = repositorio
+        self._hidratar = hidratar
+        self._completo = not (repositorio and hidratar)
+    
+    def agregar(self, entidad: E) -> bool:
+        """Agrega la entidad si su ID no está registrado"""
+        if self.obtener(entidad.id) is not None:
+            return False
+        self._por_id[entidad.id] = entidad
+        if self._completo:
+            self._orden.append(entidad)
+        else:
+            self._nuevas.append(entidad)
+        return True
+    
+    def obtener(self, entidad_id: str) -> Optional[E]:
+        """Retorna la entidad con el ID indicado o None"""
+        entidad = self._por_id.get(entidad_id)
+        if entidad is None and not self._completo:
+            fila = self._repositorio.fila_por_id(self._tipo, entidad_id)
+            if fila:
+                entidad = self.desde_fila(fila)
+        return entidad
+    
+    @property
+    def tipo(self) -> str:
+        return self._tipo
+    
+    def en_memoria(self, entidad_id: str) -> Optional[E]:
+        """Retorna la entidad solo si ya está hidratada, sin consultar el repositorio"""
+        return self._por_id.get(entidad_id)
+    
+    def desde_fila(self, fila: tuple) -> E:
+        """Retorna la entidad de la fila, hidratándola solo si no está en caché"""
+        entidad = self._por_id.get(fila[0])
+        if entidad is None:
+            entidad = self._por_id.setdefault(fila[0], self._hidratar(fila))
+        return entidad
+    
+    def cargar_todo(self):
+        """Lee la colección completa del repositorio respetando su orden"""
+        self._completar()
+    
+    def _completar(self):
+        if not self._completo:
+            self._orden = [self.desde_fila(fila) for fila in self._repositorio.filas(self._tipo)]
+            if self._nuevas:
+                guardadas = {entidad.id for entidad in self._orden}
+                self._orden.extend(e for e in self._nuevas if e.id not in guardadas)
+                self._nuevas = []
+            self._completo = True
+    
+    def __contains__(self, elemento) -> bool:
+        """Acepta tanto un ID como la propia entidad"""
+        if isinstance(elemento, str):
+            return self.obtener(elemento) is not None
+        return self.obtener(getattr(elemento, "id", None)) is elemento
+    
+    def __getitem__(self, indice):
+        self._completar()
+        return self._orden[indice]
+    
+    def __iter__(self) -> Iterator[E]:
+        self._completar()
+        return iter(self._orden)
+    
+    def __len__(self) -> int:
+        if not self._completo and self._nuevas:
+            self._completar()  # no se sabe cuántas de las nuevas ya están guardadas
+        if not self._completo:
+            return self._repositorio.contar(self._tipo)
+        return len(self._orden)
+    
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+
+def normalizar_texto(texto: str) -> str:
+    """Minúsculas, sin acentos y con espacios simples ("García " -> "garcia")"""
+    descompuesto = unicodedata.normalize("NFKD", texto)
+    sin_acentos = "".join(c for c in descompuesto if not unicodedata.combining(c))
+    return " ".join(sin_acentos.lower().split())
+
+
+class IndicePacientes:
+    """Índice de búsqueda de pacientes por nombre, teléfono o email
+    
+    Los nombres se normalizan (sin acentos ni mayúsculas) y se parten en
+    palabras. Cada palabra del vocabulario apunta a los pacientes que la
+    contienen; el vocabulario ordenado permite buscar por prefijo con
+    búsqueda binaria y un índice de trigramas encuentra palabras parecidas
+    cuando la consulta tiene errores de tipeo. Teléfono y email se buscan
+    por coincidencia exacta en diccionarios, el teléfono en su forma canónica
+    (canonizar_telefono), la misma con la que se guarda.
+    """
+    
+    PUNTAJE_EXACTO = 1.0
+    PUNTAJE_PREFIJO = 0.8
+    PUNTAJE_PARECIDO = 0.6
+    SIMILITUD_MINIMA = 0.4
+    MAX_EXPANSIONES = 50
+    MAX_PALABRAS_POR_TRIGRAMA = 1000
+    
+    def __init__(self):
+        self._publicaciones: Dict[str, List[str]] = {}  # palabra -> IDs de pacientes
+        self._palabras: Dict[str, Tuple[str, ...]] = {}  # ID -> palabras del nombre
+        self._vocabulario: List[str] = []
+        self._nuevas: List[str] = []  # palabras aún no ordenadas en el vocabulario
+        self._trigramas: Dict[str, set] = {}
+        self._por_telefono: Dict[str, List[str]] = {}
+        self._por_email: Dict[str, List[str]] = {}
+    
+    @staticmethod
+    def _trigramas_de(palabra: str) -> set:
+        relleno = f"  {palabra} "
+        return {relleno[i:i + 3] for i in range(len(relleno) - 2)}
+    
+    def agregar(self, paciente: Paciente):
+        """Indexa un paciente nuevo"""
+        palabras = tuple(sys.intern(p) for p in normalizar_texto(paciente.nombre).split())
+        self._palabras[paciente.id] = palabras
+        for palabra in set(palabras):
+            publicaciones = self._publicaciones.get(palabra)
+            if publicaciones is None:
+                publicaciones = self._publicaciones[palabra] = []
+                self._nuevas.append(palabra)
+                for trigrama in self._trigramas_de(palabra):
+                    self._trigramas.setdefault(trigrama, set()).add(palabra)
+            publicaciones.append(paciente.id)
+        telefono = canonizar_telefono(paciente.telefono)
+        if telefono:
+            self._por_telefono.setdefault(telefono, []).append(paciente.id)
+        if paciente.email:
+            self._por_email.setdefault(paciente.email.lower(), []).append(paciente.id)
+    
+    def cambiar_email(self, paciente: Paciente, anterior: str):
+        """Mueve al paciente de su email anterior al actual"""
+        if anterior:
+            ids = self._por_email.get(anterior.lower(), [])
+            if paciente.id in ids:
+                ids.remove(paciente.id)
+            if not ids:
+                self._por_email.pop(anterior.lower(), None)
+        if paciente.email:
+            self._por_email.setdefault(paciente.email.lower(), []).append(paciente.id)
+    
+    def _vocabulario_ordenado(self) -> List[str]:
+        # Las palabras nuevas se ordenan en bloque en la siguiente consulta
+        if self._nuevas:
+            self._nuevas.sort()
+            self._vocabulario = list(heapq.merge(self._vocabulario, self._nuevas))
+            self._nuevas = []
+        return self._vocabulario
+    
+    def _expandir(self, termino: str) -> Dict[str, float]:
+        """Retorna las palabras del vocabulario que encajan con el término y su puntaje"""
+        expansiones = {}
+        vocabulario = self._vocabulario_ordenado()
+        posicion = bisect_left(vocabulario, termino)
+        while (posicion < len(vocabulario) and vocabulario[posicion].startswith(termino)
+               and len(expansiones) < self.MAX_EXPANSIONES):
+            palabra = vocabulario[posicion]
+            expansiones[palabra] = self.PUNTAJE_EXACTO if palabra == termino else self.PUNTAJE_PREFIJO
+            posicion += 1
+        if expansiones:
+            return expansiones
+        
+        # Sin coincidencias por prefijo se buscan palabras parecidas por trigramas.
+        # Los candidatos salen de los trigramas menos frecuentes (siempre al menos
+        # tres) y la similitud de Jaccard se calcula luego con todos los trigramas.
+        trigramas = self._trigramas_de(termino)
+        por_frecuencia = sorted((self._trigramas.get(t, ()) for t in trigramas), key=len)
+        compartidos = Counter()
+        for numero, palabras in enumerate(por_frecuencia):
+            if numero >= 3 and len(palabras) > self.MAX_PALABRAS_POR_TRIGRAMA:
+                break
+            compartidos.update(palabras)
+        for palabra, _ in compartidos.most_common(self.MAX_EXPANSIONES):
+            propios = self._trigramas_de(palabra)
+            similitud = len(trigramas & propios) / len(trigramas | propios)
+            if similitud >= self.SIMILITUD_MINIMA:
+                expansiones[palabra] = self.PUNTAJE_PARECIDO * similitud
+        return expansiones
+    
+    def buscar(self, consulta: str, limite: int = 10) -> List[Tuple[str, float]]:
+        """Retorna hasta `limite` (ID, puntaje) de los pacientes que mejor coinciden
+        
+        Una consulta con "@" se busca como email y una que sea un teléfono
+        válido como teléfono; el resto se compara con el nombre y todas
+        las palabras de la consulta deben encajar con alguna del nombre.
+        """
+        consulta = consulta.strip()
+        if "@" in consulta:
+            return [(id, self.PUNTAJE_EXACTO) for id in self._por_email.get(consulta.lower(), ())][:limite]
+        telefono = canonizar_telefono(consulta)
+        if telefono:
+            return [(id, self.PUNTAJE_EXACTO) for id in self._por_telefono.get(telefono, ())][:limite]
+        
+        terminos = normalizar_texto(consulta).split()
+        if not terminos:
+            return []
+        expansiones = [self._expandir(termino) for termino in terminos]
+        if not all(expansiones):
+            return []
+        
+        # Los candidatos salen del término más selectivo; el resto solo se verifica
+        def costo(expansion: Dict[str, float]) -> int:
+            return sum(len(self._publicaciones[palabra]) for palabra in expansion)
+        expansiones.sort(key=costo)
+        guia, resto = expansiones[0], expansiones[1:]
+        
+        # Se recorren los candidatos de mayor a menor puntaje posible y se corta
+        # en cuanto ninguno de los que faltan puede superar al peor del top
+        mejores: List[Tuple[float, int, str]] = []  # montículo de (puntaje, -orden, ID)
+        vistos = set()
+        orden = 0
+        for palabra, puntaje_guia in sorted(guia.items(), key=lambda e: -e[1]):
+            cota = puntaje_guia + self.PUNTAJE_EXACTO * len(resto)
+            for id in self._publicaciones[palabra]:
+                if len(mejores) == limite and mejores[0][0] >= cota:
+                    break
+                if id in vistos:
+                    continue
+                vistos.add(id)
+                puntaje = puntaje_guia
+                palabras = self._palabras[id]
+                for expansion in resto:
+                    mejor = max(expansion.get(p, 0.0) for p in palabras)
+                    if not mejor:
+                        break
+                    puntaje += mejor
+                else:
+                    orden += 1
+                    if len(mejores) < limite:
+                        heapq.heappush(mejores, (puntaje, -orden, id))
+                    elif puntaje > mejores[0][0]:
+                        heapq.heapreplace(mejores, (puntaje, -orden, id))
+            if len(mejores) == limite and mejores[0][0] >= cota:
+                break
+        return [(id, puntaje / len(terminos))
+                for puntaje, _, id in sorted(mejores, reverse=True)]
+    
+    def __len__(self) -> int:
+        return len(self._palabras)
+
+
+class MotorDisponibilidad:
+    """Busca horarios libres combinando el horario compilado y la agenda de cada doctor
+    
+    Los huecos libres de cada (doctor, día) se calculan una sola vez y se
+    guardan junto con la versión de la agenda para ese día; una reserva o
+    cancelación solo invalida el día afectado.
+    """
+    
+    def __init__(self, sistema: 'SistemaCitasMedicas'):
+        self._sistema = sistema
+        self._cache: Dict[Tuple[str, int, int], Tuple[int, tuple, List[int]]] = {}
+    
+    def huecos_del_dia(self, doctor: Doctor, dia: int,
+                       duracion: int = DURACION_CITA_MINUTOS) -> List[int]:
+        """Retorna los inicios (en minutos) de los huecos libres del doctor en un día"""
+        clave = (doctor.id, dia, duracion)
+        version = doctor.agenda.version_dia(dia)
+        horario = doctor.horario_compilado
+        guardado = self._cache.get(clave)
+        if guardado and guardado[0] == version and guardado[1] is horario:
+            return guardado[2]
+        
+        huecos = []
+        base = dia * MINUTOS_POR_DIA
+        for inicio_rango, fin_rango in horario[dia_semana(dia)]:
+            ocupados = doctor.agenda.ocupados_entre(base + inicio_rango, base + fin_rango)
+            ocupado = next(ocupados, None)
+            inicio = base + inicio_rango
+            while inicio + duracion <= base + fin_rango:
+                # Saltar los intervalos ocupados que terminan antes del hueco
+                while ocupado and ocupado[1] <= inicio:
+                    ocupado = next(ocupados, None)
+                if ocupado and ocupado[0] < inicio + duracion:
+                    inicio += duracion
+                    continue
+                huecos.append(inicio)
+                inicio += duracion
+        
+        self._cache[clave] = (version, horario, huecos)
+        return huecos
+    
+    def iterar_huecos(self, doctor: Doctor, desde: int, hasta: int,
+                      duracion: int = DURACION_CITA_MINUTOS) -> Iterator[Tuple[int, Doctor]]:
+        """Genera en orden los huecos (inicio, doctor) dentro de [desde, hasta)"""
+        for dia in range(desde // MINUTOS_POR_DIA, (hasta - 1) // MINUTOS_POR_DIA + 1):
+            huecos = self.huecos_del_dia(doctor, dia, duracion)
+            for inicio in islice(huecos, bisect_left(huecos, desde), None):
+                if inicio + duracion > hasta:
+                    return
+                yield inicio, doctor
+    
+    def proximos_huecos(self, doctor: Doctor, desde: int, hasta: int, cantidad: int,
+                        duracion: int = DURACION_CITA_MINUTOS) -> List[Tuple[int, Doctor]]:
+        """Retorna los próximos huecos libres de un doctor"""
+        return list(islice(self.iterar_huecos(doctor, desde, hasta, duracion), cantidad))
+    
+    def proximos_huecos_especialidad(self, especialidad: str, desde: int, hasta: int,
+                                     cantidad: int, duracion: int = DURACION_CITA_MINUTOS
+                                     ) -> List[Tuple[int, Doctor]]:
+        """Retorna los próximos huecos libres entre todos los doctores de una especialidad"""
+        flujos = [self.iterar_huecos(doctor, desde, hasta, duracion)
+                  for doctor in self._sistema.doctores_de_especialidad(especialidad)]
+        return list(islice(heapq.merge(*flujos, key=lambda hueco: hueco[0]), cantidad))
+
+
+class IndiceEspecialidades:
+    """Doctores agrupados por especialidad (sin distinguir mayúsculas ni acentos)"""
+    
+    def __init__(self):
+        self._doctores: Dict[str, List[Doctor]] = {}
+        self._nombres: Dict[str, str] = {}
+    
+    def agregar(self, doctor: Doctor):
+        clave = normalizar_texto(doctor.especialidad)
+        self._doctores.setdefault(clave, []).append(doctor)
+        self._nombres.setdefault(clave, doctor.especialidad)
+    
+    def doctores(self, especialidad: str) -> List[Doctor]:
+        return list(self._doctores.get(normalizar_texto(especialidad), ()))
+    
+    def especialidades(self) -> Dict[str, int]:
+        """Retorna cada especialidad con su cantidad de doctores"""
+        return {self._nombres[clave]: len(doctores) for clave, doctores in self._doctores.items()}
@@ -0,0 +1,176 @@
+"""
+INSTRUMENTACIÓN
+Latencias por operación, operaciones lentas, perfiles y métricas Prometheus
+"""
+
+from collections import deque
+from datetime import datetime
+from functools import wraps
+from typing import List, Dict, Optional, Callable, Tuple, NamedTuple
+import cProfile
+import inspect
+import io
+import json
+import os
+import pstats
+import tempfile
+import time
+import tracemalloc
+
+from metricas import HistogramaLatencias
+
+
+class OperacionLenta(NamedTuple):
+    momento: float
+    operacion: str
+    segundos: float
+    argumentos: str
+
+
+class Instrumentacion:
+    """Mide las llamadas a los métodos de los objetos que se le indiquen
+    
+    instrumentar() reemplaza, solo en esa instancia, cada método por una
+    envoltura que cuenta la llamada y registra su latencia; la clase no se
+    modifica. Sin instrumentar, las llamadas no pasan por ningún código
+    adicional. En los métodos generadores solo se mide la creación.
+    """
+    
+    MAX_LENTAS = 200
+    LARGO_ARGUMENTOS = 120
+    
+    def __init__(self, umbral_lento: float = 0.1, ruta_lentas: Optional[str] = None):
+        self._umbral_lento = umbral_lento
+        self._histogramas: Dict[str, HistogramaLatencias] = {}
+        self._lentas: deque = deque(maxlen=self.MAX_LENTAS)
+        self._total_lentas = 0
+        self._archivo_lentas = open(ruta_lentas, "a", encoding="utf-8") if ruta_lentas else None
+        self._instrumentados: List[Tuple[object, List[str]]] = []
+        self._perfil = None
+    
+    def instrumentar(self, objeto, incluir_privados: bool = False, prefijo: Optional[str] = None):
+        """Envuelve los métodos públicos (o también los privados) de la instancia"""
+        prefijo = prefijo or type(objeto).__name__
+        nombres = []
+        for nombre in dir(type(objeto)):
+            if nombre.startswith("__") or (nombre.startswith("_") and not incluir_privados):
+                continue
+            if not inspect.isfunction(inspect.getattr_static(type(objeto), nombre)):
+                continue
+            setattr(objeto, nombre, self._envolver(f"{prefijo}.{nombre}", getattr(objeto, nombre)))
+            nombres.append(nombre)
+        self._instrumentados.append((objeto, nombres))
+        return objeto
+    
+    def desinstrumentar(self):
+        """Restaura los métodos originales de todas las instancias"""
+        for objeto, nombres in self._instrumentados:
+            for nombre in nombres:
+                delattr(objeto, nombre)
+        self._instrumentados.clear()
+    
+    def _envolver(self, operacion: str, metodo: Callable) -> Callable:
+        registrar = self.registrar
+        reloj = time.perf_counter
+        
+        @wraps(metodo)
+        def envoltura(*args, **kwargs):
+            inicio = reloj()
+            try:
+                return metodo(*args, **kwargs)
+            finally:
+                registrar(operacion, reloj() - inicio, args)
+        return envoltura
+    
+    def registrar(self, operacion: str, segundos: float, argumentos: tuple = ()):
+        """Registra una medición; también sirve para medir bloques a mano"""
+        histograma = self._histogramas.get(operacion)
+        if histograma is None:
+            histograma = self._histogramas[operacion] = HistogramaLatencias()
+        histograma.observar(segundos)
+        if segundos >= self._umbral_lento:
+            lenta = OperacionLenta(time.time(), operacion, segundos,
+                                   repr(argumentos)[:self.LARGO_ARGUMENTOS])
+            self._lentas.append(lenta)
+            self._total_lentas += 1
+            if self._archivo_lentas:
+                self._archivo_lentas.write(json.dumps(lenta._asdict(), ensure_ascii=False) + "\n")
+                self._archivo_lentas.flush()
+    
+    @property
+    def histogramas(self) -> Dict[str, HistogramaLatencias]:
+        return dict(self._histogramas)
+    
+    @property
+    def lentas(self) -> List[OperacionLenta]:
+        return list(self._lentas)
+    
+    # ---------- Captura de perfil ----------
+    
+    def iniciar_captura(self, memoria: bool = True):
+        """Activa cProfile y, si se pide, tracemalloc hasta llamar a detener_captura"""
+        if memoria:
+            tracemalloc.start()
+        self._perfil = cProfile.Profile()
+        self._perfil.enable()
+    
+    def detener_captura(self, limite: int = 20) -> str:
+        """Detiene la captura y retorna el perfil y las líneas que más memoria retienen"""
+        if self._perfil is None:
+            return ""
+        self._perfil.disable()
+        salida = io.StringIO()
+        pstats.Stats(self._perfil, stream=salida).sort_stats("cumulative").print_stats(limite)
+        self._perfil = None
+        if tracemalloc.is_tracing():
+            salida.write(f"\nMemoria retenida (top {limite}):\n")
+            for estadistica in tracemalloc.take_snapshot().statistics("lineno")[:limite]:
+                salida.write(f"  {estadistica}\n")
+            tracemalloc.stop()
+        return salida.getvalue()
+    
+    # ---------- Exportación ----------
+    
+    def reporte_texto(self) -> str:
+        """Tabla de operaciones ordenada por tiempo total, seguida de las operaciones lentas"""
+        lineas = [f"{'Operación':<44} {'Llamadas':>9} {'Total ms':>10} {'Media ms':>9} "
+                  f"{'p50 ms':>8} {'p99 ms':>8} {'Máx ms':>9}"]
+        for operacion, h in sorted(self._histogramas.items(), key=lambda e: -e[1].suma):
+            lineas.append(f"{operacion:<44} {h.cantidad:>9,} {h.suma * 1000:>10.2f} "
+                          f"{h.suma / h.cantidad * 1000:>9.3f} {h.percentil(50) * 1000:>8.3f} "
+                          f"{h.percentil(99) * 1000:>8.3f} {h.maximo * 1000:>9.3f}")
+        if self._lentas:
+            lineas.append(f"\nOperaciones lentas (>= {self._umbral_lento * 1000:g} ms):")
+            for lenta in self._lentas:
+                momento = datetime.fromtimestamp(lenta.momento).strftime("%H:%M:%S")
+                lineas.append(f"  {momento} {lenta.operacion} {lenta.segundos * 1000:.1f} ms "
+                              f"{lenta.argumentos}")
+        return "\n".join(lineas)
+    
+    def prometheus(self) -> str:
+        """Retorna las métricas en el formato de texto de Prometheus"""
+        lineas = ["# HELP citas_operacion_segundos Latencia de las operaciones del sistema",
+                  "# TYPE citas_operacion_segundos histogram"]
+        for operacion, h in sorted(self._histogramas.items()):
+            for limite, acumulado in h.acumuladas():
+                lineas.append(f'citas_operacion_segundos_bucket{{operacion="{operacion}",'
+                              f'le="{limite}"}} {acumulado}')
+            lineas.append(f'citas_operacion_segundos_sum{{operacion="{operacion}"}} {h.suma!r}')
+            lineas.append(f'citas_operacion_segundos_count{{operacion="{operacion}"}} {h.cantidad}')
+        lineas.append("# HELP citas_operaciones_lentas_total Operaciones que superaron el umbral")
+        lineas.append("# TYPE citas_operaciones_lentas_total counter")
+        lineas.append(f"citas_operaciones_lentas_total {self._total_lentas}")
+        return "\n".join(lineas) + "\n"
+    
+    def exportar_prometheus(self, ruta: str):
+        """Escribe las métricas de forma atómica para que un recolector nunca lea un archivo a medias"""
+        directorio = os.path.dirname(os.path.abspath(ruta))
+        descriptor, temporal = tempfile.mkstemp(dir=directorio, suffix=".tmp")
+        with os.fdopen(descriptor, "w", encoding="utf-8") as archivo:
+            archivo.write(self.prometheus())
+        os.replace(temporal, ruta)
+    
+    def cerrar(self):
+        if self._archivo_lentas:
+            self._archivo_lentas.close()
+            self._archivo_lentas = None
@@ -0,0 +1,558 @@
+"""
+INTERFAZ DE CONSOLA
+Menús interactivos de pacientes, doctores, citas y reportes
+"""
+
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import Dict, Optional, Iterable
+import sys
+
+from entidades import Cita, Doctor, Paciente
+from eventos import BusEventos
+from fechas import (EPOCA, FORMATO_FECHA, MINUTOS_POR_DIA, convertir_a_minutos,
+                    convertir_desde_minutos)
+from identificadores import GestorIDs
+from instrumentacion import Instrumentacion
+from persistencia import Repositorio
+from reportes import GeneradorReportes, Reporte
+from sistema import SistemaCitasMedicas
+
+
+class PaginadorConsola:
+    """Muestra bloques de texto por páginas
+    
+    Cada página se arma en memoria y se escribe con una sola llamada a la
+    salida; entre páginas se pregunta si se desea continuar.
+    """
+    
+    TAMANO_PAGINA = 20
+    
+    def __init__(self, tamano_pagina: int = TAMANO_PAGINA, salida=None):
+        self._tamano = tamano_pagina
+        self._salida = salida or sys.stdout
+    
+    def mostrar(self, bloques: Iterable[str]) -> int:
+        """Muestra los bloques y retorna cuántos se mostraron"""
+        bloques = iter(bloques)
+        mostrados = 0
+        pagina = list(islice(bloques, self._tamano))
+        while pagina:
+            self._salida.write("\n".join(pagina) + "\n")
+            self._salida.flush()
+            mostrados += len(pagina)
+            pagina = list(islice(bloques, self._tamano))
+            if pagina:
+                try:
+                    respuesta = input("-- Enter para ver más, 'q' para salir -- ")
+                except EOFError:
+                    break
+                if respuesta.strip().lower() == "q":
+                    break
+        return mostrados
+
+
+class ModuloPacientes:
+    """Módulo para gestionar la interfaz de pacientes"""
+    
+    def __init__(self, sistema: SistemaCitasMedicas):
+        self._sistema = sistema
+    
+    def ejecutar(self, opcion: str):
+        """Ejecuta la operación seleccionada"""
+        match opcion:
+            case "1":  # Registrar paciente
+                self._registrar_paciente()
+            case "2":  # Listar pacientes
+                self._listar_pacientes()
+            case _:
+                print("Opción no válida")
+    
+    def _registrar_paciente(self):
+        """Registra un nuevo paciente"""
+        print("\n--- REGISTRAR PACIENTE ---")
+        
+        try:
+            nombre = input("Nombre: ").strip()
+            telefono = input("Teléfono: ").strip()
+            edad_str = input("Edad: ").strip()
+            email = input("Email (opcional): ").strip()
+            historial = input("Historial médico (opcional): ").strip()
+            
+            if not nombre or not telefono or not edad_str:
+                print("Error: Nombre, teléfono y edad son obligatorios")
+                return
+            
+            try:
+                edad = int(edad_str)
+            except ValueError:
+                print("❌ Error: La edad debe ser un número válido")
+                return
+            paciente_id = GestorIDs.generar_id("paciente")
+            
+            paciente = Paciente(
+                id=paciente_id,
+                nombre=nombre,
+                telefono=telefono,
+                edad=edad,
+                historial_medico=historial,
+                email=email
+            )
+            
+            if self._sistema.agregar_paciente(paciente):
+                print(f"✅ Paciente {paciente_id} registrado: {nombre}")
+            else:
+                print("❌ Error al registrar el paciente")
+                
+        except ValueError as e:
+            print(f"❌ Error: {e}")
+        except Exception as e:
+            print(f"❌ Error inesperado: {e}")
+    
+    def _listar_pacientes(self):
+        """Lista todos los pacientes"""
+        print("\n--- LISTA DE PACIENTES ---")
+        
+        if not self._sistema.pacientes:
+            print("No hay pacientes registrados")
+            return
+        
+        def bloques():
+            for posicion, paciente in self._sistema.iterar_pacientes():
+                bloque = f"{posicion + 1}. {paciente.mostrar_info()}"
+                if paciente.historial_medico:
+                    bloque += f"\n   Historial: {paciente.historial_medico}"
+                yield bloque
+        
+        PaginadorConsola().mostrar(bloques())
+
+
+class ModuloDoctores:
+    """Módulo para gestionar la interfaz de doctores"""
+    
+    def __init__(self, sistema: SistemaCitasMedicas):
+        self._sistema = sistema
+    
+    def ejecutar(self, opcion: str):
+        """Ejecuta la operación seleccionada"""
+        match opcion:
+            case "1":  # Registrar doctor
+                self._registrar_doctor()
+            case "2":  # Listar doctores
+                self._listar_doctores()
+            case _:
+                print("Opción no válida")
+    
+    def _registrar_doctor(self):
+        """Registra un nuevo doctor"""
+        print("\n--- REGISTRAR DOCTOR ---")
+        
+        try:
+            nombre = input("Nombre del doctor: ").strip()
+            especialidad = input("Especialidad: ").strip()
+            telefono = input("Teléfono: ").strip()
+            email = input("Email (opcional): ").strip()
+            
+            if not nombre or not especialidad or not telefono:
+                print("Error: Nombre, especialidad y teléfono son obligatorios")
+                return
+            
+            doctor_id = GestorIDs.generar_id("doctor")
+            
+            doctor = Doctor(
+                id=doctor_id,
+                nombre=nombre,
+                telefono=telefono,
+                especialidad=especialidad,
+                email=email
+            )
+            
+            if self._sistema.agregar_doctor(doctor):
+                print(f"✅ Doctor {doctor_id} registrado: Dr. {nombre} - {especialidad}")
+            else:
+                print("❌ Error al registrar el doctor")
+                
+        except ValueError as e:
+            print(f"❌ Error: {e}")
+        except Exception as e:
+            print(f"❌ Error inesperado: {e}")
+    
+    def _listar_doctores(self):
+        """Lista todos los doctores"""
+        print("\n--- LISTA DE DOCTORES ---")
+        
+        if not self._sistema.doctores:
+            print("No hay doctores registrados")
+            return
+        
+        PaginadorConsola().mostrar(f"{posicion + 1}. {doctor.mostrar_info()}"
+                                   for posicion, doctor in self._sistema.iterar_doctores())
+
+
+class ModuloCitas:
+    """Módulo para gestionar la interfaz de citas"""
+    
+    def __init__(self, sistema: SistemaCitasMedicas):
+        self._sistema = sistema
+    
+    def ejecutar(self, opcion: str):
+        """Ejecuta la operación seleccionada"""
+        match opcion:
+            case "1":  # Programar cita
+                self._programar_cita()
+            case "2":  # Listar citas
+                self._listar_citas()
+            case "3":  # Cancelar cita
+                self._cancelar_cita()
+            case _:
+                print("Opción no válida")
+    
+    def _programar_cita(self):
+        """Programa una nueva cita"""
+        print("\n--- PROGRAMAR CITA ---")
+        
+        # Verificar que existan pacientes y doctores
+        if not self._sistema.pacientes:
+            print("❌ No hay pacientes registrados")
+            return
+        
+        if not self._sistema.doctores:
+            print("❌ No hay doctores registrados")
+            return
+        
+        try:
+            # Seleccionar paciente (con muchos pacientes se busca en lugar de listar)
+            pacientes = self._sistema.pacientes
+            if len(pacientes) > PaginadorConsola.TAMANO_PAGINA:
+                consulta = input("Buscar paciente (nombre, teléfono o email): ").strip()
+                pacientes = self._sistema.buscar_pacientes(consulta)
+                if not pacientes:
+                    print("❌ No se encontraron pacientes")
+                    return
+            print("Pacientes disponibles:")
+            for i, paciente in enumerate(pacientes, 1):
+                print(f"{i}. {paciente.nombre}")
+            
+            opcion_paciente = int(input("Seleccione el paciente: ")) - 1
+            if not (0 <= opcion_paciente < len(pacientes)):
+                print("❌ Selección inválida")
+                return
+            
+            paciente = pacientes[opcion_paciente]
+            
+            # Seleccionar doctor; con muchos doctores se filtra por especialidad
+            # y se listan de menor a mayor carga en las próximas dos semanas
+            ahora = datetime.now()
+            desde = (ahora - EPOCA) // timedelta(minutes=1)
+            doctores = list(self._sistema.doctores)
+            if len(doctores) > PaginadorConsola.TAMANO_PAGINA:
+                especialidad = input("Especialidad: ").strip()
+                hoy = ahora.strftime(FORMATO_FECHA)
+                hasta = (ahora + timedelta(days=14)).strftime(FORMATO_FECHA)
+                doctores = [doctor for doctor, _ in
+                            self._sistema.carga_doctores(especialidad, hoy, hasta)]
+                if not doctores:
+                    print("❌ No hay doctores de esa especialidad")
+                    return
+            print("Doctores disponibles:")
+            for i, doctor in enumerate(doctores, 1):
+                carga = doctor.carga_entre(desde, desde + 14 * MINUTOS_POR_DIA)
+                print(f"{i}. Dr. {doctor.nombre} - {doctor.especialidad} ({carga} citas próximas)")
+            
+            opcion_doctor = int(input("Seleccione el doctor: ")) - 1
+            if not (0 <= opcion_doctor < len(doctores)):
+                print("❌ Selección inválida")
+                return
+            
+            doctor = doctores[opcion_doctor]
+            
+            # Sugerir los próximos horarios libres del doctor
+            huecos = self._sistema.disponibilidad.proximos_huecos(
+                doctor, desde, desde + 14 * MINUTOS_POR_DIA, 5)
+            if huecos:
+                print("Próximos horarios libres:")
+                for inicio, _ in huecos:
+                    print("   {} {}".format(*convertir_desde_minutos(inicio)))
+            
+            # Fecha, hora y motivo
+            fecha = input("Fecha (DD/MM/AAAA): ").strip()
+            hora = input("Hora (HH:MM): ").strip()
+            motivo = input("Motivo de la consulta: ").strip()
+            
+            if not fecha or not hora or not motivo:
+                print("❌ Fecha, hora y motivo son obligatorios")
+                return
+            
+            try:
+                inicio = convertir_a_minutos(fecha, hora)
+            except ValueError as e:
+                print(f"❌ {e}")
+                return
+            
+            if not doctor.esta_disponible(inicio):
+                print(f"❌ El Dr. {doctor.nombre} ya tiene una cita en ese horario")
+                return
+            
+            # Crear cita
+            cita_id = GestorIDs.generar_id("cita")
+            cita = Cita(
+                id=cita_id,
+                paciente=paciente,
+                doctor=doctor,
+                fecha=fecha,
+                hora=hora,
+                motivo=motivo
+            )
+            
+            if self._sistema.agregar_cita(cita):
+                print(f"✅ Cita {cita_id} programada exitosamente")
+                print(f"   {paciente.nombre} con Dr. {doctor.nombre} el {fecha} a las {hora}")
+            else:
+                print("❌ Error al programar la cita")
+                
+        except ValueError:
+            print("❌ Error: Selección inválida")
+        except Exception as e:
+            print(f"❌ Error inesperado: {e}")
+    
+    def _listar_citas(self):
+        """Lista todas las citas"""
+        print("\n--- LISTA DE CITAS ---")
+        
+        if not self._sistema.citas:
+            print("No hay citas programadas")
+            return
+        
+        PaginadorConsola().mostrar(f"{posicion + 1}. {cita.mostrar_info()}\n   " + "-" * 50
+                                   for posicion, cita in self._sistema.iterar_citas())
+    
+    def _cancelar_cita(self):
+        """Cancela una cita existente"""
+        print("\n--- CANCELAR CITA ---")
+        
+        citas_activas = self._sistema.obtener_citas_activas()
+        
+        if not citas_activas:
+            print("❌ No hay citas activas para cancelar")
+            return
+        
+        print("Citas activas:")
+        for i, cita in enumerate(citas_activas, 1):
+            print(f"{i}. {cita.id}: {cita.paciente.nombre} con Dr. {cita.doctor.nombre} - {cita.fecha} {cita.hora}")
+        
+        try:
+            opcion = int(input("Seleccione la cita a cancelar: ")) - 1
+            if 0 <= opcion < len(citas_activas):
+                cita = citas_activas[opcion]
+                if self._sistema.cancelar_cita(cita.id):
+                    print("✅ Cita cancelada exitosamente")
+                else:
+                    print("❌ Error al cancelar la cita")
+            else:
+                print("❌ Opción inválida")
+        except ValueError:
+            print("❌ Error: Ingrese un número válido")
+
+
+class ModuloReportes:
+    """Módulo para generar reportes del sistema"""
+    
+    def __init__(self, sistema: SistemaCitasMedicas):
+        self._sistema = sistema
+    
+    def ejecutar(self, opcion: str):
+        """Ejecuta la operación seleccionada"""
+        match opcion:
+            case "1":  # Citas por doctor
+                self._citas_por_doctor()
+            case "2":  # Citas por paciente
+                self._citas_por_paciente()
+            case "3":  # Estadísticas
+                self._estadisticas_generales()
+            case "4":  # Agenda del día
+                self._agenda_del_dia()
+            case "5":  # Resumen por periodo
+                self._resumen_periodo()
+            case _:
+                print("Opción no válida")
+    
+    def _citas_por_doctor(self):
+        """Muestra citas agrupadas por doctor"""
+        print("\n--- CITAS POR DOCTOR ---")
+        
+        if not self._sistema.citas:
+            print("No hay citas programadas")
+            return
+        
+        self._mostrar(GeneradorReportes(self._sistema).citas_por_doctor())
+    
+    def _citas_por_paciente(self):
+        """Muestra citas agrupadas por paciente"""
+        print("\n--- CITAS POR PACIENTE ---")
+        
+        if not self._sistema.citas:
+            print("No hay citas programadas")
+            return
+        
+        self._mostrar(GeneradorReportes(self._sistema).citas_por_paciente())
+    
+    def _resumen_periodo(self):
+        """Muestra los totales diarios de citas entre dos fechas"""
+        print("\n--- RESUMEN POR PERIODO ---")
+        hoy = datetime.now()
+        desde = input("Desde (DD/MM/AAAA, Enter para inicio de mes): ").strip()
+        hasta = input("Hasta (DD/MM/AAAA, Enter para hoy): ").strip()
+        try:
+            reporte = GeneradorReportes(self._sistema).resumen_periodo(
+                desde or hoy.replace(day=1).strftime(FORMATO_FECHA),
+                hasta or hoy.strftime(FORMATO_FECHA))
+        except ValueError as e:
+            print(f"❌ {e}")
+            return
+        
+        if not reporte.filas:
+            print("No hay citas en ese periodo")
+            return
+        self._mostrar(reporte)
+    
+    def _mostrar(self, reporte: Reporte):
+        """Muestra el reporte paginado y ofrece guardarlo en un archivo"""
+        PaginadorConsola().mostrar(reporte.lineas)
+        ruta = input("Guardar en archivo (.csv o .json, Enter para omitir): ").strip()
+        if ruta:
+            try:
+                reporte.guardar(ruta)
+                print(f"✅ Reporte guardado en {ruta}")
+            except (OSError, ValueError) as e:
+                print(f"❌ No se pudo guardar: {e}")
+    
+    def _agenda_del_dia(self):
+        """Muestra las citas programadas de una fecha ordenadas por hora"""
+        print("\n--- AGENDA DEL DÍA ---")
+        fecha = input("Fecha (DD/MM/AAAA, Enter para mañana): ").strip()
+        if not fecha:
+            fecha = (datetime.now() + timedelta(days=1)).strftime(FORMATO_FECHA)
+        try:
+            citas = self._sistema.agenda_del_dia(fecha)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return
+        
+        if not citas:
+            print(f"No hay citas programadas el {fecha}")
+            return
+        
+        PaginadorConsola().mostrar(
+            f"   {cita.hora} - Dr. {cita.doctor.nombre} ({cita.doctor.especialidad}) - {cita.paciente.nombre}"
+            for cita in citas)
+    
+    def _estadisticas_generales(self):
+        """Muestra estadísticas generales del sistema"""
+        print("\n--- ESTADÍSTICAS DEL SISTEMA ---")
+        print(f"Total pacientes: {len(self._sistema.pacientes)}")
+        print(f"Total doctores: {len(self._sistema.doctores)}")
+        estadisticas = self._sistema.estadisticas
+        print(f"Total citas: {estadisticas.total}")
+        
+        if estadisticas.total:
+            print(f"Citas activas: {estadisticas.por_estado('Programada')}")
+            print(f"Citas canceladas: {estadisticas.por_estado('Cancelada')}")
+
+
+class InterfazUsuario:
+    """Clase principal para la interfaz de usuario"""
+    
+    def __init__(self, repositorio: Optional[Repositorio] = None,
+                 instrumentacion: Optional[Instrumentacion] = None,
+                 eventos: Optional[BusEventos] = None):
+        self._sistema = SistemaCitasMedicas(repositorio, datos_ejemplo=True, eventos=eventos)
+        self._modulo_pacientes = ModuloPacientes(self._sistema)
+        self._modulo_doctores = ModuloDoctores(self._sistema)
+        self._modulo_citas = ModuloCitas(self._sistema)
+        self._modulo_reportes = ModuloReportes(self._sistema)
+        if instrumentacion:
+            instrumentacion.instrumentar(self._sistema)
+            for modulo in (self._modulo_pacientes, self._modulo_doctores,
+                           self._modulo_citas, self._modulo_reportes):
+                instrumentacion.instrumentar(modulo, incluir_privados=True)
+    
+    def mostrar_menu_principal(self):
+        """Muestra el menú principal"""
+        print("\n" + "="*50)
+        print("SISTEMA DE GESTION DE CITAS MEDICAS")
+        print("="*50)
+        print("1. Gestion de Pacientes")
+        print("2. Gestion de Doctores")
+        print("3. Gestion de Citas")
+        print("4. Reportes y Estadisticas")
+        print("5. Salir")
+        print("="*50)
+    
+    def mostrar_submenu(self, titulo: str, opciones: Dict[str, str]) -> str:
+        """Muestra un submenú y retorna la opción seleccionada"""
+        print(f"\n--- {titulo} ---")
+        for key, value in opciones.items():
+            print(f"{key}. {value}")
+        return input("Seleccione una opción: ").strip()
+    
+    def ejecutar(self):
+        """Ejecuta el sistema principal"""
+        print("Sistema de Gestion de Citas Medicas")
+        repositorio = self._sistema.repositorio
+        if repositorio.ubicacion:
+            modo = "de solo lectura" if repositorio.solo_lectura else "guardados"
+            print(f"Datos {modo} en {repositorio.ubicacion}")
+        if self._sistema.datos_ejemplo_cargados:
+            print("Datos de ejemplo cargados automaticamente")
+        
+        while True:
+            self.mostrar_menu_principal()
+            opcion_principal = input("Seleccione una opción: ").strip()
+            
+            match opcion_principal:
+                case "1":  # Gestión de Pacientes
+                    opcion = self.mostrar_submenu("GESTION DE PACIENTES", {
+                        "1": "Registrar paciente",
+                        "2": "Listar pacientes",
+                        "3": "Volver"
+                    })
+                    if opcion != "3":
+                        self._modulo_pacientes.ejecutar(opcion)
+                
+                case "2":  # Gestión de Doctores
+                    opcion = self.mostrar_submenu("GESTION DE DOCTORES", {
+                        "1": "Registrar doctor",
+                        "2": "Listar doctores",
+                        "3": "Volver"
+                    })
+                    if opcion != "3":
+                        self._modulo_doctores.ejecutar(opcion)
+                
+                case "3":  # Gestión de Citas
+                    opcion = self.mostrar_submenu("GESTION DE CITAS", {
+                        "1": "Programar cita",
+                        "2": "Listar citas",
+                        "3": "Cancelar cita",
+                        "4": "Volver"
+                    })
+                    if opcion != "4":
+                        self._modulo_citas.ejecutar(opcion)
+                
+                case "4":  # Reportes
+                    opcion = self.mostrar_submenu("REPORTES Y ESTADISTICAS", {
+                        "1": "Citas por doctor",
+                        "2": "Citas por paciente",
+                        "3": "Estadisticas generales",
+                        "4": "Agenda del dia",
+                        "5": "Resumen por periodo",
+                        "6": "Volver"
+                    })
+                    if opcion != "6":
+                        self._modulo_reportes.ejecutar(opcion)
+                
+                case "5":  # Salir
+                    print("Hasta pronto!")
+                    break
+                
+                case _:
+                    print("Opcion no valida. Intente de nuevo.")
@@ -0,0 +1,213 @@
+"""
+MODO POR LOTES
+Ejecución de comandos línea por línea con resultados en JSONL
+"""
+
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterable, Callable, Tuple
+import json
+import shlex
+import time
+
+from entidades import json_cita, json_doctor, json_paciente
+from espera import json_solicitud
+from fechas import FORMATO_FECHA
+from identificadores import GestorIDs
+from importacion import ImportadorMasivo, ResumenImportacion
+from sistema import SistemaCitasMedicas, conflicto_reserva, json_estadisticas
+
+
+class EjecutorLotes:
+    """Ejecuta comandos no interactivos sobre un único SistemaCitasMedicas
+    
+    Cada línea es un comando con argumentos al estilo de la terminal
+    (reservar P00000001 D00000001 10/11/2026 09:00 Control, con opciones
+    --clave valor o clave=valor) o un objeto JSON con la clave "comando".
+    Por cada línea se escribe un resultado JSON con su número de línea.
+    Las escrituras se guardan en el repositorio en bloques de `tamano_lote`;
+    antes de cada consulta se confirma lo pendiente.
+    """
+    
+    # Nombres en inglés aceptados para los comandos y las opciones
+    ALIAS_COMANDOS = {"book": "reservar", "cancel": "cancelar", "list": "listar",
+                      "report": "reporte", "patient": "paciente", "waitlist": "espera"}
+    ALIAS_OPCIONES = {"since": "desde", "date": "fecha", "status": "estado", "limit": "limite",
+                      "doctor": "doctor_id", "paciente": "paciente_id", "patient": "paciente_id"}
+    # Campos que reciben los argumentos posicionales; el último absorbe el resto
+    POSICIONALES = {
+        "reservar": ("paciente_id", "doctor_id", "fecha", "hora", "motivo"),
+        "cancelar": ("id",),
+        "paciente": ("nombre", "telefono", "edad"),
+        "doctor": ("nombre", "telefono", "especialidad"),
+        "listar": ("tipo",),
+        "reporte": ("tipo",),
+        "espera": ("paciente_id", "especialidad"),
+    }
+    ESCRITURAS = ("reservar", "cancelar", "paciente", "doctor")
+    
+    def __init__(self, sistema: SistemaCitasMedicas, tamano_lote: int = 1000):
+        self._sistema = sistema
+        self._tamano_lote = tamano_lote
+        self._importador = ImportadorMasivo(sistema)
+        self._comandos: Dict[str, Callable[[dict], object]] = {
+            "reservar": self._reservar,
+            "cancelar": self._cancelar,
+            "paciente": self._paciente,
+            "doctor": self._doctor,
+            "listar": self._listar,
+            "reporte": self._reporte,
+            "espera": self._espera,
+        }
+    
+    def interpretar(self, linea: str) -> Tuple[str, dict]:
+        """Convierte una línea en (comando, argumentos)"""
+        if linea.lstrip().startswith("{"):
+            argumentos = json.loads(linea)
+            if not isinstance(argumentos, dict):
+                raise ValueError("Se esperaba un objeto JSON")
+            comando = str(argumentos.pop("comando", "") or argumentos.pop("command", ""))
+            posicionales = []
+        else:
+            palabras = shlex.split(linea)
+            comando, argumentos, posicionales = palabras[0], {}, []
+            palabras = iter(palabras[1:])
+            for palabra in palabras:
+                if palabra.startswith("--"):
+                    clave, igual, valor = palabra[2:].partition("=")
+                    argumentos[clave] = valor if igual else next(palabras, "")
+                elif "=" in palabra:
+                    clave, _, valor = palabra.partition("=")
+                    argumentos[clave] = valor
+                else:
+                    posicionales.append(palabra)
+        
+        comando = comando.lower()
+        comando = self.ALIAS_COMANDOS.get(comando, comando)
+        if comando not in self._comandos:
+            raise ValueError(f"Comando desconocido: {comando or '(vacío)'}")
+        argumentos = {self.ALIAS_OPCIONES.get(clave.replace("-", "_"), clave.replace("-", "_")): valor
+                      for clave, valor in argumentos.items()}
+        campos = self.POSICIONALES[comando]
+        if len(posicionales) > len(campos):
+            posicionales[len(campos) - 1:] = [" ".join(posicionales[len(campos) - 1:])]
+        for campo, valor in zip(campos, posicionales):
+            argumentos.setdefault(campo, valor)
+        return comando, argumentos
+    
+    def ejecutar(self, lineas: Iterable[str], salida) -> ResumenImportacion:
+        """Ejecuta los comandos y escribe un resultado JSON por línea en `salida`"""
+        resumen = ResumenImportacion()
+        inicio = time.perf_counter()
+        sin_confirmar = 0
+        self._sistema.iniciar_lote()
+        try:
+            for numero, linea in enumerate(lineas, 1):
+                if not linea.strip() or linea.lstrip().startswith("#"):
+                    continue
+                resumen.leidas += 1
+                resultado = {"linea": numero}
+                try:
+                    comando, argumentos = self.interpretar(linea)
+                    resultado["comando"] = comando
+                    if comando not in self.ESCRITURAS and sin_confirmar:
+                        self._confirmar()
+                        sin_confirmar = 0
+                    datos = self._comandos[comando](argumentos)
+                except (ValueError, TypeError) as e:
+                    resumen.rechazadas += 1
+                    resultado.update(ok=False, error=str(e))
+                else:
+                    resumen.aceptadas += 1
+                    resultado.update(ok=True, resultado=datos)
+                    if comando in self.ESCRITURAS:
+                        sin_confirmar += 1
+                        if sin_confirmar >= self._tamano_lote:
+                            self._confirmar()
+                            sin_confirmar = 0
+                salida.write(json.dumps(resultado, ensure_ascii=False) + "\n")
+        finally:
+            self._sistema.confirmar_lote()
+        resumen.segundos = time.perf_counter() - inicio
+        return resumen
+    
+    def _confirmar(self):
+        self._sistema.confirmar_lote()
+        self._sistema.iniciar_lote()
+    
+    def _reservar(self, argumentos: dict) -> dict:
+        conflicto = conflicto_reserva(self._sistema, argumentos)
+        if conflicto:
+            raise ValueError(conflicto)
+        cita = self._importador.crear_cita(argumentos, GestorIDs.reservar_bloque("cita", 1))
+        self._sistema.agregar_cita(cita)
+        return json_cita(cita)
+    
+    def _cancelar(self, argumentos: dict) -> dict:
+        cita_id = str(argumentos.get("id") or "")
+        cita = self._sistema.buscar_cita_por_id(cita_id)
+        if cita is None:
+            raise ValueError(f"Cita {cita_id} no encontrada")
+        if cita.estado != "Programada":
+            raise ValueError(f"La cita {cita_id} no está activa ({cita.estado})")
+        self._sistema.cancelar_cita(cita.id)
+        return json_cita(cita)
+    
+    def _paciente(self, argumentos: dict) -> dict:
+        paciente_id = str(argumentos.get("id") or "")
+        if paciente_id and paciente_id in self._sistema.pacientes:
+            raise ValueError(f"ID duplicado: {paciente_id}")
+        paciente = self._importador.crear_paciente(argumentos, GestorIDs.reservar_bloque("paciente", 1))
+        self._sistema.agregar_paciente(paciente)
+        return json_paciente(paciente)
+    
+    def _doctor(self, argumentos: dict) -> dict:
+        doctor_id = str(argumentos.get("id") or "")
+        if doctor_id and doctor_id in self._sistema.doctores:
+            raise ValueError(f"ID duplicado: {doctor_id}")
+        doctor = self._importador.crear_doctor(argumentos, GestorIDs.reservar_bloque("doctor", 1))
+        self._sistema.agregar_doctor(doctor)
+        return json_doctor(doctor)
+    
+    def _listar(self, argumentos: dict) -> list:
+        tipo = argumentos.get("tipo", "citas")
+        if tipo == "citas":
+            elementos = self._sistema.iterar_citas(
+                estado=argumentos.get("estado"), doctor_id=argumentos.get("doctor_id"),
+                paciente_id=argumentos.get("paciente_id"), desde_fecha=argumentos.get("desde"))
+            convertir = json_cita
+        elif tipo == "pacientes":
+            elementos = self._sistema.iterar_pacientes(nombre=argumentos.get("nombre", ""))
+            convertir = json_paciente
+        elif tipo == "doctores":
+            elementos = self._sistema.iterar_doctores(especialidad=argumentos.get("especialidad", ""))
+            convertir = json_doctor
+        else:
+            raise ValueError(f"Tipo de listado no válido: {tipo} (use citas, pacientes o doctores)")
+        limite = int(argumentos["limite"]) if argumentos.get("limite") else None
+        return [convertir(elemento) for _, elemento in islice(elementos, limite)]
+    
+    def _reporte(self, argumentos: dict):
+        tipo = argumentos.get("tipo", "estadisticas")
+        if tipo == "estadisticas":
+            return json_estadisticas(self._sistema)
+        if tipo == "especialidades":
+            return self._sistema.especialidades()
+        if tipo == "agenda":
+            fecha = argumentos.get("fecha") or datetime.now().strftime(FORMATO_FECHA)
+            if argumentos.get("doctor_id"):
+                citas = self._sistema.agenda_doctor(argumentos["doctor_id"], fecha)
+            else:
+                citas = self._sistema.agenda_del_dia(fecha)
+            return list(map(json_cita, citas))
+        if tipo == "espera":
+            return self._sistema.lista_espera.metricas()
+        raise ValueError(f"Tipo de reporte no válido: {tipo} "
+                         f"(use estadisticas, especialidades, agenda o espera)")
+    
+    def _espera(self, argumentos: dict) -> dict:
+        solicitud = self._sistema.lista_espera.agregar(
+            str(argumentos.get("paciente_id") or ""), str(argumentos.get("especialidad") or ""),
+            str(argumentos.get("doctor_id") or ""), argumentos.get("desde"), argumentos.get("hasta"),
+            int(argumentos.get("urgencia") or 0), str(argumentos.get("motivo") or "Lista de espera"))
+        return json_solicitud(solicitud)
@@ -0,0 +1,57 @@
+"""
+MÉTRICAS
+Histograma de latencias con cubetas fijas al estilo Prometheus
+"""
+
+from bisect import bisect_left
+from typing import Iterator, Tuple
+
+
+class HistogramaLatencias:
+    """Histograma de latencias con cubetas fijas (en segundos) al estilo Prometheus"""
+    
+    LIMITES = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+    
+    __slots__ = ("_cubetas", "_cantidad", "_suma", "_maximo")
+    
+    def __init__(self):
+        self._cubetas = [0] * (len(self.LIMITES) + 1)  # la última es +Inf
+        self._cantidad = 0
+        self._suma = 0.0
+        self._maximo = 0.0
+    
+    def observar(self, segundos: float):
+        self._cubetas[bisect_left(self.LIMITES, segundos)] += 1
+        self._cantidad += 1
+        self._suma += segundos
+        if segundos > self._maximo:
+            self._maximo = segundos
+    
+    @property
+    def cantidad(self) -> int:
+        return self._cantidad
+    
+    @property
+    def suma(self) -> float:
+        return self._suma
+    
+    @property
+    def maximo(self) -> float:
+        return self._maximo
+    
+    def percentil(self, p: float) -> float:
+        """Estima el percentil con el límite superior de la cubeta que lo contiene"""
+        objetivo = p / 100 * self._cantidad
+        acumulado = 0
+        for limite, cantidad in zip(self.LIMITES, self._cubetas):
+            acumulado += cantidad
+            if acumulado >= objetivo:
+                return min(limite, self._maximo)
+        return self._maximo
+    
+    def acumuladas(self) -> Iterator[Tuple[str, int]]:
+        """Genera (límite, cantidad acumulada) incluyendo +Inf"""
+        acumulado = 0
+        for limite, cantidad in zip(self.LIMITES + (float("inf"),), self._cubetas):
+            acumulado += cantidad
+            yield ("+Inf" if limite == float("inf") else repr(limite)), acumulado
@@ -0,0 +1,140 @@
+"""
+PERSISTENCIA
+Interfaz común de los repositorios y repositorio en memoria
+"""
+
+from abc import ABC, abstractmethod
+from typing import List, Dict, Optional, Iterator, Iterable, Tuple
+import json
+
+from entidades import Cita, Doctor, Paciente
+
+
+class Repositorio(ABC):
+    """Almacenamiento de pacientes, doctores y citas detrás de SistemaCitasMedicas
+    
+    Los repositorios trabajan con filas (tuplas) y no con objetos: el sistema
+    se encarga de hidratar las entidades y de mantener sus referencias.
+    
+    - Paciente: (id, nombre, telefono, email, edad, historial_medico)
+    - Doctor:   (id, nombre, telefono, email, especialidad, horario_json)
+    - Cita:     (id, paciente_id, doctor_id, fecha, hora, inicio, duracion, motivo, estado)
+    """
+    
+    # Si es True, el sistema hidrata las entidades bajo demanda
+    carga_diferida = False
+    # Si es True, el sistema rechaza las escrituras antes de tocar su estado
+    solo_lectura = False
+    
+    @staticmethod
+    def fila_paciente(paciente: Paciente) -> tuple:
+        return (paciente.id, paciente.nombre, paciente.telefono, paciente.email,
+                paciente.edad, paciente.historial_medico)
+    
+    @staticmethod
+    def fila_doctor(doctor: Doctor) -> tuple:
+        return (doctor.id, doctor.nombre, doctor.telefono, doctor.email,
+                doctor.especialidad, json.dumps(doctor.horario, ensure_ascii=False))
+    
+    @staticmethod
+    def fila_cita(cita: Cita) -> tuple:
+        return (cita.id, cita.paciente.id, cita.doctor.id, cita.fecha, cita.hora,
+                cita.inicio, cita.duracion, cita.motivo, cita.estado)
+    
+    @abstractmethod
+    def guardar_paciente(self, paciente: Paciente):
+        pass
+    
+    @abstractmethod
+    def guardar_doctor(self, doctor: Doctor):
+        pass
+    
+    @abstractmethod
+    def guardar_cita(self, cita: Cita):
+        pass
+    
+    @abstractmethod
+    def actualizar_estado_cita(self, cita_id: str, estado: str):
+        pass
+    
+    def guardar_lote(self, pacientes: Iterable[Paciente] = (), doctores: Iterable[Doctor] = (),
+                     citas: Iterable[Cita] = ()):
+        """Guarda varias entidades de una vez"""
+        for paciente in pacientes:
+            self.guardar_paciente(paciente)
+        for doctor in doctores:
+            self.guardar_doctor(doctor)
+        for cita in citas:
+            self.guardar_cita(cita)
+    
+    def actualizar_estados(self, cambios: Iterable[Tuple[str, str]]):
+        """Aplica varios cambios (cita_id, estado) de una vez"""
+        for cita_id, estado in cambios:
+            self.actualizar_estado_cita(cita_id, estado)
+    
+    def filas(self, tipo: str) -> Iterator[tuple]:
+        """Itera todas las filas de un tipo ("paciente", "doctor" o "cita")"""
+        return iter(())
+    
+    def fila_por_id(self, tipo: str, entidad_id: str) -> Optional[tuple]:
+        return None
+    
+    def filas_por_ids(self, tipo: str, ids: Iterable[str]) -> Iterator[tuple]:
+        for entidad_id in ids:
+            fila = self.fila_por_id(tipo, entidad_id)
+            if fila:
+                yield fila
+    
+    def citas_de(self, tipo: str, entidad_id: str) -> List[tuple]:
+        """Retorna las filas de citas de un paciente o doctor"""
+        return []
+    
+    def contar(self, tipo: str) -> int:
+        return 0
+    
+    def conteos_citas(self) -> Iterable[Tuple[str, str, int, str, int]]:
+        """Retorna (doctor_id, especialidad, dia, estado, cantidad) agregados"""
+        return ()
+    
+    def max_numero_id(self, tipo: str) -> int:
+        """Retorna la mayor parte numérica de los IDs guardados de un tipo"""
+        return 0
+    
+    @property
+    def ubicacion(self) -> Optional[str]:
+        """Archivo o directorio donde están los datos (None si solo viven en memoria)"""
+        return None
+    
+    @property
+    def requiere_compactacion(self) -> bool:
+        """Indica si conviene llamar a compactar con el estado actual"""
+        return False
+    
+    def compactar(self, filas: Dict[str, Iterable[tuple]]):
+        """Reemplaza lo almacenado por el estado completo recibido"""
+        pass
+    
+    def cerrar(self):
+        pass
+
+
+class RepositorioMemoria(Repositorio):
+    """Repositorio sin persistencia: los datos viven solo en SistemaCitasMedicas"""
+    
+    def guardar_paciente(self, paciente: Paciente):
+        pass
+    
+    def guardar_doctor(self, doctor: Doctor):
+        pass
+    
+    def guardar_cita(self, cita: Cita):
+        pass
+    
+    def actualizar_estado_cita(self, cita_id: str, estado: str):
+        pass
+    
+    def guardar_lote(self, pacientes=(), doctores=(), citas=()):
+        pass
+    
+    def actualizar_estados(self, cambios):
+        pass
@@ -0,0 +1,185 @@
+"""
+DIARIO DE ESCRITURA
+Diario de escritura con compactación en instantáneas
+"""
+
+from typing import Dict, Iterator, Iterable
+import json
+import os
+import tempfile
+import threading
+
+from entidades import Cita, Doctor, Paciente
+from persistencia import Repositorio
+
+
+class RepositorioDiario(Repositorio):
+    """Repositorio persistente basado en un diario de solo anexado e instantáneas
+    
+    Cada mutación se anexa como una línea JSON al diario; las líneas se
+    sincronizan a disco (fsync) en grupo cada `intervalo_sincronizacion`
+    segundos, por lo que una caída pierde como máximo esa ventana. Cada
+    `registros_por_instantanea` mutaciones el sistema compacta el estado en una
+    instantánea y el diario vuelve a empezar.
+    
+    Al abrirlo se restaura la última instantánea y se reaplica la cola del
+    diario; las filas restauradas se entregan una sola vez a SistemaCitasMedicas.
+    """
+    
+    VERSION = 1
+    ARCHIVO_INSTANTANEA = "instantanea.json"
+    ARCHIVO_DIARIO = "diario.jsonl"
+    
+    def __init__(self, directorio: str, intervalo_sincronizacion: float = 0.05,
+                 registros_por_instantanea: int = 50_000):
+        os.makedirs(directorio, exist_ok=True)
+        self._directorio = directorio
+        self._ruta_instantanea = os.path.join(directorio, self.ARCHIVO_INSTANTANEA)
+        self._ruta_diario = os.path.join(directorio, self.ARCHIVO_DIARIO)
+        self._intervalo = intervalo_sincronizacion
+        self._registros_por_instantanea = registros_por_instantanea
+        self._bloqueo = threading.RLock()
+        
+        self._restaurados: Dict[str, Dict[str, tuple]] = {"paciente": {}, "doctor": {}, "cita": {}}
+        self._max_ids: Dict[str, int] = {}
+        self._secuencia = 0
+        self._registros_desde_instantanea = 0
+        self._restaurar()
+        
+        self._diario = open(self._ruta_diario, "a", encoding="utf-8")
+        self._pendiente = False
+        self._detener = threading.Event()
+        self._hilo = threading.Thread(target=self._sincronizar_periodicamente,
+                                      name="diario-fsync", daemon=True)
+        self._hilo.start()
+    
+    @property
+    def directorio(self) -> str:
+        return self._directorio
+    
+    @property
+    def ubicacion(self) -> str:
+        return self._directorio
+    
+    def _restaurar(self):
+        """Carga la instantánea y reaplica los registros posteriores del diario"""
+        if os.path.exists(self._ruta_instantanea):
+            with open(self._ruta_instantanea, encoding="utf-8") as archivo:
+                instantanea = json.load(archivo)
+            if instantanea.get("version") != self.VERSION:
+                raise ValueError("Versión de instantánea no soportada")
+            self._secuencia = instantanea["secuencia"]
+            for tipo, filas in instantanea["filas"].items():
+                self._restaurados[tipo] = {fila[0]: tuple(fila) for fila in filas}
+        
+        if os.path.exists(self._ruta_diario):
+            valido = 0
+            with open(self._ruta_diario, "rb") as archivo:
+                for linea in archivo:
+                    try:
+                        if not linea.endswith(b"\n"):
+                            raise ValueError
+                        registro = json.loads(linea)
+                    except ValueError:
+                        break  # Línea incompleta tras una caída: fin de lo durable
+                    valido += len(linea)
+                    if registro["s"] <= self._secuencia:
+                        continue
+                    self._aplicar(registro)
+                    self._secuencia = registro["s"]
+                    self._registros_desde_instantanea += 1
+            # Sin recortar la cola rota, el próximo registro se pegaría a ella y
+            # todo lo anexado después se perdería en la siguiente restauración
+            if os.path.getsize(self._ruta_diario) != valido:
+                os.truncate(self._ruta_diario, valido)
+        
+        for tipo, filas in self._restaurados.items():
+            self._max_ids[tipo] = max((int(id[1:]) for id in filas if id[1:].isdigit()), default=0)
+    
+    def _aplicar(self, registro: dict):
+        if registro["op"] == "estado":
+            fila = self._restaurados["cita"].get(registro["id"])
+            if fila:
+                self._restaurados["cita"][registro["id"]] = fila[:-1] + (registro["estado"],)
+        else:
+            fila = tuple(registro["f"])
+            self._restaurados[registro["op"]][fila[0]] = fila
+    
+    def _anexar(self, registros: Iterable[dict]):
+        with self._bloqueo:
+            for registro in registros:
+                self._secuencia += 1
+                registro["s"] = self._secuencia
+                self._diario.write(json.dumps(registro, ensure_ascii=False) + "\n")
+                self._registros_desde_instantanea += 1
+            self._pendiente = True
+    
+    def _sincronizar_periodicamente(self):
+        while not self._detener.wait(self._intervalo):
+            self.sincronizar()
+    
+    def sincronizar(self):
+        """Escribe a disco (fsync) los registros pendientes del grupo actual"""
+        with self._bloqueo:
+            if self._pendiente and not self._diario.closed:
+                self._diario.flush()
+                os.fsync(self._diario.fileno())
+                self._pendiente = False
+    
+    def guardar_paciente(self, paciente: Paciente):
+        self._anexar([{"op": "paciente", "f": self.fila_paciente(paciente)}])
+    
+    def guardar_doctor(self, doctor: Doctor):
+        self._anexar([{"op": "doctor", "f": self.fila_doctor(doctor)}])
+    
+    def guardar_cita(self, cita: Cita):
+        self._anexar([{"op": "cita", "f": self.fila_cita(cita)}])
+    
+    def guardar_lote(self, pacientes=(), doctores=(), citas=()):
+        self._anexar([{"op": "paciente", "f": self.fila_paciente(p)} for p in pacientes])
+        self._anexar([{"op": "doctor", "f": self.fila_doctor(d)} for d in doctores])
+        self._anexar([{"op": "cita", "f": self.fila_cita(c)} for c in citas])
+    
+    def actualizar_estado_cita(self, cita_id: str, estado: str):
+        self._anexar([{"op": "estado", "id": cita_id, "estado": estado}])
+    
+    def actualizar_estados(self, cambios):
+        self._anexar([{"op": "estado", "id": cita_id, "estado": estado} for cita_id, estado in cambios])
+    
+    def filas(self, tipo: str) -> Iterator[tuple]:
+        return iter(self._restaurados.pop(tipo, {}).values())
+    
+    def max_numero_id(self, tipo: str) -> int:
+        return self._max_ids.get(tipo, 0)
+    
+    @property
+    def requiere_compactacion(self) -> bool:
+        return self._registros_desde_instantanea >= self._registros_por_instantanea
+    
+    def compactar(self, filas: Dict[str, Iterable[tuple]]):
+        """Escribe una instantánea atómica del estado y reinicia el diario"""
+        with self._bloqueo:
+            self._diario.flush()
+            os.fsync(self._diario.fileno())
+            descriptor, temporal = tempfile.mkstemp(dir=self._directorio, suffix=".tmp")
+            with os.fdopen(descriptor, "w", encoding="utf-8") as archivo:
+                json.dump({"version": self.VERSION, "secuencia": self._secuencia,
+                           "filas": {tipo: list(f) for tipo, f in filas.items()}},
+                          archivo, ensure_ascii=False)
+                archivo.flush()
+                os.fsync(archivo.fileno())
+            os.replace(temporal, self._ruta_instantanea)
+            
+            # Los registros con secuencia <= la de la instantánea se ignoran al
+            # restaurar, así que una caída aquí no duplica datos
+            self._diario.close()
+            self._diario = open(self._ruta_diario, "w", encoding="utf-8")
+            self._registros_desde_instantanea = 0
+            self._pendiente = False
+    
+    def cerrar(self):
+        self._detener.set()
+        self._hilo.join()
+        with self._bloqueo:
+            self.sincronizar()
+            self._diario.close()
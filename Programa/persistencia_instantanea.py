@@ -0,0 +1,288 @@
+"""
+INSTANTÁNEA BINARIA
+Instantánea binaria columnar de solo lectura abierta con mmap
+"""
+
+from array import array
+from collections import Counter
+from typing import List, Dict, Optional, Iterator, Iterable, Tuple
+import json
+import mmap
+import os
+import struct
+import sys
+
+from fechas import CODIGOS_ESTADO, ESTADOS_CITA, MINUTOS_POR_DIA, convertir_desde_minutos
+from persistencia import Repositorio
+
+
+class RepositorioInstantanea(Repositorio):
+    """Repositorio de solo lectura sobre una instantánea binaria en columnas
+    
+    El archivo tiene un encabezado versionado, un directorio de secciones y
+    una sección por columna (arreglos little-endian alineados a 8 bytes).
+    Todos los textos se guardan una sola vez en una tabla de cadenas y las
+    columnas solo contienen su índice; las citas referencian a su paciente y
+    doctor por número de fila, sin repetir IDs. Índices precalculados (orden
+    por ID, citas de cada paciente y doctor, conteos) permiten responder
+    consultas directamente sobre el archivo abierto con mmap, así que
+    SistemaCitasMedicas solo hidrata lo que se consulta.
+    """
+    
+    carga_diferida = True
+    solo_lectura = True
+    
+    MAGIA = b"SCMB"
+    VERSION = 1
+    ENCABEZADO = "<4sHHI"
+    ENTRADA = "<8sQQ"
+    # Columnas de cada tipo: nombre de sección y tipo de arreglo
+    COLUMNAS = {
+        "paciente": (("p.id", "I"), ("p.nom", "I"), ("p.tel", "I"), ("p.mail", "I"),
+                     ("p.edad", "i"), ("p.hist", "I")),
+        "doctor": (("d.id", "I"), ("d.nom", "I"), ("d.tel", "I"), ("d.mail", "I"),
+                   ("d.esp", "I"), ("d.hor", "I")),
+        "cita": (("c.id", "I"), ("c.pac", "I"), ("c.doc", "I"), ("c.ini", "q"),
+                 ("c.dur", "H"), ("c.mot", "I"), ("c.est", "B")),
+    }
+    INDICES = (("p.orden", "I"), ("d.orden", "I"), ("c.orden", "I"),
+               ("c.xpac", "I"), ("c.ipac", "I"), ("c.xdoc", "I"), ("c.idoc", "I"),
+               ("e.doc", "I"), ("e.dia", "q"), ("e.est", "B"), ("e.cant", "I"),
+               ("t.ix", "Q"))
+    
+    def __init__(self, ruta: str):
+        self._ruta = ruta
+        with open(ruta, "rb") as archivo:
+            self._mapa = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        self._vistas: List[memoryview] = []
+        self._fechas: Dict[int, str] = {}
+        self._cadenas: Dict[int, str] = {}
+        try:
+            magia, version, _, secciones = struct.unpack_from(self.ENCABEZADO, self._mapa, 0)
+            if magia != self.MAGIA:
+                raise ValueError(f"{ruta} no es una instantánea binaria")
+            if version != self.VERSION:
+                raise ValueError(f"Versión de instantánea no soportada: {version}")
+            posicion = struct.calcsize(self.ENCABEZADO)
+            self._secciones: Dict[str, Tuple[int, int]] = {}
+            for _ in range(secciones):
+                nombre, desplazamiento, longitud = struct.unpack_from(self.ENTRADA, self._mapa, posicion)
+                self._secciones[nombre.rstrip(b"\0").decode("ascii")] = (desplazamiento, longitud)
+                posicion += struct.calcsize(self.ENTRADA)
+            
+            self._columnas = {nombre: self._columna(nombre, tipo)
+                              for columnas in self.COLUMNAS.values() for nombre, tipo in columnas}
+            self._columnas.update((nombre, self._columna(nombre, tipo)) for nombre, tipo in self.INDICES)
+            self._texto = self._seccion("texto")
+            self._meta = json.loads(bytes(self._seccion("meta")))
+        except Exception:
+            self.cerrar()
+            raise
+    
+    @property
+    def ubicacion(self) -> str:
+        return self._ruta
+    
+    def _seccion(self, nombre: str) -> memoryview:
+        desplazamiento, longitud = self._secciones[nombre]
+        vista = memoryview(self._mapa)[desplazamiento:desplazamiento + longitud]
+        self._vistas.append(vista)
+        return vista
+    
+    def _columna(self, nombre: str, tipo: str):
+        """Retorna la columna como vista sobre el archivo (o como copia en big-endian)"""
+        vista = self._seccion(nombre)
+        if sys.byteorder == "little":
+            columna = vista.cast(tipo)
+            self._vistas.append(columna)
+            return columna
+        columna = array(tipo, bytes(vista))
+        columna.byteswap()
+        return columna
+    
+    def _cadena(self, indice: int) -> str:
+        # Cada cadena se decodifica una vez y se comparte entre las filas que la usan
+        cadena = self._cadenas.get(indice)
+        if cadena is None:
+            inicio, fin = self._columnas["t.ix"][indice], self._columnas["t.ix"][indice + 1]
+            cadena = self._cadenas[indice] = str(self._texto[inicio:fin], "utf-8")
+        return cadena
+    
+    # ---------- Escritura ----------
+    
+    @classmethod
+    def escribir(cls, ruta: str, filas: Dict[str, Iterable[tuple]]):
+        """Escribe una instantánea con las filas de cada tipo (mismo formato que compactar)"""
+        cadenas: Dict[str, int] = {}
+        
+        def cadena(texto) -> int:
+            texto = "" if texto is None else str(texto)
+            indice = cadenas.get(texto)
+            if indice is None:
+                indice = cadenas[texto] = len(cadenas)
+            return indice
+        
+        columnas = {nombre: array(tipo) for tipos in cls.COLUMNAS.values() for nombre, tipo in tipos}
+        columnas.update((nombre, array(tipo)) for nombre, tipo in cls.INDICES)
+        ids: Dict[str, List[str]] = {"paciente": [], "doctor": [], "cita": []}
+        filas_de: Dict[str, Dict[str, int]] = {"paciente": {}, "doctor": {}}
+        
+        for id, nombre, telefono, email, edad, historial in filas.get("paciente", ()):
+            filas_de["paciente"][id] = len(ids["paciente"])
+            ids["paciente"].append(id)
+            for columna, valor in zip(("p.id", "p.nom", "p.tel", "p.mail", "p.hist"),
+                                      (id, nombre, telefono, email, historial)):
+                columnas[columna].append(cadena(valor))
+            columnas["p.edad"].append(int(edad))
+        especialidades = []
+        for id, nombre, telefono, email, especialidad, horario in filas.get("doctor", ()):
+            filas_de["doctor"][id] = len(ids["doctor"])
+            ids["doctor"].append(id)
+            especialidades.append(especialidad)
+            for columna, valor in zip(("d.id", "d.nom", "d.tel", "d.mail", "d.esp", "d.hor"),
+                                      (id, nombre, telefono, email, especialidad, horario)):
+                columnas[columna].append(cadena(valor))
+        conteos = Counter()
+        for id, paciente_id, doctor_id, _, _, inicio, duracion, motivo, estado in filas.get("cita", ()):
+            ids["cita"].append(id)
+            doctor = filas_de["doctor"][doctor_id]
+            columnas["c.id"].append(cadena(id))
+            columnas["c.pac"].append(filas_de["paciente"][paciente_id])
+            columnas["c.doc"].append(doctor)
+            columnas["c.ini"].append(inicio)
+            columnas["c.dur"].append(duracion)
+            columnas["c.mot"].append(cadena(motivo))
+            columnas["c.est"].append(CODIGOS_ESTADO[estado])
+            conteos[doctor, inicio // MINUTOS_POR_DIA, CODIGOS_ESTADO[estado]] += 1
+        
+        # Índices: orden por ID, citas de cada paciente y doctor, conteos agregados
+        for tipo, prefijo in (("paciente", "p"), ("doctor", "d"), ("cita", "c")):
+            columnas[f"{prefijo}.orden"].extend(sorted(range(len(ids[tipo])), key=ids[tipo].__getitem__))
+        for tipo, referencia, sufijo in (("paciente", "c.pac", "pac"), ("doctor", "c.doc", "doc")):
+            cantidades = [0] * (len(ids[tipo]) + 1)
+            for fila in columnas[referencia]:
+                cantidades[fila + 1] += 1
+            for fila in range(len(ids[tipo])):
+                cantidades[fila + 1] += cantidades[fila]
+            columnas[f"c.x{sufijo}"].extend(cantidades)
+            posiciones = cantidades[:-1]
+            citas = array("I", bytes(4 * len(ids["cita"])))
+            for cita, fila in enumerate(columnas[referencia]):
+                citas[posiciones[fila]] = cita
+                posiciones[fila] += 1
+            columnas[f"c.i{sufijo}"] = citas
+        for (doctor, dia, estado), cantidad in sorted(conteos.items()):
+            columnas["e.doc"].append(doctor)
+            columnas["e.dia"].append(dia)
+            columnas["e.est"].append(estado)
+            columnas["e.cant"].append(cantidad)
+        
+        texto = bytearray()
+        for valor in cadenas:
+            columnas["t.ix"].append(len(texto))
+            texto += valor.encode("utf-8")
+        columnas["t.ix"].append(len(texto))
+        meta = {"max_ids": {tipo: max((int(id[1:]) for id in lista if id[1:].isdigit()), default=0)
+                            for tipo, lista in ids.items()}}
+        
+        secciones = []
+        for nombre, columna in columnas.items():
+            if sys.byteorder != "little":
+                columna.byteswap()
+            secciones.append((nombre, columna.tobytes()))
+        secciones.append(("texto", bytes(texto)))
+        secciones.append(("meta", json.dumps(meta).encode("utf-8")))
+        
+        # Encabezado, directorio y secciones alineadas a 8 bytes; escritura atómica
+        posicion = struct.calcsize(cls.ENCABEZADO) + struct.calcsize(cls.ENTRADA) * len(secciones)
+        directorio, cuerpo = [], bytearray()
+        for nombre, contenido in secciones:
+            relleno = -(posicion + len(cuerpo)) % 8
+            cuerpo += bytes(relleno)
+            directorio.append(struct.pack(cls.ENTRADA, nombre.encode("ascii"),
+                                          posicion + len(cuerpo), len(contenido)))
+            cuerpo += contenido
+        temporal = ruta + ".tmp"
+        with open(temporal, "wb") as archivo:
+            archivo.write(struct.pack(cls.ENCABEZADO, cls.MAGIA, cls.VERSION, 0, len(secciones)))
+            archivo.write(b"".join(directorio))
+            archivo.write(cuerpo)
+            archivo.flush()
+            os.fsync(archivo.fileno())
+        os.replace(temporal, ruta)
+    
+    # ---------- Lectura ----------
+    
+    def _fila(self, tipo: str, fila: int) -> tuple:
+        c, cadena = self._columnas, self._cadena
+        if tipo == "paciente":
+            return (cadena(c["p.id"][fila]), cadena(c["p.nom"][fila]), cadena(c["p.tel"][fila]),
+                    cadena(c["p.mail"][fila]), c["p.edad"][fila], cadena(c["p.hist"][fila]))
+        if tipo == "doctor":
+            return (cadena(c["d.id"][fila]), cadena(c["d.nom"][fila]), cadena(c["d.tel"][fila]),
+                    cadena(c["d.mail"][fila]), cadena(c["d.esp"][fila]), cadena(c["d.hor"][fila]))
+        inicio = c["c.ini"][fila]
+        dia, minuto = divmod(inicio, MINUTOS_POR_DIA)
+        fecha = self._fechas.get(dia)
+        if fecha is None:
+            fecha = self._fechas[dia] = convertir_desde_minutos(dia * MINUTOS_POR_DIA)[0]
+        hora = f"{minuto // 60:02d}:{minuto % 60:02d}"
+        return (cadena(c["c.id"][fila]), cadena(c["p.id"][c["c.pac"][fila]]),
+                cadena(c["d.id"][c["c.doc"][fila]]), fecha, hora, inicio, c["c.dur"][fila],
+                cadena(c["c.mot"][fila]), ESTADOS_CITA[c["c.est"][fila]])
+    
+    def _buscar_fila(self, tipo: str, entidad_id: str) -> Optional[int]:
+        """Búsqueda binaria del ID sobre el índice ordenado del tipo"""
+        prefijo = tipo[0]
+        orden, ids = self._columnas[f"{prefijo}.orden"], self._columnas[f"{prefijo}.id"]
+        bajo, alto = 0, len(orden)
+        while bajo < alto:
+            medio = (bajo + alto) // 2
+            if self._cadena(ids[orden[medio]]) < entidad_id:
+                bajo = medio + 1
+            else:
+                alto = medio
+        if bajo < len(orden) and self._cadena(ids[orden[bajo]]) == entidad_id:
+            return orden[bajo]
+        return None
+    
+    def filas(self, tipo: str) -> Iterator[tuple]:
+        for fila in range(self.contar(tipo)):
+            yield self._fila(tipo, fila)
+    
+    def fila_por_id(self, tipo: str, entidad_id: str) -> Optional[tuple]:
+        fila = self._buscar_fila(tipo, entidad_id)
+        return self._fila(tipo, fila) if fila is not None else None
+    
+    def citas_de(self, tipo: str, entidad_id: str) -> List[tuple]:
+        fila = self._buscar_fila(tipo, entidad_id)
+        if fila is None:
+            return []
+        sufijo = "pac" if tipo == "paciente" else "doc"
+        limites, citas = self._columnas[f"c.x{sufijo}"], self._columnas[f"c.i{sufijo}"]
+        return [self._fila("cita", cita) for cita in citas[limites[fila]:limites[fila + 1]]]
+    
+    def contar(self, tipo: str) -> int:
+        return len(self._columnas[f"{tipo[0]}.id"])
+    
+    def conteos_citas(self) -> Iterable[Tuple[str, str, int, str, int]]:
+        c = self._columnas
+        for doctor, dia, estado, cantidad in zip(c["e.doc"], c["e.dia"], c["e.est"], c["e.cant"]):
+            yield (self._cadena(c["d.id"][doctor]), self._cadena(c["d.esp"][doctor]), dia,
+                   ESTADOS_CITA[estado], cantidad)
+    
+    def max_numero_id(self, tipo: str) -> int:
+        return self._meta["max_ids"].get(tipo, 0)
+    
+    def _solo_lectura(self, *args, **kwargs):
+        raise ValueError("La instantánea es de solo lectura")
+    
+    guardar_paciente = guardar_doctor = guardar_cita = _solo_lectura
+    actualizar_estado_cita = guardar_lote = actualizar_estados = _solo_lectura
+    
+    def cerrar(self):
+        # Las vistas deben soltarse antes de cerrar el mapa
+        for vista in reversed(self._vistas):
+            vista.release()
+        self._vistas = []
+        self._mapa.close()
@@ -0,0 +1,203 @@
+"""
+PERSISTENCIA EN SQLITE
+Repositorio SQLite con carga diferida de filas
+"""
+
+from itertools import islice
+from typing import List, Dict, Optional, Iterator, Iterable, Tuple
+import os
+import sqlite3
+import threading
+
+from entidades import Cita, Doctor, Paciente
+from fechas import MINUTOS_POR_DIA
+from persistencia import Repositorio
+
+
+_conexiones_sqlite: Dict[Tuple[int, str], sqlite3.Connection] = {}
+_usos_conexiones: Dict[Tuple[int, str], int] = {}
+_bloqueo_conexiones = threading.Lock()
+
+
+def obtener_conexion_sqlite(ruta: str) -> sqlite3.Connection:
+    """Retorna la conexión compartida del proceso para la base de datos indicada
+    
+    Cada llamada se empareja con una a liberar_conexion_sqlite; la conexión
+    se cierra cuando la libera el último que la pidió.
+    """
+    clave = (os.getpid(), os.path.abspath(ruta))
+    with _bloqueo_conexiones:
+        conexion = _conexiones_sqlite.get(clave)
+        if conexion is None:
+            conexion = sqlite3.connect(ruta, check_same_thread=False)
+            conexion.execute("PRAGMA journal_mode=WAL")
+            conexion.execute("PRAGMA synchronous=NORMAL")
+            conexion.execute("PRAGMA foreign_keys=ON")
+            _conexiones_sqlite[clave] = conexion
+        _usos_conexiones[clave] = _usos_conexiones.get(clave, 0) + 1
+        return conexion
+
+
+def liberar_conexion_sqlite(ruta: str):
+    """Deja de usar la conexión compartida y la cierra si nadie más la usa"""
+    clave = (os.getpid(), os.path.abspath(ruta))
+    with _bloqueo_conexiones:
+        usos = _usos_conexiones.get(clave, 0) - 1
+        if usos > 0:
+            _usos_conexiones[clave] = usos
+            return
+        _usos_conexiones.pop(clave, None)
+        conexion = _conexiones_sqlite.pop(clave, None)
+    if conexion is not None:
+        conexion.close()
+
+
+class RepositorioSQLite(Repositorio):
+    """Repositorio persistente sobre SQLite con carga diferida"""
+    
+    carga_diferida = True
+    TAMANO_LOTE = 10_000
+    
+    _TABLAS = {"paciente": "pacientes", "doctor": "doctores", "cita": "citas"}
+    _COLUMNAS = {
+        "paciente": "id, nombre, telefono, email, edad, historial_medico",
+        "doctor": "id, nombre, telefono, email, especialidad, horario",
+        "cita": "id, paciente_id, doctor_id, fecha, hora, inicio, duracion, motivo, estado",
+    }
+    _ESQUEMA = """
+        CREATE TABLE IF NOT EXISTS pacientes (
+            id TEXT PRIMARY KEY,
+            nombre TEXT NOT NULL,
+            telefono TEXT NOT NULL,
+            email TEXT NOT NULL DEFAULT '',
+            edad INTEGER NOT NULL,
+            historial_medico TEXT NOT NULL DEFAULT ''
+        );
+        CREATE TABLE IF NOT EXISTS doctores (
+            id TEXT PRIMARY KEY,
+            nombre TEXT NOT NULL,
+            telefono TEXT NOT NULL,
+            email TEXT NOT NULL DEFAULT '',
+            especialidad TEXT NOT NULL,
+            horario TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS citas (
+            id TEXT PRIMARY KEY,
+            paciente_id TEXT NOT NULL REFERENCES pacientes(id),
+            doctor_id TEXT NOT NULL REFERENCES doctores(id),
+            fecha TEXT NOT NULL,
+            hora TEXT NOT NULL,
+            inicio INTEGER NOT NULL,
+            duracion INTEGER NOT NULL,
+            motivo TEXT NOT NULL,
+            estado TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_doctores_especialidad ON doctores(especialidad);
+        CREATE INDEX IF NOT EXISTS idx_citas_doctor ON citas(doctor_id, inicio);
+        CREATE INDEX IF NOT EXISTS idx_citas_paciente ON citas(paciente_id, inicio);
+        CREATE INDEX IF NOT EXISTS idx_citas_estado ON citas(estado);
+    """
+    
+    def __init__(self, ruta: str):
+        self._ruta = ruta
+        self._conexion = obtener_conexion_sqlite(ruta)
+        self._cerrado = False
+        self._bloqueo = threading.RLock()
+        with self._bloqueo, self._conexion:
+            self._conexion.executescript(self._ESQUEMA)
+    
+    @property
+    def ruta(self) -> str:
+        return self._ruta
+    
+    @property
+    def ubicacion(self) -> str:
+        return self._ruta
+    
+    def _insertar(self, tipo: str, filas: Iterable[tuple]):
+        """Inserta filas con executemany en lotes, cada lote en una transacción"""
+        marcadores = ", ".join("?" * len(self._COLUMNAS[tipo].split(",")))
+        sql = f"INSERT INTO {self._TABLAS[tipo]} ({self._COLUMNAS[tipo]}) VALUES ({marcadores})"
+        filas = iter(filas)
+        with self._bloqueo:
+            while True:
+                lote = list(islice(filas, self.TAMANO_LOTE))
+                if not lote:
+                    break
+                with self._conexion:
+                    self._conexion.executemany(sql, lote)
+    
+    def guardar_paciente(self, paciente: Paciente):
+        self._insertar("paciente", [self.fila_paciente(paciente)])
+    
+    def guardar_doctor(self, doctor: Doctor):
+        self._insertar("doctor", [self.fila_doctor(doctor)])
+    
+    def guardar_cita(self, cita: Cita):
+        self._insertar("cita", [self.fila_cita(cita)])
+    
+    def guardar_lote(self, pacientes=(), doctores=(), citas=()):
+        self._insertar("paciente", map(self.fila_paciente, pacientes))
+        self._insertar("doctor", map(self.fila_doctor, doctores))
+        self._insertar("cita", map(self.fila_cita, citas))
+    
+    def actualizar_estado_cita(self, cita_id: str, estado: str):
+        with self._bloqueo, self._conexion:
+            self._conexion.execute("UPDATE citas SET estado = ? WHERE id = ?", (estado, cita_id))
+    
+    def actualizar_estados(self, cambios):
+        with self._bloqueo, self._conexion:
+            self._conexion.executemany("UPDATE citas SET estado = ? WHERE id = ?",
+                                       ((estado, cita_id) for cita_id, estado in cambios))
+    
+    def _consultar(self, sql: str, parametros: tuple = ()) -> List[tuple]:
+        with self._bloqueo:
+            return self._conexion.execute(sql, parametros).fetchall()
+    
+    def filas(self, tipo: str) -> Iterator[tuple]:
+        sql = f"SELECT {self._COLUMNAS[tipo]} FROM {self._TABLAS[tipo]} ORDER BY rowid"
+        with self._bloqueo:
+            cursor = self._conexion.execute(sql)
+            while True:
+                lote = cursor.fetchmany(self.TAMANO_LOTE)
+                if not lote:
+                    return
+                yield from lote
+    
+    def fila_por_id(self, tipo: str, entidad_id: str) -> Optional[tuple]:
+        filas = self._consultar(
+            f"SELECT {self._COLUMNAS[tipo]} FROM {self._TABLAS[tipo]} WHERE id = ?", (entidad_id,))
+        return filas[0] if filas else None
+    
+    def filas_por_ids(self, tipo: str, ids: Iterable[str]) -> Iterator[tuple]:
+        ids = list(ids)
+        # SQLite limita la cantidad de parámetros por consulta
+        for i in range(0, len(ids), 500):
+            parte = ids[i:i + 500]
+            yield from self._consultar(
+                f"SELECT {self._COLUMNAS[tipo]} FROM {self._TABLAS[tipo]} "
+                f"WHERE id IN ({', '.join('?' * len(parte))}) ORDER BY rowid", tuple(parte))
+    
+    def citas_de(self, tipo: str, entidad_id: str) -> List[tuple]:
+        columna = "paciente_id" if tipo == "paciente" else "doctor_id"
+        return self._consultar(
+            f"SELECT {self._COLUMNAS['cita']} FROM citas WHERE {columna} = ? ORDER BY rowid",
+            (entidad_id,))
+    
+    def contar(self, tipo: str) -> int:
+        return self._consultar(f"SELECT COUNT(*) FROM {self._TABLAS[tipo]}")[0][0]
+    
+    def conteos_citas(self) -> Iterable[Tuple[str, str, int, str, int]]:
+        return self._consultar(
+            f"SELECT c.doctor_id, d.especialidad, c.inicio / {MINUTOS_POR_DIA}, c.estado, COUNT(*) "
+            "FROM citas c JOIN doctores d ON d.id = c.doctor_id GROUP BY 1, 2, 3, 4")
+    
+    def max_numero_id(self, tipo: str) -> int:
+        fila = self._consultar(
+            f"SELECT MAX(CAST(SUBSTR(id, 2) AS INTEGER)) FROM {self._TABLAS[tipo]}")
+        return fila[0][0] or 0
+    
+    def cerrar(self):
+        if not self._cerrado:
+            self._cerrado = True
+            liberar_conexion_sqlite(self._ruta)
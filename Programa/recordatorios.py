@@ -0,0 +1,197 @@
+"""
+RECORDATORIOS
+Programación y envío de avisos de las citas próximas
+"""
+
+from typing import List, Dict, Optional, Iterable, Callable, Tuple, NamedTuple
+import json
+import sys
+import threading
+
+from entidades import Cita
+from eventos import Evento
+from fechas import ColaPrioridadIndexada, MINUTOS_POR_DIA, convertir_desde_minutos, minutos_actuales
+from sistema import SistemaCitasMedicas
+
+
+class Recordatorio(NamedTuple):
+    """Aviso de una cita próxima enviado `antes` minutos antes de su inicio"""
+    cita_id: str
+    paciente: str
+    doctor: str
+    fecha: str
+    hora: str
+    motivo: str
+    antes: int
+    
+    def texto(self) -> str:
+        dias, minutos = divmod(self.antes, MINUTOS_POR_DIA)
+        horas, minutos = divmod(minutos, 60)
+        partes = [f"{valor} {unidad}" for valor, unidad in
+                  ((dias, "d"), (horas, "h"), (minutos, "min")) if valor]
+        aviso = " ".join(partes) + " antes" if partes else "a la hora"
+        return (f"[{aviso}] Cita {self.cita_id}: {self.paciente} con Dr. {self.doctor} "
+                f"el {self.fecha} a las {self.hora} ({self.motivo})")
+
+
+class SalidaConsola:
+    """Destino de recordatorios que los muestra como texto"""
+    
+    def __init__(self, flujo=None):
+        self._flujo = flujo
+    
+    def __call__(self, recordatorio: Recordatorio):
+        print(f"🔔 {recordatorio.texto()}", file=self._flujo or sys.stdout, flush=True)
+    
+    def cerrar(self):
+        pass
+
+
+class SalidaArchivo:
+    """Destino de recordatorios que los anexa como líneas JSON a un archivo"""
+    
+    def __init__(self, ruta: str):
+        self._archivo = open(ruta, "a", encoding="utf-8")
+    
+    def __call__(self, recordatorio: Recordatorio):
+        self._archivo.write(json.dumps(recordatorio._asdict(), ensure_ascii=False) + "\n")
+        self._archivo.flush()
+    
+    def cerrar(self):
+        self._archivo.close()
+
+
+class ProgramadorRecordatorios:
+    """Envía recordatorios de las citas programadas con una o más anticipaciones
+    
+    Cada cita activa futura pone una entrada por anticipación en una
+    ColaPrioridadIndexada ordenada por el momento del aviso: el hilo de fondo
+    solo mira la cima y duerme hasta el próximo aviso, sin recorrer las citas.
+    Los cambios llegan por el bus de eventos del sistema: las citas nuevas se
+    encolan y las canceladas o completadas se quitan en O(log n) por
+    anticipación. Si al encolar una cita sus avisos ya pasaron, se envía de
+    inmediato solo el más cercano a la cita.
+    
+    `salida` es cualquier función que reciba un Recordatorio (ver SalidaConsola
+    y SalidaArchivo); `reloj` retorna los minutos actuales desde EPOCA y puede
+    reemplazarse para simular el paso del tiempo.
+    """
+    
+    ANTICIPACIONES = (24 * 60, 60)
+    ESPERA_MAXIMA = 60.0  # segundos; acota el desfase si el reloj del sistema salta
+    
+    def __init__(self, sistema: SistemaCitasMedicas,
+                 salida: Optional[Callable[[Recordatorio], None]] = None,
+                 antes: Iterable[int] = ANTICIPACIONES, reloj: Callable[[], float] = minutos_actuales):
+        self._antes = tuple(sorted(set(antes), reverse=True))
+        if not self._antes or self._antes[-1] < 0:
+            raise ValueError("Indique anticipaciones en minutos mayores o iguales a cero")
+        self._sistema = sistema
+        self._salida = salida or SalidaConsola()
+        self._reloj = reloj
+        self._cola = ColaPrioridadIndexada()  # (cita_id, antes) -> momento del aviso
+        self._citas: Dict[str, Cita] = {}     # citas con avisos en la cola
+        self._condicion = threading.Condition()
+        self._hilo: Optional[threading.Thread] = None
+        self._detenido = False
+        self.enviados = 0
+        self.fallidos = 0
+    
+    def iniciar(self, en_segundo_plano: bool = True):
+        """Encola las citas activas, sigue los cambios del sistema y arranca el hilo
+        
+        Sin hilo de fondo los avisos se envían llamando a despachar_vencidos.
+        """
+        ahora = self._reloj()
+        with self._condicion:
+            for cita in self._sistema.obtener_citas_activas():
+                self._encolar(cita, ahora)
+        self._sistema.eventos.suscribir(self._al_cambiar_cita, ("cita.agregada", "cita.estado"))
+        if en_segundo_plano and self._hilo is None:
+            self._detenido = False
+            self._hilo = threading.Thread(target=self._ejecutar, name="recordatorios", daemon=True)
+            self._hilo.start()
+    
+    def detener(self):
+        """Deja de seguir al sistema y espera a que termine el hilo"""
+        self._sistema.eventos.desuscribir(self._al_cambiar_cita)
+        with self._condicion:
+            self._detenido = True
+            self._condicion.notify()
+        if self._hilo is not None:
+            self._hilo.join()
+            self._hilo = None
+    
+    def _encolar(self, cita: Cita, ahora: float):
+        if cita.estado != "Programada" or cita.inicio <= ahora:
+            return
+        for antes in self._antes:
+            momento = cita.inicio - antes
+            if momento >= ahora or antes == self._antes[-1]:
+                self._cola.poner((cita.id, antes), momento)
+                self._citas[cita.id] = cita
+    
+    def _quitar(self, cita_id: str):
+        if self._citas.pop(cita_id, None) is not None:
+            for antes in self._antes:
+                self._cola.quitar((cita_id, antes))
+    
+    def _al_cambiar_cita(self, evento: Evento):
+        cita = self._sistema.buscar_cita_por_id(evento.id)
+        with self._condicion:
+            if cita is not None and cita.estado == "Programada":
+                self._encolar(cita, self._reloj())
+            else:
+                self._quitar(evento.id)
+            self._condicion.notify()
+    
+    def despachar_vencidos(self, ahora: Optional[float] = None) -> List[Recordatorio]:
+        """Envía y retorna en orden los avisos cuyo momento ya llegó"""
+        ahora = self._reloj() if ahora is None else ahora
+        vencidos = []
+        with self._condicion:
+            while self._cola and self._cola.cima()[0] <= ahora:
+                _, (cita_id, antes) = self._cola.extraer()
+                cita = self._citas[cita_id]
+                if not any((cita_id, otro) in self._cola for otro in self._antes):
+                    del self._citas[cita_id]
+                fecha, hora = convertir_desde_minutos(cita.inicio)
+                vencidos.append(Recordatorio(cita.id, cita.paciente.nombre, cita.doctor.nombre,
+                                             fecha, hora, cita.motivo, antes))
+        for recordatorio in vencidos:
+            try:
+                self._salida(recordatorio)
+                self.enviados += 1
+            except Exception as e:
+                self.fallidos += 1
+                print(f"❌ No se pudo enviar el recordatorio de {recordatorio.cita_id}: {e}",
+                      file=sys.stderr)
+        return vencidos
+    
+    def _ejecutar(self):
+        while True:
+            with self._condicion:
+                if self._detenido:
+                    return
+                cima = self._cola.cima()
+                espera = self.ESPERA_MAXIMA if cima is None else (cima[0] - self._reloj()) * 60
+                if espera > 0:
+                    self._condicion.wait(min(espera, self.ESPERA_MAXIMA))
+                    continue
+            self.despachar_vencidos()
+    
+    def proximo(self) -> Optional[Tuple[str, str, int]]:
+        """Retorna (fecha, hora, cita_id) del próximo aviso o None si no hay"""
+        with self._condicion:
+            cima = self._cola.cima()
+        if cima is None:
+            return None
+        momento, (cita_id, _) = cima
+        return (*convertir_desde_minutos(int(momento)), cita_id)
+    
+    @property
+    def salida(self) -> Callable[[Recordatorio], None]:
+        return self._salida
+    
+    def __len__(self) -> int:
+        return len(self._cola)
@@ -0,0 +1,226 @@
+"""
+REPORTES PARALELOS
+Reportes por doctor, por paciente y por periodo repartidos entre procesos
+"""
+
+from array import array
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Optional, Callable, Tuple, NamedTuple
+import csv
+import json
+import os
+
+from entidades import Cita
+from fechas import ESTADOS_CITA, MINUTOS_POR_DIA, PROGRAMADA, convertir_desde_minutos
+from sistema import SistemaCitasMedicas
+
+
+class Reporte(NamedTuple):
+    """Reporte armado por GeneradorReportes: vista de consola, filas y totales"""
+    titulo: str
+    lineas: List[str]
+    columnas: Tuple[str, ...]
+    filas: List[tuple]
+    totales: Dict[str, int]
+    
+    def guardar(self, ruta: str):
+        """Guarda el reporte en CSV o JSON según la extensión del archivo"""
+        if ruta.lower().endswith(".csv"):
+            with open(ruta, "w", encoding="utf-8", newline="") as archivo:
+                escritor = csv.writer(archivo)
+                escritor.writerow(self.columnas)
+                escritor.writerows(self.filas)
+        elif ruta.lower().endswith(".json"):
+            with open(ruta, "w", encoding="utf-8") as archivo:
+                json.dump({"titulo": self.titulo, "totales": self.totales,
+                           "filas": [dict(zip(self.columnas, fila)) for fila in self.filas]},
+                          archivo, ensure_ascii=False)
+        else:
+            raise ValueError("Formato no soportado (use .csv o .json)")
+
+
+def _procesar_grupos(particion: tuple) -> Tuple[List[str], List[tuple], Counter]:
+    """Agrega y formatea una partición de citas agrupadas por doctor o paciente
+    
+    Corre en los procesos del pool, así que solo recibe datos planos: la tabla
+    de contrapartes (ids y nombres) y por cada grupo sus columnas de citas.
+    """
+    ids, nombres, prefijo, grupos = particion
+    lineas, filas, totales = [], [], Counter()
+    fechas: Dict[int, str] = {}
+    for datos, titulo, inicios, estados, contrapartes in grupos:
+        lineas.append(f"\n{titulo}:")
+        for inicio, estado, contraparte in zip(inicios, estados, contrapartes):
+            # Cada fecha se formatea una sola vez; la hora sale de los minutos del día
+            dia, minuto = divmod(inicio, MINUTOS_POR_DIA)
+            fecha = fechas.get(dia)
+            if fecha is None:
+                fecha = fechas[dia] = convertir_desde_minutos(dia * MINUTOS_POR_DIA)[0]
+            hora = f"{minuto // 60:02d}:{minuto % 60:02d}"
+            icono = "✅" if estado == PROGRAMADA else "❌"
+            lineas.append(f"   {icono} {fecha} {hora} - {prefijo}{nombres[contraparte]}")
+            filas.append(datos + (ids[contraparte], nombres[contraparte], fecha, hora,
+                                  ESTADOS_CITA[estado]))
+            totales[ESTADOS_CITA[estado]] += 1
+    return lineas, filas, totales
+
+
+def _procesar_periodo(particion: tuple) -> Tuple[List[str], List[tuple], Counter]:
+    """Agrega por día, especialidad y estado una partición de días consecutivos"""
+    especialidades, inicios, duraciones, estados, indices = particion
+    por_dia: Dict[int, Counter] = {}
+    for inicio, duracion, estado, indice in zip(inicios, duraciones, estados, indices):
+        contador = por_dia.setdefault(inicio // MINUTOS_POR_DIA, Counter())
+        contador[indice, estado] += 1
+        if estado == PROGRAMADA:
+            contador[indice, -1] += duracion  # minutos reservados
+    
+    lineas, filas, totales = [], [], Counter()
+    for dia in sorted(por_dia):
+        fecha = convertir_desde_minutos(dia * MINUTOS_POR_DIA)[0]
+        del_dia = Counter()
+        for (indice, estado), cantidad in sorted(por_dia[dia].items()):
+            if estado < 0:
+                continue
+            minutos = por_dia[dia][indice, -1] if estado == PROGRAMADA else 0
+            filas.append((fecha, especialidades[indice], ESTADOS_CITA[estado], cantidad, minutos))
+            del_dia[ESTADOS_CITA[estado]] += cantidad
+        totales.update(del_dia)
+        detalle = ", ".join(f"{del_dia[estado]} {estado.lower()}s" for estado in ESTADOS_CITA
+                            if del_dia[estado])
+        lineas.append(f"   {fecha}: {sum(del_dia.values())} citas ({detalle})")
+    return lineas, filas, totales
+
+
+class GeneradorReportes:
+    """Genera reportes de citas repartiendo el trabajo entre varios procesos
+    
+    Las citas se dividen en particiones (por doctor, por paciente o por rango
+    de fechas) de tamaño parecido y cada una se envía al pool como columnas
+    compactas (arreglos y una tabla de nombres sin repetir). Los procesos
+    agregan y formatean su parte y los resultados se unen en el orden de las
+    particiones, así que el reporte es idéntico con uno o con varios procesos.
+    Con pocas citas todo corre en el proceso actual.
+    """
+    
+    UMBRAL_PARALELO = 50_000
+    PARTICIONES_POR_PROCESO = 4
+    MIN_CITAS_PARTICION = 5_000
+    
+    COLUMNAS_DOCTOR = ("doctor_id", "doctor", "especialidad", "paciente_id", "paciente",
+                       "fecha", "hora", "estado")
+    COLUMNAS_PACIENTE = ("paciente_id", "paciente", "doctor_id", "doctor", "fecha", "hora", "estado")
+    COLUMNAS_PERIODO = ("fecha", "especialidad", "estado", "citas", "minutos_programados")
+    
+    def __init__(self, sistema: SistemaCitasMedicas, procesos: Optional[int] = None):
+        self._sistema = sistema
+        self._procesos = max(1, procesos or os.cpu_count() or 1)
+    
+    def citas_por_doctor(self) -> Reporte:
+        return self._por_grupo(True)
+    
+    def citas_por_paciente(self) -> Reporte:
+        return self._por_grupo(False)
+    
+    def resumen_periodo(self, desde_fecha: str, hasta_fecha: str) -> Reporte:
+        """Totales diarios por especialidad y estado entre dos fechas (ambas incluidas)"""
+        citas = list(self._sistema.citas_entre(desde_fecha, hasta_fecha))
+        especialidades: Dict[str, int] = {}
+        indices = array("I", [especialidades.setdefault(cita.doctor.especialidad, len(especialidades))
+                              for cita in citas])
+        tabla = list(especialidades)
+        
+        # Los cortes caen en cambios de día para que ningún día quede repartido
+        objetivo = self._tamano_particion(len(citas))
+        cortes = [0]
+        for posicion in range(1, len(citas)):
+            if (posicion - cortes[-1] >= objetivo
+                    and citas[posicion].inicio // MINUTOS_POR_DIA
+                    != citas[posicion - 1].inicio // MINUTOS_POR_DIA):
+                cortes.append(posicion)
+        cortes.append(len(citas))
+        particiones = [(tabla,
+                        array("q", [cita.inicio for cita in citas[desde:hasta]]),
+                        array("I", [cita.duracion for cita in citas[desde:hasta]]),
+                        bytes(cita.codigo_estado for cita in citas[desde:hasta]),
+                        indices[desde:hasta])
+                       for desde, hasta in zip(cortes, cortes[1:])]
+        
+        return self._reporte(f"RESUMEN DEL {desde_fecha} AL {hasta_fecha}", self.COLUMNAS_PERIODO,
+                             _procesar_periodo, particiones, len(citas))
+    
+    def _tamano_particion(self, total: int) -> int:
+        return max(self.MIN_CITAS_PARTICION,
+                   -(-total // (self._procesos * self.PARTICIONES_POR_PROCESO)))
+    
+    def _por_grupo(self, por_doctor: bool) -> Reporte:
+        entidades = self._sistema.doctores if por_doctor else self._sistema.pacientes
+        # Una sola pasada por las citas, válida también con carga diferida
+        posiciones = {entidad.id: posicion for posicion, entidad in enumerate(entidades)}
+        citas_de: List[List[Cita]] = [[] for _ in posiciones]
+        total = 0
+        for cita in self._sistema.citas:
+            citas_de[posiciones[(cita.doctor if por_doctor else cita.paciente).id]].append(cita)
+            total += 1
+        
+        objetivo = self._tamano_particion(total)
+        particiones, bloque, en_bloque = [], [], 0
+        for entidad, citas in zip(entidades, citas_de):
+            if citas:
+                bloque.append((entidad, citas))
+                en_bloque += len(citas)
+            if en_bloque >= objetivo:
+                particiones.append(self._serializar_grupos(bloque, por_doctor))
+                bloque, en_bloque = [], 0
+        if bloque:
+            particiones.append(self._serializar_grupos(bloque, por_doctor))
+        
+        if por_doctor:
+            return self._reporte("CITAS POR DOCTOR", self.COLUMNAS_DOCTOR,
+                                 _procesar_grupos, particiones, total)
+        return self._reporte("CITAS POR PACIENTE", self.COLUMNAS_PACIENTE,
+                             _procesar_grupos, particiones, total)
+    
+    @staticmethod
+    def _serializar_grupos(bloque: List[Tuple[object, List[Cita]]], por_doctor: bool) -> tuple:
+        """Convierte un bloque de entidades y sus citas en datos planos para el pool"""
+        tabla: Dict[str, int] = {}
+        ids, nombres, grupos = [], [], []
+        for entidad, citas in bloque:
+            if por_doctor:
+                datos = (entidad.id, entidad.nombre, entidad.especialidad)
+                titulo = f"Dr. {entidad.nombre} - {entidad.especialidad}"
+            else:
+                datos = (entidad.id, entidad.nombre)
+                titulo = entidad.nombre
+            contrapartes = array("I")
+            for cita in citas:
+                contraparte = cita.paciente if por_doctor else cita.doctor
+                indice = tabla.get(contraparte.id)
+                if indice is None:
+                    indice = tabla[contraparte.id] = len(ids)
+                    ids.append(contraparte.id)
+                    nombres.append(contraparte.nombre)
+                contrapartes.append(indice)
+            grupos.append((datos, titulo, array("q", [cita.inicio for cita in citas]),
+                           bytes(cita.codigo_estado for cita in citas), contrapartes))
+        return ids, nombres, "" if por_doctor else "Dr. ", grupos
+    
+    def _reporte(self, titulo: str, columnas: Tuple[str, ...], procesar: Callable,
+                 particiones: List[tuple], total: int) -> Reporte:
+        """Procesa las particiones (en paralelo si conviene) y une los resultados en orden"""
+        if self._procesos > 1 and len(particiones) > 1 and total >= self.UMBRAL_PARALELO:
+            with ProcessPoolExecutor(min(self._procesos, len(particiones))) as pool:
+                resultados = list(pool.map(procesar, particiones))
+        else:
+            resultados = list(map(procesar, particiones))
+        
+        lineas, filas, totales = [], [], Counter()
+        for lineas_particion, filas_particion, totales_particion in resultados:
+            lineas.extend(lineas_particion)
+            filas.extend(filas_particion)
+            totales.update(totales_particion)
+        totales = {"citas": sum(totales.values()),
+                   **{estado: totales[estado] for estado in ESTADOS_CITA}}
+        return Reporte(titulo, lineas, columnas, filas, totales)
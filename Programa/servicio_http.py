@@ -0,0 +1,508 @@
+"""
+SERVICIO HTTP
+API HTTP/JSON sobre asyncio y probador de carga contra ella
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import List, Optional, Callable, Tuple, NamedTuple
+from urllib.parse import parse_qsl, urlsplit
+import asyncio
+import json
+import random
+import re
+import time
+
+from entidades import json_cita, json_doctor, json_paciente
+from espera import json_solicitud
+from fechas import DURACION_CITA_MINUTOS, FORMATO_FECHA
+from identificadores import GestorIDs
+from importacion import ImportadorMasivo
+from sistema import SistemaCitasMedicas, conflicto_reserva, json_estadisticas
+
+
+class ErrorHTTP(Exception):
+    """Error que se responde al cliente con el código de estado indicado"""
+    
+    def __init__(self, estado: int, mensaje: str):
+        super().__init__(mensaje)
+        self.estado = estado
+
+
+class ServicioHTTP:
+    """API HTTP/JSON sobre SistemaCitasMedicas basada en asyncio
+    
+    Cada conexión se atiende en su propia tarea. Los manejadores corren en un
+    único hilo de trabajo, fuera del bucle, para que un reporte lento no
+    frene el protocolo de las demás conexiones; como el modelo no es seguro
+    entre hilos, ese hilo es el único que lo toca. Las escrituras se encolan
+    y las aplica una única tarea escritora, una a la vez y en orden de
+    llegada, de modo que dos reservas del mismo horario nunca se cruzan.
+    """
+    
+    MAX_ESCRITURAS_PENDIENTES = 1000
+    MAX_CUERPO = 1 << 20
+    TAMANO_MAXIMO_PAGINA = 500
+    ESTADOS_HTTP = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found",
+                    405: "Method Not Allowed", 409: "Conflict", 413: "Payload Too Large",
+                    431: "Request Header Fields Too Large", 500: "Internal Server Error"}
+    
+    def __init__(self, sistema: SistemaCitasMedicas, host: str = "127.0.0.1", puerto: int = 8080):
+        self._sistema = sistema
+        self._importador = ImportadorMasivo(sistema)
+        self._host = host
+        self._puerto = puerto
+        self._servidor: Optional['asyncio.Server'] = None
+        self._escrituras: Optional['asyncio.Queue'] = None
+        self._escritor: Optional['asyncio.Task'] = None
+        self._ejecutor: Optional[ThreadPoolExecutor] = None
+        # (método, patrón, manejador, es escritura)
+        self._rutas = [
+            ("GET", r"/pacientes", self._listar_pacientes, False),
+            ("POST", r"/pacientes", self._registrar_paciente, True),
+            ("GET", r"/pacientes/(?P<id>[^/]+)", self._ver_paciente, False),
+            ("GET", r"/doctores", self._listar_doctores, False),
+            ("POST", r"/doctores", self._registrar_doctor, True),
+            ("GET", r"/doctores/(?P<id>[^/]+)", self._ver_doctor, False),
+            ("GET", r"/doctores/(?P<id>[^/]+)/huecos", self._huecos_doctor, False),
+            ("GET", r"/huecos", self._huecos_especialidad, False),
+            ("GET", r"/especialidades", self._especialidades, False),
+            ("GET", r"/recomendacion", self._recomendacion, False),
+            ("GET", r"/citas", self._listar_citas, False),
+            ("POST", r"/citas", self._programar_cita, True),
+            ("GET", r"/citas/(?P<id>[^/]+)", self._ver_cita, False),
+            ("POST", r"/citas/(?P<id>[^/]+)/cancelar", self._cancelar_cita, True),
+            ("GET", r"/reportes/estadisticas", self._estadisticas, False),
+            ("GET", r"/agenda", self._agenda, False),
+            ("POST", r"/espera", self._solicitar_espera, True),
+            ("GET", r"/espera/metricas", self._metricas_espera, False),
+            ("GET", r"/espera/(?P<id>[^/]+)", self._ver_espera, False),
+            ("POST", r"/espera/(?P<id>[^/]+)/retirar", self._retirar_espera, True),
+        ]
+        self._rutas = [(metodo, re.compile(patron + "$"), manejador, escritura)
+                       for metodo, patron, manejador, escritura in self._rutas]
+    
+    @property
+    def puerto(self) -> int:
+        """Puerto en uso (el real si se pidió el 0)"""
+        if self._servidor and self._servidor.sockets:
+            return self._servidor.sockets[0].getsockname()[1]
+        return self._puerto
+    
+    async def iniciar(self):
+        """Abre el socket y arranca la tarea escritora"""
+        self._ejecutor = ThreadPoolExecutor(1, thread_name_prefix="servicio_http")
+        self._escrituras = asyncio.Queue(self.MAX_ESCRITURAS_PENDIENTES)
+        self._escritor = asyncio.create_task(self._aplicar_escrituras())
+        self._servidor = await asyncio.start_server(self._atender, self._host, self._puerto)
+    
+    async def servir(self):
+        """Atiende peticiones hasta que se cancele la tarea"""
+        await self.iniciar()
+        print(f"🌐 Servicio escuchando en http://{self._host}:{self.puerto}")
+        try:
+            await self._servidor.serve_forever()
+        finally:
+            await self.detener()
+    
+    async def detener(self):
+        """Cierra el socket y espera a que se apliquen las escrituras pendientes"""
+        if self._servidor:
+            self._servidor.close()
+            await self._servidor.wait_closed()
+        if self._escritor:
+            await self._escrituras.join()
+            self._escritor.cancel()
+            self._escritor = None
+        if self._ejecutor:
+            self._ejecutor.shutdown()
+            self._ejecutor = None
+    
+    # ---------- Escrituras serializadas ----------
+    
+    async def _aplicar_escrituras(self):
+        bucle = asyncio.get_running_loop()
+        while True:
+            operacion, futuro = await self._escrituras.get()
+            try:
+                if not futuro.cancelled():
+                    resultado = await bucle.run_in_executor(self._ejecutor, operacion)
+                    if not futuro.cancelled():
+                        futuro.set_result(resultado)
+            except Exception as e:
+                if not futuro.cancelled():
+                    futuro.set_exception(e)
+            finally:
+                self._escrituras.task_done()
+    
+    async def _escribir(self, operacion: Callable[[], tuple]) -> tuple:
+        futuro = asyncio.get_running_loop().create_future()
+        await self._escrituras.put((operacion, futuro))
+        return await futuro
+    
+    # ---------- Protocolo HTTP ----------
+    
+    @staticmethod
+    async def _leer_linea(lector: 'asyncio.StreamReader') -> bytes:
+        try:
+            return await lector.readline()
+        except ValueError:
+            # readline descarta la línea que supera el límite del lector
+            raise ErrorHTTP(431, "Línea de petición o cabecera demasiado larga") from None
+    
+    async def _leer_cabeceras(self, lector: 'asyncio.StreamReader') -> Optional[tuple]:
+        """Lee la línea de petición y las cabeceras; None si el cliente terminó"""
+        linea = await self._leer_linea(lector)
+        if not linea.strip():
+            return None
+        try:
+            metodo, objetivo, version = linea.decode("latin-1").split()
+        except ValueError:
+            raise ErrorHTTP(400, "Petición mal formada") from None
+        cabeceras = {}
+        while True:
+            cabecera = await self._leer_linea(lector)
+            if cabecera in (b"\r\n", b"\n", b""):
+                break
+            nombre, separador, valor = cabecera.decode("latin-1").partition(":")
+            if not separador or not nombre.strip():
+                raise ErrorHTTP(400, "Cabecera mal formada")
+            cabeceras[nombre.strip().lower()] = valor.strip()
+        return metodo, objetivo, version, cabeceras
+    
+    async def _atender(self, lector: 'asyncio.StreamReader', escritor: 'asyncio.StreamWriter'):
+        try:
+            while True:
+                try:
+                    peticion = await self._leer_cabeceras(lector)
+                except ErrorHTTP as e:
+                    await self._responder(escritor, e.estado, {"error": str(e)}, False)
+                    break
+                if peticion is None:
+                    break
+                metodo, objetivo, version, cabeceras = peticion
+                
+                conexion = cabeceras.get("connection", "").lower()
+                mantener = conexion != "close" if version == "HTTP/1.1" else conexion == "keep-alive"
+                try:
+                    largo = int(cabeceras.get("content-length") or 0)
+                    if largo < 0:
+                        raise ValueError
+                except ValueError:
+                    await self._responder(escritor, 400, {"error": "Content-Length no válido"}, False)
+                    break
+                if largo > self.MAX_CUERPO:
+                    await self._responder(escritor, 413, {"error": "Cuerpo demasiado grande"}, False)
+                    break
+                cuerpo = await lector.readexactly(largo) if largo else b""
+                
+                try:
+                    estado, datos = await self._despachar(metodo, objetivo, cuerpo)
+                except Exception as e:
+                    # Ningún error debe cortar la conexión sin respuesta
+                    estado, datos = 500, {"error": f"Error inesperado: {e}"}
+                await self._responder(escritor, estado, datos, mantener)
+                if not mantener:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            escritor.close()
+    
+    async def _responder(self, escritor: 'asyncio.StreamWriter', estado: int, datos, mantener: bool):
+        cuerpo = json.dumps(datos, ensure_ascii=False).encode("utf-8")
+        cabecera = (f"HTTP/1.1 {estado} {self.ESTADOS_HTTP.get(estado, '')}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(cuerpo)}\r\n"
+                    f"Connection: {'keep-alive' if mantener else 'close'}\r\n\r\n")
+        escritor.write(cabecera.encode("latin-1") + cuerpo)
+        await escritor.drain()
+    
+    async def _despachar(self, metodo: str, objetivo: str, cuerpo: bytes) -> tuple:
+        partes = urlsplit(objetivo)
+        ruta = partes.path.rstrip("/") or "/"
+        consulta = dict(parse_qsl(partes.query))
+        metodo_valido = False
+        for metodo_ruta, patron, manejador, escritura in self._rutas:
+            coincidencia = patron.match(ruta)
+            if not coincidencia:
+                continue
+            if metodo_ruta != metodo:
+                metodo_valido = True
+                continue
+            try:
+                datos = json.loads(cuerpo) if cuerpo else {}
+                if not isinstance(datos, dict):
+                    raise ErrorHTTP(400, "Se espera un objeto JSON")
+                parametros = coincidencia.groupdict()
+                if escritura:
+                    return await self._escribir(lambda: manejador(parametros, consulta, datos))
+                return await asyncio.get_running_loop().run_in_executor(
+                    self._ejecutor, manejador, parametros, consulta, datos)
+            except ErrorHTTP as e:
+                return e.estado, {"error": str(e)}
+            except json.JSONDecodeError as e:
+                return 400, {"error": f"JSON no válido: {e.msg}"}
+            except (ValueError, TypeError) as e:
+                return 400, {"error": str(e)}
+            except Exception as e:
+                return 500, {"error": f"Error inesperado: {e}"}
+        if metodo_valido:
+            return 405, {"error": f"Método {metodo} no permitido en {ruta}"}
+        return 404, {"error": f"Ruta no encontrada: {ruta}"}
+    
+    # ---------- Manejadores ----------
+    
+    def _pagina(self, consulta: dict) -> Tuple[int, int]:
+        try:
+            tamano = int(consulta.get("tamano", 20))
+            cursor = int(consulta.get("cursor", 0))
+        except ValueError:
+            raise ErrorHTTP(400, "tamano y cursor deben ser números") from None
+        return max(1, min(tamano, self.TAMANO_MAXIMO_PAGINA)), max(0, cursor)
+    
+    def _buscar(self, buscar: Callable[[str], object], entidad_id: str, nombre: str):
+        entidad = buscar(entidad_id)
+        if entidad is None:
+            raise ErrorHTTP(404, f"{nombre} {entidad_id} no encontrado")
+        return entidad
+    
+    def _listar_pacientes(self, parametros: dict, consulta: dict, datos: dict) -> tuple:
+        if consulta.get("buscar"):
+            tamano, _ = self._pagina(consulta)
+            pacientes = self._sistema.buscar_pacientes(consulta["buscar"], tamano)
+            return 200, {"elementos": list(map(json_paciente, pacientes)), "cursor": None}
+        pagina = self._sistema.paginar_pacientes(*self._pagina(consulta),
+                                                 nombre=consulta.get("nombre", ""))
+        return 200, {"elementos": list(map(json_paciente, pagina.elementos)),
+                     "cursor": pagina.cursor}
+    
+    def _ver_paciente(self, parametros: dict, consulta: dict, datos: dict) -> tuple:
+        paciente = self._buscar(self._sistema.buscar_paciente_por_id, parametros["id"], "Paciente")
+        return 200, json_paciente(paciente)
+    
+    def _registrar_paciente(self, parametros: dict, consulta: dict, datos: dict) -> tuple:
+        paciente = self._importador.crear_paciente(datos, GestorIDs.reservar_bloque("paciente", 1))
+        if not self._sistema.agregar_paciente(paciente):
+            raise ErrorHTTP(409, f"ID duplicado: {paciente.id}")
+        return 201, json_paciente(paciente)
+    
+    def _listar_doctores(self, parametros: dict, consulta: dict, datos: dict) -> tuple:
+        pagina = self._sistema.paginar_doctores(*self._pagina(consulta),
+                                                especialidad=consulta.get("especialidad", ""))
+        return 200, {"elementos": list(map(json_doctor, pagina.elementos)),
+                     "cursor": pagina.cursor}
+    
+    def _ver_doctor(self, parametros: dict, consulta: dict, datos: dict) -> tuple:
+        doctor = self._buscar(self._sistema.buscar_doctor_por_id, parametros["id"], "Doctor")
+        return 200, json_doctor(doctor)
+    
+    def _registrar_doctor(self, parametros: dict, consulta: dict, datos: dict) -> tuple:
+        doctor = self._importador.crear_doctor(datos, GestorIDs.reservar_bloque("doctor", 1))
+        if not self._sistema.agregar_doctor(doctor):
+            raise ErrorHTTP(409, f"ID duplicado: {doctor.id}")
+        return 201, json_doctor(doctor)
+    
+    def _rango_fechas(self, consulta: dict) -> Tuple[str, str, int]:
+        desde = consulta.get("desde") or datetime.now().strftime(FORMATO_FECHA)
+        hasta = consulta.get("hasta") or (datetime.strptime(desde, FORMATO_FECHA)
+                                          + timedelta(days=14)).strftime(FORMATO_FECHA)
+        return desde, hasta, min(int(consulta.get("cantidad", 5)), self.TAMANO_MAXIMO_PAGINA)
+    
+    def _huecos_doctor(self, parametros: dict, consulta: dict, datos: dict) -> tuple:
+        doctor = self._buscar(self._sistema.buscar_doctor_por_id, parametros["id"], "Doctor")
+        huecos = self._sistema.buscar_huecos_libres(doctor.id, *self._rango_fechas(consulta))
+        return 200, [{"fecha": fecha, "hora": hora} for fecha, hora in huecos]
+    
+    def _huecos_especialidad(self, parametros: dict, consulta: dict, datos: dict) -> tuple:
+        especialidad = consulta.get("especialidad")
+        if not especialidad:
+            raise ErrorHTTP(400, "El parámetro 'especialidad' es obligatorio")
+        huecos = self._sistema.buscar_huecos_especialidad(especialidad, *self._rango_fechas(consulta))
+        return 200, [{"fecha": fecha, "hora": hora, "doctor_id": doctor.id}
+                     for fecha, hora, doctor in huecos]
+    
+    def _especialidades(self, parametros: dict, consulta: dict, datos: dict) -> tuple:
+        return 200, self._sistema.especialidades()
+    
+    def _recomendacion(self, parametros: dict, consulta: dict, datos: dict) -> tuple:
+        especialidad = consulta.get("especialidad")
+        if not especialidad:
+            raise ErrorHTTP(400, "El parámetro 'especialidad' es obligatorio")
+        desde, hasta, _ = self._rango_fechas(consulta)
+        duracion = int(consulta.get("duracion") or DURACION_CITA_MINUTOS)
+        recomendacion = self._sistema.recomendar_doctor(especialidad, desde, hasta, duracion)
+        if recomendacion is None:
+            raise ErrorHTTP(404, f"No hay horarios libres en {especialidad}")
+        return 200, {"doctor": json_doctor(recomendacion.doctor), "fecha": recomendacion.fecha,
+                     "hora": recomendacion.hora, "carga": recomendacion.carga}
+    
+    def _listar_citas(self, parametros: dict, consulta: dict, datos: dict) -> tuple:
+        pagina = self._sistema.paginar_citas(
+            *self._pagina(consulta), estado=consulta.get("estado"),
+            doctor_id=consulta.get("doctor_id"), paciente_id=consulta.get("paciente_id"),
+            desde_fecha=consulta.get("desde"))
+        return 200, {"elementos": list(map(json_cita, pagina.elementos)), "cursor": pagina.cursor}
+    
+    def _ver_cita(self, parametros: dict, consulta: dict, datos: dict) -> tuple:
+        cita = self._buscar(self._sistema.buscar_cita_por_id, parametros["id"], "Cita")
+        return 200, json_cita(cita)
+    
+    def _programar_cita(self, parametros: dict, consulta: dict, datos: dict) -> tuple:
+        conflicto = conflicto_reserva(self._sistema, datos)
+        if conflicto:
+            raise ErrorHTTP(409, conflicto)
+        cita = self._importador.crear_cita(datos, GestorIDs.reservar_bloque("cita", 1))
+        self._sistema.agregar_cita(cita)
+        return 201, json_cita(cita)
+    
+    def _cancelar_cita(self, parametros: dict, consulta: dict, datos: dict) -> tuple:
+        cita = self._buscar(self._sistema.buscar_cita_por_id, parametros["id"], "Cita")
+        self._sistema.cancelar_cita(cita.id)
+        return 200, json_cita(cita)
+    
+    def _agenda(self, parametros: dict, consulta: dict, datos: dict) -> tuple:
+        fecha = consulta.get("fecha") or datetime.now().strftime(FORMATO_FECHA)
+        if consulta.get("doctor_id"):
+            citas = self._sistema.agenda_doctor(consulta["doctor_id"], fecha)
+        else:
+            citas = self._sistema.agenda_del_dia(fecha)
+        return 200, list(map(json_cita, citas))
+    
+    def _estadisticas(self, parametros: dict, consulta: dict, datos: dict) -> tuple:
+        return 200, json_estadisticas(self._sistema)
+    
+    def _solicitar_espera(self, parametros: dict, consulta: dict, datos: dict) -> tuple:
+        solicitud = self._sistema.lista_espera.agregar(
+            str(datos.get("paciente_id", "")), str(datos.get("especialidad", "")),
+            str(datos.get("doctor_id", "")), datos.get("desde"), datos.get("hasta"),
+            int(datos.get("urgencia") or 0), str(datos.get("motivo") or "Lista de espera"))
+        return 201, json_solicitud(solicitud)
+    
+    def _ver_espera(self, parametros: dict, consulta: dict, datos: dict) -> tuple:
+        solicitud = self._buscar(self._sistema.lista_espera.obtener, parametros["id"], "Pedido de espera")
+        return 200, json_solicitud(solicitud)
+    
+    def _retirar_espera(self, parametros: dict, consulta: dict, datos: dict) -> tuple:
+        solicitud = self._buscar(self._sistema.lista_espera.obtener, parametros["id"], "Pedido de espera")
+        self._sistema.lista_espera.retirar(solicitud.id)
+        return 200, json_solicitud(solicitud)
+    
+    def _metricas_espera(self, parametros: dict, consulta: dict, datos: dict) -> tuple:
+        return 200, self._sistema.lista_espera.metricas()
+
+
+class ResultadoCarga(NamedTuple):
+    """Resultado de una prueba de carga"""
+    peticiones: int
+    errores: int
+    segundos: float
+    latencias_ms: List[float]
+    
+    def percentil(self, p: float) -> float:
+        if not self.latencias_ms:
+            return 0.0
+        ordenadas = sorted(self.latencias_ms)
+        return ordenadas[min(len(ordenadas) - 1, int(p / 100 * len(ordenadas)))]
+    
+    @property
+    def peticiones_por_segundo(self) -> float:
+        return self.peticiones / self.segundos if self.segundos else 0.0
+    
+    def __str__(self) -> str:
+        return (f"{self.peticiones:,} peticiones en {self.segundos:.2f} s "
+                f"({self.peticiones_por_segundo:,.0f} req/s), {self.errores} errores, "
+                f"p50 {self.percentil(50):.2f} ms, p99 {self.percentil(99):.2f} ms")
+
+
+class ProbadorCarga:
+    """Genera carga mixta contra un ServicioHTTP en localhost
+    
+    Cada cliente mantiene una conexión keep-alive y envía peticiones hasta
+    agotar el total; la mezcla incluye listados, huecos libres, reportes y una
+    fracción de reservas. Un 409 por horario ocupado no cuenta como error.
+    """
+    
+    def __init__(self, host: str = "127.0.0.1", puerto: int = 8080, clientes: int = 50,
+                 peticiones: int = 5000, proporcion_escrituras: float = 0.1, semilla: int = 42):
+        self._host = host
+        self._puerto = puerto
+        self._clientes = clientes
+        self._peticiones = peticiones
+        self._proporcion_escrituras = proporcion_escrituras
+        self._azar = random.Random(semilla)
+    
+    async def _peticion(self, lector: 'asyncio.StreamReader', escritor: 'asyncio.StreamWriter',
+                        metodo: str, ruta: str, datos: Optional[dict] = None) -> Tuple[int, object]:
+        cuerpo = json.dumps(datos).encode("utf-8") if datos is not None else b""
+        escritor.write(f"{metodo} {ruta} HTTP/1.1\r\nHost: {self._host}\r\n"
+                       f"Content-Length: {len(cuerpo)}\r\n\r\n".encode("latin-1") + cuerpo)
+        await escritor.drain()
+        estado = int((await lector.readline()).split()[1])
+        largo = 0
+        while True:
+            cabecera = await lector.readline()
+            if cabecera in (b"\r\n", b""):
+                break
+            nombre, _, valor = cabecera.decode("latin-1").partition(":")
+            if nombre.lower() == "content-length":
+                largo = int(valor)
+        return estado, json.loads(await lector.readexactly(largo)) if largo else None
+    
+    def _siguiente_peticion(self, pacientes: List[str], doctores: List[str]) -> tuple:
+        doctor_id = self._azar.choice(doctores)
+        if self._azar.random() < self._proporcion_escrituras:
+            dia = datetime.now() + timedelta(days=self._azar.randint(1, 60))
+            hora = f"{self._azar.randint(8, 16):02d}:{self._azar.choice((0, 30)):02d}"
+            return "POST", "/citas", {"paciente_id": self._azar.choice(pacientes),
+                                      "doctor_id": doctor_id, "fecha": dia.strftime(FORMATO_FECHA),
+                                      "hora": hora, "motivo": "Prueba de carga"}
+        return self._azar.choice((
+            ("GET", "/citas?tamano=20", None),
+            ("GET", f"/citas?doctor_id={doctor_id}&estado=Programada", None),
+            ("GET", f"/doctores/{doctor_id}/huecos?cantidad=5", None),
+            ("GET", "/reportes/estadisticas", None),
+        ))
+    
+    async def ejecutar(self) -> ResultadoCarga:
+        """Lanza los clientes y retorna las métricas medidas"""
+        lector, escritor = await asyncio.open_connection(self._host, self._puerto)
+        _, pagina_pacientes = await self._peticion(lector, escritor, "GET", "/pacientes?tamano=500")
+        _, pagina_doctores = await self._peticion(lector, escritor, "GET", "/doctores?tamano=500")
+        escritor.close()
+        pacientes = [p["id"] for p in pagina_pacientes["elementos"]]
+        doctores = [d["id"] for d in pagina_doctores["elementos"]]
+        if not pacientes or not doctores:
+            raise ValueError("El servicio necesita al menos un paciente y un doctor")
+        
+        pendientes = [self._peticiones]
+        latencias: List[float] = []
+        errores = [0]
+        
+        async def cliente():
+            lector, escritor = await asyncio.open_connection(self._host, self._puerto)
+            try:
+                while pendientes[0] > 0:
+                    pendientes[0] -= 1
+                    metodo, ruta, datos = self._siguiente_peticion(pacientes, doctores)
+                    inicio = time.perf_counter()
+                    estado, _ = await self._peticion(lector, escritor, metodo, ruta, datos)
+                    latencias.append((time.perf_counter() - inicio) * 1000)
+                    if estado >= 400 and estado != 409:
+                        errores[0] += 1
+            finally:
+                escritor.close()
+        
+        inicio = time.perf_counter()
+        await asyncio.gather(*(cliente() for _ in range(self._clientes)))
+        return ResultadoCarga(len(latencias), errores[0], time.perf_counter() - inicio, latencias)
+
+
+async def probar_carga_local(sistema: SistemaCitasMedicas, **opciones) -> ResultadoCarga:
+    """Levanta un ServicioHTTP en un puerto libre y lo somete a carga"""
+    servicio = ServicioHTTP(sistema, "127.0.0.1", 0)
+    await servicio.iniciar()
+    try:
+        return await ProbadorCarga("127.0.0.1", servicio.puerto, **opciones).ejecutar()
+    finally:
+        await servicio.detener()
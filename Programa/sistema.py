@@ -0,0 +1,676 @@
+"""
+GESTIÓN Y CONTROLADORES
+Sistema de citas médicas: alta, búsqueda, cancelación y estadísticas
+"""
+
+from collections import Counter
+from typing import List, Dict, Optional, Iterator, Iterable, Callable, Tuple, NamedTuple
+import json
+
+from entidades import Cita, Doctor, Paciente, json_cita, json_doctor, json_paciente
+from espera import ListaEspera
+from eventos import BusEventos
+from fechas import (DURACION_CITA_MINUTOS, IndiceTemporal, MINUTOS_POR_DIA, convertir_a_minutos,
+                    convertir_desde_minutos)
+from identificadores import GestorIDs
+from indices import IndiceEspecialidades, IndicePacientes, MotorDisponibilidad, RegistroEntidades
+from persistencia import Repositorio, RepositorioMemoria
+
+
+class Recomendacion(NamedTuple):
+    """Doctor sugerido para una especialidad con su primer horario libre"""
+    doctor: Doctor
+    fecha: str
+    hora: str
+    carga: int
+
+
+class Pagina(NamedTuple):
+    """Página de resultados; `cursor` permite pedir la siguiente (None si no hay más)"""
+    elementos: list
+    cursor: Optional[int]
+
+
+def paginar(elementos: Iterator[Tuple[int, object]], tamano: int) -> Pagina:
+    """Toma hasta `tamano` elementos de un iterador de (posición, elemento)"""
+    pagina, cursor = [], None
+    for posicion, elemento in elementos:
+        if len(pagina) == tamano:
+            cursor = posicion
+            break
+        pagina.append(elemento)
+    return Pagina(pagina, cursor)
+
+
+class EstadisticasCitas:
+    """Contadores de citas mantenidos de forma incremental
+    
+    Se actualizan al agregar citas y con cada cambio de estado, de modo que
+    consultar totales por estado, doctor, especialidad o día es O(1) sin
+    importar el tamaño del historial.
+    """
+    
+    def __init__(self):
+        self._por_estado: Counter = Counter()
+        self._por_doctor: Dict[str, Counter] = {}
+        self._por_especialidad: Dict[str, Counter] = {}
+        self._por_dia: Dict[int, Counter] = {}
+    
+    def _contadores(self, doctor_id: str, especialidad: str, dia: int) -> Tuple[Counter, ...]:
+        return (self._por_estado,
+                self._por_doctor.setdefault(doctor_id, Counter()),
+                self._por_especialidad.setdefault(especialidad, Counter()),
+                self._por_dia.setdefault(dia, Counter()))
+    
+    def sumar(self, doctor_id: str, especialidad: str, dia: int, estado: str, cantidad: int = 1):
+        for contador in self._contadores(doctor_id, especialidad, dia):
+            contador[estado] += cantidad
+    
+    def registrar(self, cita: Cita):
+        """Cuenta una cita nueva"""
+        self.sumar(cita.doctor.id, cita.doctor.especialidad,
+                   cita.inicio // MINUTOS_POR_DIA, cita.estado)
+    
+    def cambiar_estado(self, cita: Cita, anterior: str):
+        """Mueve una cita del contador de su estado anterior al actual"""
+        for contador in self._contadores(cita.doctor.id, cita.doctor.especialidad,
+                                         cita.inicio // MINUTOS_POR_DIA):
+            contador[anterior] -= 1
+            contador[cita.estado] += 1
+    
+    @property
+    def total(self) -> int:
+        return sum(self._por_estado.values())
+    
+    def por_estado(self, estado: Optional[str] = None):
+        """Retorna la cantidad de citas con ese estado o el Counter completo"""
+        return self._por_estado[estado] if estado else Counter(self._por_estado)
+    
+    def por_doctor(self, doctor_id: str) -> Counter:
+        return Counter(self._por_doctor.get(doctor_id, ()))
+    
+    def por_especialidad(self, especialidad: str) -> Counter:
+        return Counter(self._por_especialidad.get(especialidad, ()))
+    
+    def por_dia(self, fecha: str) -> Counter:
+        dia = convertir_a_minutos(fecha, "00:00") // MINUTOS_POR_DIA
+        return Counter(self._por_dia.get(dia, ()))
+    
+    def especialidades(self) -> Dict[str, Counter]:
+        return {especialidad: Counter(contador)
+                for especialidad, contador in self._por_especialidad.items()}
+
+
+class SistemaCitasMedicas:
+    """Clase principal que gestiona todo el sistema de citas"""
+    
+    def __init__(self, repositorio: Optional[Repositorio] = None, datos_ejemplo: bool = False,
+                 eventos: Optional[BusEventos] = None):
+        self._repositorio = repositorio or RepositorioMemoria()
+        self._eventos = eventos or BusEventos()
+        self._lista_espera: Optional['ListaEspera'] = None
+        self._estadisticas = EstadisticasCitas()
+        # Con carga diferida los contadores se leen del repositorio al consultarlos
+        self._estadisticas_pendientes = self._repositorio.carga_diferida
+        self._activas: Dict[str, Cita] = {}
+        self._indice_temporal = IndiceTemporal()
+        self._indice_pacientes: Optional[IndicePacientes] = None  # se arma en la primera búsqueda
+        self._indice_especialidades = IndiceEspecialidades()
+        # Un solo método ligado para todos los pacientes (ver _indexar_paciente)
+        self._oyente_email = self._al_cambiar_email
+        # Escrituras acumuladas mientras hay un lote abierto (ver iniciar_lote)
+        self._pendientes: Optional[Dict[str, list]] = None
+        self._datos_ejemplo_cargados = False
+        # Tareas que esperan a que lo hecho quede guardado (ver al_guardar)
+        self._tras_guardar: List[Callable[[], None]] = []
+        self._pacientes: RegistroEntidades[Paciente] = RegistroEntidades(
+            "paciente", self._repositorio, self._hidratar_paciente)
+        self._doctores: RegistroEntidades[Doctor] = RegistroEntidades(
+            "doctor", self._repositorio, self._hidratar_doctor)
+        self._citas: RegistroEntidades[Cita] = RegistroEntidades(
+            "cita", self._repositorio, self._hidratar_cita)
+        self._disponibilidad = MotorDisponibilidad(self)
+        
+        # Sin carga diferida todo se hidrata al inicio (las citas al final,
+        # porque necesitan a sus pacientes y doctores)
+        if not self._repositorio.carga_diferida:
+            for registro in (self._pacientes, self._doctores, self._citas):
+                registro.cargar_todo()
+        
+        for tipo in ("paciente", "doctor", "cita"):
+            GestorIDs.asegurar_minimo(tipo, self._repositorio.max_numero_id(tipo))
+        
+        if datos_ejemplo and not self._repositorio.solo_lectura and not self._pacientes \
+                and not self._doctores:
+            self._cargar_datos_ejemplo()
+    
+    @property
+    def pacientes(self) -> RegistroEntidades[Paciente]:
+        return self._pacientes
+    
+    @property
+    def doctores(self) -> RegistroEntidades[Doctor]:
+        return self._doctores
+    
+    @property
+    def citas(self) -> RegistroEntidades[Cita]:
+        return self._citas
+    
+    @property
+    def disponibilidad(self) -> MotorDisponibilidad:
+        return self._disponibilidad
+    
+    @property
+    def repositorio(self) -> Repositorio:
+        return self._repositorio
+    
+    @property
+    def datos_ejemplo_cargados(self) -> bool:
+        """Indica si al crearse el sistema cargó los datos de ejemplo"""
+        return self._datos_ejemplo_cargados
+    
+    @property
+    def eventos(self) -> BusEventos:
+        return self._eventos
+    
+    @property
+    def lista_espera(self) -> 'ListaEspera':
+        """Lista de espera que rellena los huecos cancelados; empieza a funcionar al usarla"""
+        if self._lista_espera is None:
+            self._lista_espera = ListaEspera(self)
+            self._lista_espera.iniciar()
+        return self._lista_espera
+    
+    @property
+    def estadisticas(self) -> EstadisticasCitas:
+        if self._estadisticas_pendientes:
+            for fila in self._repositorio.conteos_citas():
+                self._estadisticas.sumar(*fila)
+            self._estadisticas_pendientes = False
+        return self._estadisticas
+    
+    def _incorporar_doctor(self, doctor: Doctor):
+        """Indexa al doctor por especialidad y sigue los cambios de estado de sus citas"""
+        self._indice_especialidades.agregar(doctor)
+        doctor.agregar_oyente_estado(self._al_cambiar_estado)
+    
+    def _indexar_paciente(self, paciente: Paciente):
+        paciente.fijar_oyente_email(self._oyente_email)
+        if self._indice_pacientes is not None:
+            self._indice_pacientes.agregar(paciente)
+    
+    def _al_cambiar_email(self, paciente: Paciente, anterior: str):
+        if self._indice_pacientes is not None and self._pacientes.en_memoria(paciente.id) is paciente:
+            self._indice_pacientes.cambiar_email(paciente, anterior)
+    
+    def _al_cambiar_estado(self, cita: Cita, anterior: str):
+        if self._citas.en_memoria(cita.id) is not cita:
+            return
+        if not self._estadisticas_pendientes:
+            self._estadisticas.cambiar_estado(cita, anterior)
+        if cita.estado == "Programada":
+            self._activas[cita.id] = cita
+        else:
+            self._activas.pop(cita.id, None)
+        if self._eventos.escucha("cita.estado"):
+            self._eventos.publicar("cita.estado", cita.id, {"anterior": anterior, "estado": cita.estado})
+    
+    def _publicar(self, tipo: str, entidades: list, datos: Callable[[object], dict]):
+        """Publica un evento por entidad; los datos solo se arman si alguien los recibe"""
+        if entidades and self._eventos.escucha(tipo):
+            self._eventos.publicar_lote([(tipo, entidad.id, datos(entidad)) for entidad in entidades])
+    
+    def _registrar_cita(self, cita: Cita, contar: bool = True):
+        """Incorpora una cita ya registrada a los contadores y citas activas"""
+        if contar and not self._estadisticas_pendientes:
+            self._estadisticas.registrar(cita)
+        self._indice_temporal.agregar(cita.inicio, cita)
+        if cita.estado == "Programada":
+            self._activas[cita.id] = cita
+    
+    def _hidratar_paciente(self, fila: tuple) -> Paciente:
+        """Crea un Paciente a partir de una fila; sus citas se cargan al consultarlas"""
+        id, nombre, telefono, email, edad, historial = fila
+        paciente = Paciente(id, nombre, telefono, edad, historial, email, validar=False)
+        if self._repositorio.carga_diferida:
+            paciente._cargador_citas = lambda: self._hidratar_citas_de(paciente, "paciente")
+        self._indexar_paciente(paciente)
+        return paciente
+    
+    def _hidratar_doctor(self, fila: tuple) -> Doctor:
+        """Crea un Doctor a partir de una fila; su agenda se carga al consultarla"""
+        id, nombre, telefono, email, especialidad, horario = fila
+        doctor = Doctor(id, nombre, telefono, especialidad, email, json.loads(horario), validar=False)
+        if self._repositorio.carga_diferida:
+            doctor._cargador_citas = lambda: self._hidratar_citas_de(doctor, "doctor")
+        self._incorporar_doctor(doctor)
+        return doctor
+    
+    def _hidratar_cita(self, fila: tuple) -> Cita:
+        """Crea una Cita a partir de una fila enlazándola con su paciente y doctor"""
+        id, paciente_id, doctor_id, fecha, hora, _, duracion, motivo, estado = fila
+        paciente = self.buscar_paciente_por_id(paciente_id)
+        doctor = self.buscar_doctor_por_id(doctor_id)
+        # Cargar la agenda del doctor puede haber hidratado ya esta misma cita
+        doctor._asegurar_citas()
+        existente = self._citas.en_memoria(id)
+        if existente is not None:
+            return existente
+        cita = Cita(id, paciente, doctor, fecha, hora, motivo, estado, duracion)
+        # Con carga diferida los contadores ya vienen agregados del repositorio
+        self._registrar_cita(cita, contar=not self._repositorio.carga_diferida)
+        return cita
+    
+    def _hidratar_citas_de(self, entidad, tipo: str):
+        """Carga el historial de citas de un paciente o doctor en el orden guardado"""
+        filas = self._repositorio.citas_de(tipo, entidad.id)
+        # Traer en una sola consulta las contrapartes que aún no están en memoria
+        contraparte, registro = (2, self._doctores) if tipo == "paciente" else (1, self._pacientes)
+        faltantes = {fila[contraparte] for fila in filas
+                     if registro.en_memoria(fila[contraparte]) is None}
+        for fila in self._repositorio.filas_por_ids(registro.tipo, faltantes):
+            registro.desde_fila(fila)
+        
+        citas = [self._citas.desde_fila(fila) for fila in filas]
+        vistas = {id(cita) for cita in citas}
+        entidad._citas[:] = citas + [c for c in entidad._citas if id(c) not in vistas]
+    
+    def _cargar_datos_ejemplo(self):
+        """Carga datos de ejemplo para testing"""
+        try:
+            # Pacientes de ejemplo
+            paciente1 = Paciente(
+                GestorIDs.generar_id("paciente"), 
+                "Ana García", "555-1234", 35, "Hipertensión"
+            )
+            paciente2 = Paciente(
+                GestorIDs.generar_id("paciente"),
+                "Carlos López", "555-5678", 28, "Asma"
+            )
+            
+            # Doctores de ejemplo
+            doctor1 = Doctor(
+                GestorIDs.generar_id("doctor"),
+                "Rodríguez", "555-1111", "Cardiología"
+            )
+            doctor2 = Doctor(
+                GestorIDs.generar_id("doctor"),
+                "Martínez", "555-2222", "Pediatría"
+            )
+            
+            self.agregar_paciente(paciente1)
+            self.agregar_paciente(paciente2)
+            self.agregar_doctor(doctor1)
+            self.agregar_doctor(doctor2)
+            self._datos_ejemplo_cargados = True
+            
+        except Exception as e:
+            print(f"Error al cargar datos de ejemplo: {e}")
+    
+    def _verificar_escritura(self, citas: Iterable[Cita] = ()):
+        """Rechaza la escritura en un almacenamiento de solo lectura sin dejar cambios
+        
+        Las citas recibidas ya reservaron su horario al construirse, así que
+        se desvinculan antes de rechazarlas.
+        """
+        if self._repositorio.solo_lectura:
+            for cita in citas:
+                cita.desvincular()
+            raise ValueError("El almacenamiento es de solo lectura")
+    
+    def agregar_paciente(self, paciente: Paciente) -> bool:
+        """Agrega un nuevo paciente al sistema"""
+        self._verificar_escritura()
+        if not self._pacientes.agregar(paciente):
+            return False
+        self._indexar_paciente(paciente)
+        if self._pendientes is not None:
+            self._pendientes["pacientes"].append(paciente)
+        else:
+            self._repositorio.guardar_paciente(paciente)
+            self._revisar_compactacion()
+        self._publicar("paciente.agregado", [paciente], json_paciente)
+        return True
+    
+    def agregar_doctor(self, doctor: Doctor) -> bool:
+        """Agrega un nuevo doctor al sistema"""
+        self._verificar_escritura()
+        if not self._doctores.agregar(doctor):
+            return False
+        self._incorporar_doctor(doctor)
+        if self._pendientes is not None:
+            self._pendientes["doctores"].append(doctor)
+        else:
+            self._repositorio.guardar_doctor(doctor)
+            self._revisar_compactacion()
+        self._publicar("doctor.agregado", [doctor], json_doctor)
+        return True
+    
+    def agregar_cita(self, cita: Cita) -> bool:
+        """Agrega una nueva cita al sistema
+        
+        Una cita con ID repetido se rechaza y se deshace su reserva en el
+        doctor y el paciente, hecha al construirla.
+        """
+        self._verificar_escritura([cita])
+        if not self._citas.agregar(cita):
+            cita.desvincular()
+            return False
+        self._registrar_cita(cita)
+        if self._pendientes is not None:
+            self._pendientes["citas"].append(cita)
+        else:
+            self._repositorio.guardar_cita(cita)
+            self._revisar_compactacion()
+        self._publicar("cita.agregada", [cita], json_cita)
+        return True
+    
+    def cargar_lote(self, pacientes: Iterable[Paciente] = (), doctores: Iterable[Doctor] = (),
+                    citas: Iterable[Cita] = ()) -> int:
+        """Agrega muchas entidades y las guarda en bloque; retorna cuántas se aceptaron"""
+        if self._repositorio.solo_lectura:
+            self._verificar_escritura(list(citas))
+        nuevos_pacientes = [p for p in pacientes if self._pacientes.agregar(p)]
+        for paciente in nuevos_pacientes:
+            self._indexar_paciente(paciente)
+        nuevos_doctores = [d for d in doctores if self._doctores.agregar(d)]
+        for doctor in nuevos_doctores:
+            self._incorporar_doctor(doctor)
+        nuevas_citas = []
+        for cita in citas:
+            if self._citas.agregar(cita):
+                nuevas_citas.append(cita)
+            else:
+                cita.desvincular()
+        for cita in nuevas_citas:
+            self._registrar_cita(cita)
+        if self._pendientes is not None:
+            self._pendientes["pacientes"].extend(nuevos_pacientes)
+            self._pendientes["doctores"].extend(nuevos_doctores)
+            self._pendientes["citas"].extend(nuevas_citas)
+        else:
+            self._repositorio.guardar_lote(nuevos_pacientes, nuevos_doctores, nuevas_citas)
+            self._revisar_compactacion()
+        self._publicar("paciente.agregado", nuevos_pacientes, json_paciente)
+        self._publicar("doctor.agregado", nuevos_doctores, json_doctor)
+        self._publicar("cita.agregada", nuevas_citas, json_cita)
+        return len(nuevos_pacientes) + len(nuevos_doctores) + len(nuevas_citas)
+    
+    def iniciar_lote(self):
+        """Acumula las escrituras al repositorio hasta llamar a confirmar_lote
+        
+        Los cambios se aplican en memoria de inmediato. Hasta confirmar, los
+        recorridos completos con carga diferida (listados, agendas) no ven lo
+        pendiente, por eso conviene confirmar antes de consultarlos.
+        """
+        if self._pendientes is None:
+            # Los contadores se siembran antes, cuando el repositorio aún está al día
+            self.estadisticas
+            self._pendientes = {"pacientes": [], "doctores": [], "citas": [], "estados": []}
+    
+    def confirmar_lote(self) -> int:
+        """Guarda en bloque las escrituras acumuladas; retorna cuántas eran"""
+        pendientes, self._pendientes = self._pendientes, None
+        if not pendientes or not any(pendientes.values()):
+            return 0
+        self._repositorio.guardar_lote(pendientes["pacientes"], pendientes["doctores"],
+                                       pendientes["citas"])
+        if pendientes["estados"]:
+            self._repositorio.actualizar_estados(pendientes["estados"])
+        self._revisar_compactacion()
+        self._ejecutar_tras_guardar()
+        return sum(map(len, pendientes.values()))
+    
+    def al_guardar(self, tarea: Callable[[], None]):
+        """Ejecuta `tarea` en cuanto el cambio en curso quede guardado en el repositorio
+        
+        Los oyentes de eventos se llaman antes de guardar el cambio que los
+        disparó; lo que escriban por su cuenta debe esperar a que termine.
+        Dentro de un lote las tareas esperan a confirmar_lote.
+        """
+        self._tras_guardar.append(tarea)
+    
+    def _ejecutar_tras_guardar(self):
+        while self._tras_guardar:
+            self._tras_guardar.pop(0)()
+    
+    def buscar_paciente_por_id(self, paciente_id: str) -> Optional[Paciente]:
+        """Busca un paciente por su ID"""
+        return self._pacientes.obtener(paciente_id)
+    
+    def buscar_doctor_por_id(self, doctor_id: str) -> Optional[Doctor]:
+        """Busca un doctor por su ID"""
+        return self._doctores.obtener(doctor_id)
+    
+    def buscar_pacientes(self, consulta: str, limite: int = 10) -> List[Paciente]:
+        """Busca pacientes por nombre, teléfono o email; los mejores resultados primero"""
+        if self._indice_pacientes is None:
+            self._pacientes.cargar_todo()
+            self._indice_pacientes = IndicePacientes()
+            for paciente in self._pacientes:
+                self._indice_pacientes.agregar(paciente)
+        return [self._pacientes.obtener(id)
+                for id, _ in self._indice_pacientes.buscar(consulta, limite)]
+    
+    def doctores_de_especialidad(self, especialidad: str) -> List[Doctor]:
+        """Retorna los doctores de una especialidad (sin distinguir mayúsculas ni acentos)"""
+        self._doctores.cargar_todo()
+        return self._indice_especialidades.doctores(especialidad)
+    
+    def especialidades(self) -> Dict[str, int]:
+        """Retorna las especialidades registradas con su cantidad de doctores"""
+        self._doctores.cargar_todo()
+        return self._indice_especialidades.especialidades()
+    
+    def carga_doctores(self, especialidad: str, desde_fecha: str,
+                       hasta_fecha: str) -> List[Tuple[Doctor, int]]:
+        """Retorna (doctor, citas programadas entre las fechas) de menor a mayor carga"""
+        desde = convertir_a_minutos(desde_fecha, "00:00")
+        hasta = convertir_a_minutos(hasta_fecha, "00:00") + MINUTOS_POR_DIA
+        cargas = [(doctor, doctor.carga_entre(desde, hasta))
+                  for doctor in self.doctores_de_especialidad(especialidad)]
+        return sorted(cargas, key=lambda carga: carga[1])
+    
+    def recomendar_doctor(self, especialidad: str, desde_fecha: str, hasta_fecha: str,
+                          duracion: int = DURACION_CITA_MINUTOS) -> Optional[Recomendacion]:
+        """Retorna el doctor menos cargado de la especialidad que tenga un hueco libre"""
+        desde = convertir_a_minutos(desde_fecha, "00:00")
+        hasta = convertir_a_minutos(hasta_fecha, "00:00") + MINUTOS_POR_DIA
+        for doctor, carga in self.carga_doctores(especialidad, desde_fecha, hasta_fecha):
+            huecos = self._disponibilidad.proximos_huecos(doctor, desde, hasta, 1, duracion)
+            if huecos:
+                return Recomendacion(doctor, *convertir_desde_minutos(huecos[0][0]), carga)
+        return None
+    
+    def buscar_cita_por_id(self, cita_id: str) -> Optional[Cita]:
+        """Busca una cita por su ID"""
+        return self._citas.obtener(cita_id)
+    
+    def doctor_disponible(self, doctor_id: str, fecha: str, hora: str,
+                          duracion: int = DURACION_CITA_MINUTOS) -> bool:
+        """Indica si el doctor está libre en la fecha y hora indicadas"""
+        doctor = self.buscar_doctor_por_id(doctor_id)
+        if not doctor:
+            return False
+        return doctor.esta_disponible(convertir_a_minutos(fecha, hora), duracion)
+    
+    def buscar_huecos_libres(self, doctor_id: str, desde_fecha: str, hasta_fecha: str,
+                             cantidad: int = 5) -> List[Tuple[str, str]]:
+        """Retorna los próximos (fecha, hora) libres de un doctor entre dos fechas"""
+        doctor = self.buscar_doctor_por_id(doctor_id)
+        if not doctor:
+            return []
+        desde = convertir_a_minutos(desde_fecha, "00:00")
+        hasta = convertir_a_minutos(hasta_fecha, "00:00") + MINUTOS_POR_DIA
+        return [convertir_desde_minutos(inicio)
+                for inicio, _ in self._disponibilidad.proximos_huecos(doctor, desde, hasta, cantidad)]
+    
+    def buscar_huecos_especialidad(self, especialidad: str, desde_fecha: str, hasta_fecha: str,
+                                   cantidad: int = 5) -> List[Tuple[str, str, Doctor]]:
+        """Retorna los próximos (fecha, hora, doctor) libres de una especialidad"""
+        desde = convertir_a_minutos(desde_fecha, "00:00")
+        hasta = convertir_a_minutos(hasta_fecha, "00:00") + MINUTOS_POR_DIA
+        huecos = self._disponibilidad.proximos_huecos_especialidad(especialidad, desde, hasta, cantidad)
+        return [(*convertir_desde_minutos(inicio), doctor) for inicio, doctor in huecos]
+    
+    def obtener_citas_por_paciente(self, paciente_id: str) -> List[Cita]:
+        """Obtiene todas las citas de un paciente"""
+        paciente = self.buscar_paciente_por_id(paciente_id)
+        return paciente.citas if paciente else []
+    
+    def obtener_citas_por_doctor(self, doctor_id: str) -> List[Cita]:
+        """Obtiene todas las citas de un doctor"""
+        doctor = self.buscar_doctor_por_id(doctor_id)
+        return doctor.citas if doctor else []
+    
+    def iterar_pacientes(self, cursor: int = 0, nombre: str = "") -> Iterator[Tuple[int, Paciente]]:
+        """Genera (posición, paciente) desde el cursor, opcionalmente filtrando por nombre"""
+        nombre = nombre.lower()
+        for posicion in range(cursor, len(self._pacientes)):
+            paciente = self._pacientes[posicion]
+            if not nombre or nombre in paciente.nombre.lower():
+                yield posicion, paciente
+    
+    def iterar_doctores(self, cursor: int = 0, especialidad: str = "") -> Iterator[Tuple[int, Doctor]]:
+        """Genera (posición, doctor) desde el cursor, opcionalmente por especialidad
+        
+        La especialidad se compara como en doctores_de_especialidad, sin
+        distinguir mayúsculas ni acentos.
+        """
+        ids = {doctor.id for doctor in self.doctores_de_especialidad(especialidad)} \
+            if especialidad else None
+        for posicion in range(cursor, len(self._doctores)):
+            doctor = self._doctores[posicion]
+            if ids is None or doctor.id in ids:
+                yield posicion, doctor
+    
+    def iterar_citas(self, cursor: int = 0, estado: Optional[str] = None,
+                     doctor_id: Optional[str] = None, paciente_id: Optional[str] = None,
+                     desde_fecha: Optional[str] = None) -> Iterator[Tuple[int, Cita]]:
+        """Genera (posición, cita) desde el cursor aplicando los filtros indicados
+        
+        Con doctor_id o paciente_id se recorre solo el historial de esa entidad,
+        por lo que el cursor es válido únicamente para los mismos filtros.
+        """
+        if doctor_id:
+            doctor = self.buscar_doctor_por_id(doctor_id)
+            origen = doctor.citas if doctor else []
+        elif paciente_id:
+            paciente = self.buscar_paciente_por_id(paciente_id)
+            origen = paciente.citas if paciente else []
+        else:
+            origen = self._citas
+        desde = convertir_a_minutos(desde_fecha, "00:00") if desde_fecha else None
+        
+        for posicion in range(cursor, len(origen)):
+            cita = origen[posicion]
+            if estado and cita.estado != estado:
+                continue
+            if desde is not None and cita.inicio < desde:
+                continue
+            if paciente_id and cita.paciente.id != paciente_id:
+                continue
+            yield posicion, cita
+    
+    def paginar_pacientes(self, tamano: int = 20, cursor: int = 0, **filtros) -> Pagina:
+        return paginar(self.iterar_pacientes(cursor, **filtros), tamano)
+    
+    def paginar_doctores(self, tamano: int = 20, cursor: int = 0, **filtros) -> Pagina:
+        return paginar(self.iterar_doctores(cursor, **filtros), tamano)
+    
+    def paginar_citas(self, tamano: int = 20, cursor: int = 0, **filtros) -> Pagina:
+        return paginar(self.iterar_citas(cursor, **filtros), tamano)
+    
+    def citas_entre(self, desde_fecha: str, hasta_fecha: str,
+                    estado: Optional[str] = None) -> Iterator[Cita]:
+        """Itera en orden cronológico las citas entre dos fechas (ambas incluidas)"""
+        self._citas.cargar_todo()
+        desde = convertir_a_minutos(desde_fecha, "00:00")
+        hasta = convertir_a_minutos(hasta_fecha, "00:00") + MINUTOS_POR_DIA
+        for cita in self._indice_temporal.entre(desde, hasta):
+            if not estado or cita.estado == estado:
+                yield cita
+    
+    def agenda_del_dia(self, fecha: str) -> List[Cita]:
+        """Retorna en orden cronológico las citas programadas de todos los doctores en una fecha"""
+        self._citas.cargar_todo()
+        dia = convertir_a_minutos(fecha, "00:00") // MINUTOS_POR_DIA
+        return [cita for cita in self._indice_temporal.del_dia(dia) if cita.estado == "Programada"]
+    
+    def agenda_doctor(self, doctor_id: str, fecha: str) -> List[Cita]:
+        """Retorna en orden cronológico las citas programadas de un doctor en una fecha"""
+        doctor = self.buscar_doctor_por_id(doctor_id)
+        if not doctor:
+            return []
+        inicio = convertir_a_minutos(fecha, "00:00")
+        return [self._citas.obtener(cita_id)
+                for cita_id in doctor.agenda.ids_entre(inicio, inicio + MINUTOS_POR_DIA)]
+    
+    def obtener_citas_activas(self) -> List[Cita]:
+        """Obtiene todas las citas activas"""
+        self._citas.cargar_todo()
+        return list(self._activas.values())
+    
+    def cancelar_cita(self, cita_id: str) -> bool:
+        """Cancela una cita existente"""
+        self._verificar_escritura()
+        cita = self.buscar_cita_por_id(cita_id)
+        if cita:
+            cita.estado = "Cancelada"
+            if self._pendientes is not None:
+                self._pendientes["estados"].append((cita.id, cita.estado))
+                return True
+            self._repositorio.actualizar_estado_cita(cita.id, cita.estado)
+            self._revisar_compactacion()
+            self._ejecutar_tras_guardar()
+            return True
+        return False
+    
+    def _revisar_compactacion(self):
+        if self._repositorio.requiere_compactacion:
+            self.compactar_almacenamiento()
+    
+    def _filas(self) -> Dict[str, Iterable[tuple]]:
+        return {
+            "paciente": map(Repositorio.fila_paciente, self._pacientes),
+            "doctor": map(Repositorio.fila_doctor, self._doctores),
+            "cita": map(Repositorio.fila_cita, self._citas),
+        }
+    
+    def compactar_almacenamiento(self):
+        """Entrega al repositorio el estado completo para que lo compacte"""
+        self._repositorio.compactar(self._filas())
+    
+    def exportar_instantanea(self, ruta: str):
+        """Guarda el estado completo en una instantánea binaria (ver RepositorioInstantanea)"""
+        from persistencia_instantanea import RepositorioInstantanea  # mmap solo al exportar
+        RepositorioInstantanea.escribir(ruta, self._filas())
+    
+    def cerrar(self):
+        """Entrega los eventos pendientes y libera los recursos del repositorio"""
+        self._eventos.cerrar()
+        self._repositorio.cerrar()
+
+
+def json_estadisticas(sistema: SistemaCitasMedicas) -> dict:
+    estadisticas = sistema.estadisticas
+    return {"pacientes": len(sistema.pacientes),
+            "doctores": len(sistema.doctores),
+            "citas": estadisticas.total,
+            "por_estado": dict(estadisticas.por_estado()),
+            "por_especialidad": {especialidad: dict(contador) for especialidad, contador
+                                 in estadisticas.especialidades().items()}}
+
+
+def conflicto_reserva(sistema: SistemaCitasMedicas, datos: dict) -> Optional[str]:
+    """Retorna por qué no se puede reservar la cita descrita en `datos`, o None"""
+    doctor = sistema.buscar_doctor_por_id(str(datos.get("doctor_id", "")))
+    if doctor and datos.get("fecha") and datos.get("hora"):
+        inicio = convertir_a_minutos(str(datos["fecha"]), str(datos["hora"]))
+        duracion = int(datos.get("duracion") or DURACION_CITA_MINUTOS)
+        if not doctor.esta_disponible(inicio, duracion):
+            return f"El Dr. {doctor.nombre} ya tiene una cita en ese horario"
+    cita_id = str(datos.get("id") or "")
+    if cita_id and cita_id in sistema.citas:
+        return f"ID duplicado: {cita_id}"
+    return None
@@ -0,0 +1,141 @@
+"""
+PRUEBAS DE LA PROGRAMACIÓN AUTOMÁTICA
+Sin choques de doctor ni de paciente y siempre dentro de la ventana pedida
+"""
+
+import os
+import sys
+from collections import Counter
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from asignacion import AsignadorCitas
+from entidades import Cita, Doctor, Paciente
+from fechas import MINUTOS_POR_DIA, convertir_a_minutos
+from sistema import SistemaCitasMedicas
+
+
+# 19/10/2026 es lunes; cada doctor atiende cuatro turnos de 30 minutos por día
+HORARIO = {"Lunes": ["09:00-11:00"], "Martes": ["09:00-11:00"]}
+
+
+def reloj() -> float:
+    return convertir_a_minutos("18/10/2026", "08:00")
+
+
+@pytest.fixture
+def sistema() -> SistemaCitasMedicas:
+    sistema = SistemaCitasMedicas()
+    for n in range(12):
+        sistema.agregar_paciente(Paciente(f"PS{n:02d}", f"Paciente {n}", f"555-00003{n:02d}",
+                                          30 + n))
+    for doctor_id, especialidad in (("DS1", "Neurología"), ("DS2", "Neurología"),
+                                    ("DS3", "Dermatología")):
+        sistema.agregar_doctor(Doctor(doctor_id, f"Doctor {doctor_id}", "555-0000400",
+                                      especialidad, horario=HORARIO))
+    # Cita previa que ocupa al primer paciente el lunes a las 09:00
+    sistema.agregar_cita(Cita("CS0", sistema.buscar_paciente_por_id("PS00"),
+                              sistema.buscar_doctor_por_id("DS3"), "19/10/2026", "09:00",
+                              "Control"))
+    return sistema
+
+
+def pedidos(asignador: AsignadorCitas) -> list:
+    filas = [{"id": f"N{n}", "paciente_id": f"PS{n:02d}", "especialidad": "Neurología",
+              "desde": "19/10/2026", "hasta": "20/10/2026", "urgencia": n % 3}
+             for n in range(12)]
+    filas += [{"id": f"M{n}", "paciente_id": f"PS{n:02d}", "especialidad": "Dermatología",
+               "desde": "19/10/2026", "hasta": "19/10/2026", "hora_desde": "09:00",
+               "hora_hasta": "10:00"} for n in range(4)]
+    filas.append({"id": "X1", "paciente_id": "PS99", "especialidad": "Neurología",
+                  "desde": "19/10/2026"})
+    return [asignador.crear_pedido(fila, numero) for numero, fila in enumerate(filas, 1)]
+
+
+@pytest.mark.parametrize("procesos", [1, 2])
+def test_plan_sin_choques_y_dentro_de_la_ventana(sistema, monkeypatch, procesos):
+    # Sin umbral, con dos procesos las especialidades se resuelven en el pool
+    monkeypatch.setattr(AsignadorCitas, "UMBRAL_PARALELO", 0)
+    asignador = AsignadorCitas(sistema, procesos=procesos, reloj=reloj)
+    lista = pedidos(asignador)
+
+    resultado = asignador.planificar(lista)
+
+    assert Counter(a.pedido.id for a in resultado.asignadas) + Counter(
+        p.id for p, _ in resultado.sin_asignar) == Counter(p.id for p in lista)
+    # Doctores: nunca dos pedidos en el mismo turno ni sobre una cita existente
+    turnos = [(a.doctor.id, a.inicio) for a in resultado.asignadas]
+    assert len(set(turnos)) == len(turnos)
+    assert ("DS3", convertir_a_minutos("19/10/2026", "09:00")) not in turnos
+    for asignacion in resultado.asignadas:
+        pedido = asignacion.pedido
+        assert asignacion.doctor.especialidad == pedido.especialidad
+        assert pedido.desde <= asignacion.inicio and asignacion.inicio + 30 <= pedido.hasta
+        minuto = asignacion.inicio % MINUTOS_POR_DIA
+        assert pedido.hora_desde <= minuto and minuto + 30 <= pedido.hora_hasta
+        assert asignacion.doctor.esta_disponible(asignacion.inicio)
+    # Pacientes: ningún par de citas (nuevas o previas) se solapa
+    por_paciente = {}
+    for asignacion in resultado.asignadas:
+        por_paciente.setdefault(asignacion.pedido.paciente_id, []).append(asignacion.inicio)
+    por_paciente.setdefault("PS00", []).append(convertir_a_minutos("19/10/2026", "09:00"))
+    for inicios in por_paciente.values():
+        inicios.sort()
+        assert all(despues - antes >= 30 for antes, despues in zip(inicios, inicios[1:]))
+    # Los 16 turnos de neurología alcanzan para los 12 pedidos con paciente conocido
+    assert {p.id for p, _ in resultado.sin_asignar} <= {"X1", "M0", "M1", "M2", "M3"}
+    assert [motivo for p, motivo in resultado.sin_asignar if p.id == "X1"] == [
+        "paciente no encontrado"]
+
+
+def test_aplicar_reserva_lo_planificado(sistema):
+    asignador = AsignadorCitas(sistema, procesos=1, reloj=reloj)
+    resultado = asignador.planificar(pedidos(asignador))
+
+    citas = asignador.aplicar(resultado)
+
+    assert len(citas) == len(resultado.asignadas)
+    for cita, asignacion in zip(citas, resultado.asignadas):
+        assert sistema.buscar_cita_por_id(cita.id) is not None
+        assert (cita.doctor.id, cita.inicio) == (asignacion.doctor.id, asignacion.inicio)
+        assert not cita.doctor.esta_disponible(cita.inicio)
+
+
+def test_ventana_pasada_queda_sin_asignar(sistema):
+    asignador = AsignadorCitas(sistema, procesos=1,
+                               reloj=lambda: convertir_a_minutos("21/10/2026", "08:00"))
+
+    resultado = asignador.planificar(pedidos(asignador)[:1])
+
+    assert resultado.asignadas == []
+    assert [motivo for _, motivo in resultado.sin_asignar] == ["la ventana ya pasó"]
+
+
+def test_leer_pedidos_separa_las_lineas_con_errores(sistema, tmp_path):
+    ruta = tmp_path / "pedidos.jsonl"
+    ruta.write_text("\n".join([
+        '{"paciente_id": "PS01", "especialidad": "Neurología", "desde": "19/10/2026"}',
+        '["PS02", "Neurología"]',
+        '{"paciente_id": "PS02", "especialidad": ',
+        '{"paciente_id": "PS03", "especialidad": "Neurología", "desde": "31/02/2026"}',
+        '',
+        '{"paciente_id": "PS04", "especialidad": "Neurología", "desde": "19/10/2026", '
+        '"hasta": "18/10/2026"}',
+        '"texto"',
+        '{"id": "B1", "paciente_id": "PS05", "especialidad": "Dermatología", '
+        '"desde": "19/10/2026", "urgencia": "alta"}',
+        '{"id": "B2", "paciente_id": "PS06", "especialidad": "Dermatología", '
+        '"desde": "19/10/2026", "urgencia": 2}',
+    ]) + "\n", encoding="utf-8")
+    asignador = AsignadorCitas(sistema, procesos=1, reloj=reloj)
+
+    lista, errores = asignador.leer_pedidos(str(ruta))
+
+    assert [(p.id, p.paciente_id) for p in lista] == [("L1", "PS01"), ("B2", "PS06")]
+    assert [numero for numero, _ in errores] == [2, 3, 4, 6, 7, 8]
+    assert errores[0][1] == errores[4][1] == "Se esperaba un objeto JSON"
+    assert errores[1][1].startswith("JSON no válido")
+    assert errores[3][1] == "La ventana termina antes de empezar"
+    assert errores[5][1] == "La urgencia debe ser un número entero"
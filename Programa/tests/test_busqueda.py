@@ -0,0 +1,84 @@
+"""
+PRUEBAS DE LA BÚSQUEDA DE PACIENTES
+Prefijos sin acentos, errores de tipeo por trigramas, teléfono y email
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from entidades import Paciente
+from sistema import SistemaCitasMedicas
+
+
+def sistema_con_pacientes() -> SistemaCitasMedicas:
+    sistema = SistemaCitasMedicas()
+    for paciente in (Paciente("PB1", "Lucía Fernández", "555-0000001", 30),
+                     Paciente("PB2", "Lucas Ferreira", "555-0000002", 41),
+                     Paciente("PB3", "Martín Rodríguez", "555-0000003", 52,
+                              email="martin@example.com"),
+                     Paciente("PB4", "Lucila Peña", "555-0000004", 63),
+                     Paciente("PB5", "Luciana Soto", "555-0000005", 19)):
+        sistema.agregar_paciente(paciente)
+    return sistema
+
+
+def ids(pacientes) -> list:
+    return [paciente.id for paciente in pacientes]
+
+
+def test_prefijo_sin_acentos_ni_mayusculas():
+    sistema = sistema_con_pacientes()
+
+    assert ids(sistema.buscar_pacientes("LUCIA FERNANDEZ")) == ["PB1"]
+    assert sorted(ids(sistema.buscar_pacientes("luc fer"))) == ["PB1", "PB2"]
+    assert set(ids(sistema.buscar_pacientes("luc"))) >= {"PB1", "PB2", "PB4", "PB5"}
+    assert ids(sistema.buscar_pacientes("peña")) == ["PB4"]
+    assert ids(sistema.buscar_pacientes("pena")) == ["PB4"]
+
+
+def test_coincidencia_exacta_antes_que_prefijo():
+    sistema = sistema_con_pacientes()
+
+    assert ids(sistema.buscar_pacientes("lucia")) == ["PB1", "PB5"]
+    assert ids(sistema.buscar_pacientes("lucia", limite=1)) == ["PB1"]
+
+
+def test_errores_de_tipeo_por_trigramas():
+    sistema = sistema_con_pacientes()
+
+    assert ids(sistema.buscar_pacientes("rodrigez")) == ["PB3"]
+    assert ids(sistema.buscar_pacientes("martin rodrigues")) == ["PB3"]
+    assert sistema.buscar_pacientes("zzzzzz") == []
+
+
+def test_telefono_y_email_exactos():
+    sistema = sistema_con_pacientes()
+
+    assert ids(sistema.buscar_pacientes("(555) 000-0003")) == ["PB3"]
+    assert ids(sistema.buscar_pacientes("MARTIN@example.com")) == ["PB3"]
+    assert sistema.buscar_pacientes("otro@example.com") == []
+
+
+def test_pacientes_agregados_despues_se_encuentran():
+    sistema = sistema_con_pacientes()
+    assert sistema.buscar_pacientes("gimenez") == []
+
+    sistema.agregar_paciente(Paciente("PB6", "Sofía Giménez", "555-0000006", 25))
+    sistema.cargar_lote(pacientes=[Paciente("PB7", "Pablo Giménez", "555-0000007", 36)])
+
+    assert sorted(ids(sistema.buscar_pacientes("gimenez"))) == ["PB6", "PB7"]
+
+
+def test_email_cambiado_se_busca_por_el_nuevo():
+    sistema = sistema_con_pacientes()
+    martin = sistema.buscar_paciente_por_id("PB3")
+    assert ids(sistema.buscar_pacientes("martin@example.com")) == ["PB3"]
+
+    martin.email = "Martin.R@Example.com"
+    sistema.buscar_paciente_por_id("PB4").email = "lucila@example.com"
+
+    assert ids(sistema.buscar_pacientes("martin@example.com")) == []
+    assert ids(sistema.buscar_pacientes("martin.r@example.com")) == ["PB3"]
+    assert ids(sistema.buscar_pacientes("lucila@example.com")) == ["PB4"]
@@ -0,0 +1,51 @@
+"""
+PRUEBAS DEL REPOSITORIO CON DIARIO
+Restauración tras una caída que deja la última línea del diario a medias
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from entidades import Paciente
+from persistencia_diario import RepositorioDiario
+
+
+def abrir(directorio) -> RepositorioDiario:
+    return RepositorioDiario(str(directorio), registros_por_instantanea=10**9)
+
+
+def ids_restaurados(directorio) -> set:
+    repositorio = abrir(directorio)
+    try:
+        return {fila[0] for fila in repositorio.filas("paciente")}
+    finally:
+        repositorio.cerrar()
+
+
+def test_cola_rota_se_recorta_antes_de_anexar(tmp_path):
+    repositorio = abrir(tmp_path)
+    repositorio.guardar_paciente(Paciente("P1", "Ana López", "555-0000001", 30))
+    repositorio.cerrar()
+    # Simular una caída a mitad de escribir un registro
+    with open(os.path.join(tmp_path, RepositorioDiario.ARCHIVO_DIARIO), "a", encoding="utf-8") as diario:
+        diario.write('{"op": "paciente", "f": ["P9", "Incomp')
+
+    repositorio = abrir(tmp_path)
+    repositorio.guardar_paciente(Paciente("P2", "Luis Pérez", "555-0000002", 40))
+    repositorio.cerrar()
+
+    assert ids_restaurados(tmp_path) == {"P1", "P2"}
+    assert ids_restaurados(tmp_path) == {"P1", "P2"}
+
+
+def test_diario_sin_caida_no_se_modifica(tmp_path):
+    repositorio = abrir(tmp_path)
+    repositorio.guardar_paciente(Paciente("P1", "Ana López", "555-0000001", 30))
+    repositorio.cerrar()
+    ruta = os.path.join(tmp_path, RepositorioDiario.ARCHIVO_DIARIO)
+    tamano = os.path.getsize(ruta)
+
+    assert ids_restaurados(tmp_path) == {"P1"}
+    assert os.path.getsize(ruta) == tamano
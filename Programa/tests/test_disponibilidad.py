@@ -0,0 +1,63 @@
+"""
+PRUEBAS DEL MOTOR DE HUECOS LIBRES
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from entidades import Cita, Doctor, Paciente
+from sistema import SistemaCitasMedicas
+
+
+# 19/10/2026 es lunes
+HORARIO_LUNES = {"Lunes": ["09:00-11:00"]}
+
+
+def sistema_con_neurologos():
+    sistema = SistemaCitasMedicas()
+    paciente = Paciente("PH1", "Ana López", "555-0000001", 30)
+    primero = Doctor("DH1", "Luis Pérez", "555-0000002", "Neurología", horario=HORARIO_LUNES)
+    segundo = Doctor("DH2", "Eva Ruiz", "555-0000003", "Neurología",
+                     horario={"Lunes": ["10:00-12:00"]})
+    sistema.agregar_paciente(paciente)
+    sistema.agregar_doctor(primero)
+    sistema.agregar_doctor(segundo)
+    return sistema, paciente, primero
+
+
+def test_huecos_saltan_las_citas_y_respetan_el_horario():
+    sistema, paciente, doctor = sistema_con_neurologos()
+    sistema.agregar_cita(Cita("CH1", paciente, doctor, "19/10/2026", "09:30", "Control"))
+
+    huecos = sistema.buscar_huecos_libres("DH1", "19/10/2026", "20/10/2026", cantidad=10)
+
+    assert huecos == [("19/10/2026", "09:00"), ("19/10/2026", "10:00"), ("19/10/2026", "10:30")]
+    assert sistema.doctor_disponible("DH1", "19/10/2026", "10:00")
+    assert not sistema.doctor_disponible("DH1", "19/10/2026", "09:30")
+
+
+def test_cancelar_libera_el_hueco():
+    sistema, paciente, doctor = sistema_con_neurologos()
+    sistema.agregar_cita(Cita("CH1", paciente, doctor, "19/10/2026", "09:30", "Control"))
+    assert ("19/10/2026", "09:30") not in sistema.buscar_huecos_libres(
+        "DH1", "19/10/2026", "19/10/2026", cantidad=10)
+
+    sistema.cancelar_cita("CH1")
+
+    assert sistema.buscar_huecos_libres("DH1", "19/10/2026", "19/10/2026", cantidad=10) == [
+        ("19/10/2026", "09:00"), ("19/10/2026", "09:30"),
+        ("19/10/2026", "10:00"), ("19/10/2026", "10:30")]
+
+
+def test_huecos_de_especialidad_en_orden_entre_doctores():
+    sistema, _, _ = sistema_con_neurologos()
+
+    huecos = sistema.buscar_huecos_especialidad("Neurología", "19/10/2026", "19/10/2026",
+                                                cantidad=5)
+
+    assert [(fecha, hora) for fecha, hora, _ in huecos] == [
+        ("19/10/2026", "09:00"), ("19/10/2026", "09:30"), ("19/10/2026", "10:00"),
+        ("19/10/2026", "10:00"), ("19/10/2026", "10:30")]
+    assert [doctor.id for _, hora, doctor in huecos if hora == "09:00"] == ["DH1"]
@@ -0,0 +1,73 @@
+"""
+PRUEBAS DE LA LISTA DE ESPERA
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from entidades import Cita, Doctor, Paciente
+from espera import ListaEspera
+from fechas import convertir_a_minutos
+from persistencia_diario import RepositorioDiario
+from sistema import SistemaCitasMedicas
+
+
+def test_especialidad_sin_distinguir_mayusculas_ni_acentos():
+    sistema = SistemaCitasMedicas()
+    doctor = Doctor("D1", "Luis Pérez", "555-0000002", "Cardiología")
+    titular = Paciente("P1", "Ana López", "555-0000001", 30)
+    en_espera = Paciente("P2", "Marta Gómez", "555-0000003", 40)
+    for persona in (titular, en_espera):
+        sistema.agregar_paciente(persona)
+    sistema.agregar_doctor(doctor)
+    cita = Cita("C1", titular, doctor, "19/10/2026", "09:00", "Control")
+    sistema.agregar_cita(cita)
+
+    lista = ListaEspera(sistema, reloj=lambda: convertir_a_minutos("18/10/2026", "08:00"))
+    lista.iniciar()
+    solicitud = lista.agregar("P2", especialidad="cardiologia", desde_fecha="19/10/2026",
+                              hasta_fecha="20/10/2026")
+    assert solicitud.especialidad == "Cardiología"
+
+    sistema.cancelar_cita("C1")
+    assert [c.inicio for c in en_espera.obtener_citas_activas()] == [cita.inicio]
+
+
+def restaurar(directorio) -> SistemaCitasMedicas:
+    return SistemaCitasMedicas(RepositorioDiario(str(directorio)))
+
+
+def test_restaurar_tras_cancelar_y_rellenar(tmp_path):
+    sistema = restaurar(tmp_path)
+    doctor = Doctor("DE1", "Luis Pérez", "555-0000002", "Cardiología")
+    titular = Paciente("PE1", "Ana López", "555-0000001", 30)
+    en_espera = Paciente("PE2", "Marta Gómez", "555-0000003", 40)
+    for persona in (titular, en_espera):
+        sistema.agregar_paciente(persona)
+    sistema.agregar_doctor(doctor)
+    sistema.agregar_cita(Cita("CE1", titular, doctor, "19/10/2026", "09:00", "Control"))
+    lista = ListaEspera(sistema, reloj=lambda: convertir_a_minutos("18/10/2026", "08:00"))
+    lista.iniciar()
+    lista.agregar("PE2", especialidad="Cardiología", desde_fecha="19/10/2026")
+
+    sistema.cancelar_cita("CE1")
+    nueva = en_espera.obtener_citas_activas()[0]
+    sistema.cerrar()
+
+    restaurado = restaurar(tmp_path)
+    assert restaurado.buscar_cita_por_id("CE1").estado == "Cancelada"
+    assert restaurado.buscar_cita_por_id(nueva.id).estado == "Programada"
+    restaurado.cerrar()
+
+    # Una caída que pierde el último registro nunca deja el hueco ocupado dos veces
+    ruta = os.path.join(tmp_path, RepositorioDiario.ARCHIVO_DIARIO)
+    with open(ruta, encoding="utf-8") as diario:
+        lineas = diario.readlines()
+    with open(ruta, "w", encoding="utf-8") as diario:
+        diario.writelines(lineas[:-1])
+    restaurado = restaurar(tmp_path)
+    assert restaurado.buscar_cita_por_id("CE1").estado == "Cancelada"
+    assert restaurado.buscar_cita_por_id(nueva.id) is None
+    restaurado.cerrar()
@@ -0,0 +1,79 @@
+"""
+PRUEBAS DE LOS CONTADORES DE CITAS
+Los contadores incrementales coinciden con un recuento completo de las citas
+"""
+
+import os
+import sys
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from entidades import Cita, Doctor, Paciente
+from persistencia_sqlite import RepositorioSQLite
+from sistema import SistemaCitasMedicas
+
+
+def poblar(sistema: SistemaCitasMedicas):
+    pacientes = [Paciente(f"PE{n}", f"Paciente {n}", f"555-00000{n:02d}", 20 + n) for n in range(6)]
+    doctores = [Doctor("DE1", "Luis Pérez", "555-0000100", "Neurología"),
+                Doctor("DE2", "Eva Ruiz", "555-0000101", "Dermatología")]
+    for paciente in pacientes:
+        sistema.agregar_paciente(paciente)
+    for doctor in doctores:
+        sistema.agregar_doctor(doctor)
+    numero = 0
+    for dia in ("19/10/2026", "20/10/2026"):
+        for hora in ("09:00", "09:30", "10:00"):
+            for doctor in doctores:
+                sistema.agregar_cita(Cita(f"CE{numero}", pacientes[numero % 6], doctor,
+                                          dia, hora, "Control"))
+                numero += 1
+    sistema.cancelar_cita("CE0")
+    sistema.cancelar_cita("CE5")
+
+
+def propias(sistema: SistemaCitasMedicas) -> list:
+    return [cita for cita in sistema.citas if cita.id.startswith("CE")]
+
+
+def test_contadores_coinciden_con_el_recuento():
+    sistema = SistemaCitasMedicas()
+    poblar(sistema)
+    sistema.buscar_cita_por_id("CE7").estado = "Completada"
+    sistema.buscar_cita_por_id("CE9").estado = "Completada"
+    sistema.buscar_cita_por_id("CE9").estado = "Programada"
+    citas = propias(sistema)
+    estadisticas = sistema.estadisticas
+
+    assert estadisticas.total == len(list(sistema.citas))
+    assert estadisticas.por_estado("Cancelada") == 2
+    assert estadisticas.por_estado("Completada") == 1
+    assert +estadisticas.por_estado() == Counter(cita.estado for cita in sistema.citas)
+    assert +estadisticas.por_doctor("DE1") == Counter(
+        cita.estado for cita in citas if cita.doctor.id == "DE1")
+    assert +estadisticas.por_especialidad("Dermatología") == Counter(
+        cita.estado for cita in citas if cita.doctor.especialidad == "Dermatología")
+    assert +estadisticas.por_dia("20/10/2026") == Counter(
+        cita.estado for cita in citas if cita.fecha == "20/10/2026")
+    assert {cita.id for cita in sistema.obtener_citas_activas()} >= {
+        cita.id for cita in citas if cita.estado == "Programada"}
+    assert not any(cita.estado != "Programada" for cita in sistema.obtener_citas_activas())
+
+
+def test_contadores_se_recuperan_de_sqlite(tmp_path):
+    ruta = str(tmp_path / "citas.db")
+    repositorio = RepositorioSQLite(ruta)
+    sistema = SistemaCitasMedicas(repositorio)
+    poblar(sistema)
+    esperados = (sistema.estadisticas.por_estado(), sistema.estadisticas.por_doctor("DE2"),
+                 sistema.estadisticas.por_dia("19/10/2026"))
+    repositorio.cerrar()
+
+    repositorio = RepositorioSQLite(ruta)
+    reabierto = SistemaCitasMedicas(repositorio)
+    try:
+        assert (+reabierto.estadisticas.por_estado(), +reabierto.estadisticas.por_doctor("DE2"),
+                +reabierto.estadisticas.por_dia("19/10/2026")) == tuple(+c for c in esperados)
+    finally:
+        repositorio.cerrar()
@@ -0,0 +1,83 @@
+"""
+PRUEBAS DEL BUS Y EL REGISTRO DE EVENTOS
+Lectura desde un offset, reanudación sin huecos y reparación de una cola rota
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from entidades import Cita, Doctor, Paciente
+from eventos import BusEventos, RegistroEventos
+from sistema import SistemaCitasMedicas
+
+
+def sistema_con_registro(ruta: str) -> SistemaCitasMedicas:
+    return SistemaCitasMedicas(eventos=BusEventos(RegistroEventos(ruta)))
+
+
+def poblar(sistema: SistemaCitasMedicas):
+    paciente = Paciente("PV1", "Ana López", "555-0000001", 30)
+    doctor = Doctor("DV1", "Luis Pérez", "555-0000002", "Neurología")
+    sistema.agregar_paciente(paciente)
+    sistema.agregar_doctor(doctor)
+    for numero, hora in enumerate(("09:00", "09:30", "10:00"), 1):
+        sistema.agregar_cita(Cita(f"CV{numero}", paciente, doctor, "19/10/2026", hora, "Control"))
+    sistema.cancelar_cita("CV2")
+
+
+def test_leer_desde_un_offset(tmp_path):
+    ruta = str(tmp_path / "eventos.jsonl")
+    sistema = sistema_con_registro(ruta)
+    poblar(sistema)
+    todos = list(sistema.eventos.leer())
+    sistema.eventos.cerrar()
+
+    assert [evento.offset for evento in todos] == list(range(1, len(todos) + 1))
+    assert [(evento.tipo, evento.id) for evento in todos[:5]] == [
+        ("paciente.agregado", "PV1"), ("doctor.agregado", "DV1"),
+        ("cita.agregada", "CV1"), ("cita.agregada", "CV2"), ("cita.agregada", "CV3")]
+    assert ("cita.estado", "CV2") in [(evento.tipo, evento.id) for evento in todos]
+
+    lectura = RegistroEventos(ruta, solo_lectura=True)
+    assert lectura.ultimo_offset == len(todos)
+    assert list(lectura.leer(3)) == todos[3:]
+    assert list(lectura.leer(2, 4)) == todos[2:4]
+    assert list(lectura.leer(len(todos))) == []
+
+
+def test_suscriptor_se_pone_al_dia_y_sigue_sin_huecos(tmp_path):
+    ruta = str(tmp_path / "eventos.jsonl")
+    sistema = sistema_con_registro(ruta)
+    poblar(sistema)
+    recibidos = []
+
+    suscriptor = sistema.eventos.suscribir_en_cola(recibidos.extend, tamano_lote=2, desde=2)
+    sistema.agregar_paciente(Paciente("PV2", "Eva Ruiz", "555-0000003", 40))
+    sistema.cancelar_cita("CV3")
+    sistema.eventos.desuscribir_en_cola(suscriptor)
+
+    ultimo = sistema.eventos.ultimo_offset
+    assert [evento.offset for evento in recibidos] == list(range(3, ultimo + 1))
+    assert recibidos == list(sistema.eventos.leer(2))
+    assert suscriptor.ultimo_offset == ultimo
+    sistema.eventos.cerrar()
+
+
+def test_reabrir_recorta_una_linea_a_medias(tmp_path):
+    ruta = str(tmp_path / "eventos.jsonl")
+    sistema = sistema_con_registro(ruta)
+    poblar(sistema)
+    ultimo = sistema.eventos.ultimo_offset
+    sistema.eventos.cerrar()
+    with open(ruta, "ab") as archivo:
+        archivo.write(b'{"offset": 99, "tipo": "cita.')
+
+    registro = RegistroEventos(ruta)
+    bus = BusEventos(registro)
+    assert registro.ultimo_offset == ultimo
+    evento = bus.publicar("paciente.agregado", "PV9", {})
+    assert evento.offset == ultimo + 1
+    assert [e.offset for e in bus.leer(ultimo - 1)] == [ultimo, ultimo + 1]
+    bus.cerrar()
@@ -0,0 +1,98 @@
+"""
+PRUEBAS DEL SERVICIO HTTP
+Peticiones mal formadas que deben responderse en lugar de cortar la conexión
+"""
+
+import asyncio
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from servicio_http import ServicioHTTP
+from sistema import SistemaCitasMedicas
+
+
+async def enviar(peticion: bytes) -> bytes:
+    servicio = ServicioHTTP(SistemaCitasMedicas(), "127.0.0.1", 0)
+    await servicio.iniciar()
+    try:
+        lector, escritor = await asyncio.open_connection("127.0.0.1", servicio.puerto)
+        escritor.write(peticion)
+        await escritor.drain()
+        respuesta = await asyncio.wait_for(lector.read(), 5)
+        escritor.close()
+        return respuesta
+    finally:
+        await servicio.detener()
+
+
+def estado(respuesta: bytes) -> int:
+    return int(respuesta.split()[1]) if respuesta else 0
+
+
+def test_content_length_no_numerico():
+    respuesta = asyncio.run(enviar(b"POST /pacientes HTTP/1.1\r\nContent-Length: abc\r\n\r\n"))
+    assert estado(respuesta) == 400
+
+
+def test_content_length_negativo():
+    respuesta = asyncio.run(enviar(b"POST /pacientes HTTP/1.1\r\nContent-Length: -5\r\n\r\n"))
+    assert estado(respuesta) == 400
+
+
+def test_error_inesperado_responde_500():
+    respuesta = asyncio.run(enviar(b"GET http://[roto/pacientes HTTP/1.1\r\nConnection: close\r\n\r\n"))
+    assert estado(respuesta) == 500
+
+
+def test_cabecera_demasiado_larga_responde_431():
+    respuesta = asyncio.run(enviar(b"GET /pacientes HTTP/1.1\r\nX-Relleno: " + b"a" * 70000
+                                   + b"\r\n\r\n"))
+    assert estado(respuesta) == 431
+
+
+def test_linea_de_peticion_demasiado_larga_responde_431():
+    respuesta = asyncio.run(enviar(b"GET /pacientes?" + b"a" * 70000 + b" HTTP/1.1\r\n\r\n"))
+    assert estado(respuesta) == 431
+
+
+def test_cabecera_sin_dos_puntos_responde_400():
+    respuesta = asyncio.run(enviar(b"GET /pacientes HTTP/1.1\r\nContent-Length 5\r\n\r\n"))
+    assert estado(respuesta) == 400
+
+
+def test_lectura_lenta_no_frena_otras_conexiones(monkeypatch):
+    liberar = threading.Event()
+
+    def especialidades_lentas(self, parametros, consulta, datos):
+        # Solo se libera si otra conexión recibe su respuesta mientras tanto
+        return 200, {"liberado": liberar.wait(2)}
+
+    monkeypatch.setattr(ServicioHTTP, "_especialidades", especialidades_lentas)
+
+    async def probar():
+        servicio = ServicioHTTP(SistemaCitasMedicas(), "127.0.0.1", 0)
+        await servicio.iniciar()
+        try:
+            lenta = await asyncio.open_connection("127.0.0.1", servicio.puerto)
+            lenta[1].write(b"GET /especialidades HTTP/1.1\r\nConnection: close\r\n\r\n")
+            await lenta[1].drain()
+            rapida = await asyncio.open_connection("127.0.0.1", servicio.puerto)
+            rapida[1].write(b"GET /pacientes HTTP/1.1\r\nContent-Length: x\r\n\r\n")
+            await rapida[1].drain()
+            respuesta_rapida = await asyncio.wait_for(rapida[0].read(), 2)
+            rapida[1].close()
+            liberar.set()
+            respuesta_lenta = await asyncio.wait_for(lenta[0].read(), 5)
+            lenta[1].close()
+            return respuesta_rapida, respuesta_lenta
+        finally:
+            liberar.set()
+            await servicio.detener()
+
+    respuesta_rapida, respuesta_lenta = asyncio.run(probar())
+    assert estado(respuesta_rapida) == 400
+    assert estado(respuesta_lenta) == 200
+    assert respuesta_lenta.endswith(b'{"liberado": true}')
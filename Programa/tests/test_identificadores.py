@@ -0,0 +1,89 @@
+"""
+PRUEBAS DE GestorIDs
+Unicidad entre hilos y entre procesos, y continuidad tras reiniciar con la marca guardada
+"""
+
+import json
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+
+PROGRAMA = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROGRAMA)
+
+from identificadores import GestorIDs
+
+
+@pytest.fixture
+def persistencia(tmp_path):
+    ruta = str(tmp_path / "ids.json")
+    GestorIDs.configurar_persistencia(ruta)
+    yield ruta
+    GestorIDs.configurar_persistencia(None)
+
+
+def generar_en_proceso(ruta: str, cantidad: int) -> subprocess.Popen:
+    codigo = ("import sys; from identificadores import GestorIDs; "
+              "GestorIDs.configurar_persistencia(sys.argv[1]); "
+              "print(' '.join(GestorIDs.generar_id('paciente') for _ in range(int(sys.argv[2]))))")
+    return subprocess.Popen([sys.executable, "-c", codigo, ruta, str(cantidad)],
+                            cwd=PROGRAMA, stdout=subprocess.PIPE, text=True)
+
+
+def numero(id: str) -> int:
+    return int(id[1:])
+
+
+def test_hilos_no_repiten_ids(persistencia):
+    generados = [[] for _ in range(8)]
+
+    def trabajar(propios):
+        for vuelta in range(500):
+            if vuelta % 50 == 0:
+                propios.extend(GestorIDs.reservar_bloque("paciente", 7))
+            else:
+                propios.append(GestorIDs.generar_id("paciente"))
+
+    hilos = [threading.Thread(target=trabajar, args=(propios,)) for propios in generados]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    todos = [id for propios in generados for id in propios]
+    assert len(todos) == 8 * (490 + 10 * 7)
+    assert len(set(todos)) == len(todos)
+    with open(persistencia) as archivo:
+        assert max(map(numero, todos)) <= json.load(archivo)["paciente"]
+
+
+def test_procesos_no_repiten_ids_y_reinicio_continua_tras_la_marca(tmp_path):
+    ruta = str(tmp_path / "ids.json")
+    procesos = [generar_en_proceso(ruta, 2500) for _ in range(3)]
+    todos = [id for proceso in procesos for id in proceso.communicate()[0].split()]
+    assert all(proceso.returncode == 0 for proceso in procesos)
+    assert len(todos) == 3 * 2500
+    assert len(set(todos)) == len(todos)
+
+    with open(ruta) as archivo:
+        marca = json.load(archivo)["paciente"]
+    assert marca >= max(map(numero, todos))
+
+    reinicio = generar_en_proceso(ruta, 1)
+    siguiente = reinicio.communicate()[0].split()
+    assert [numero(id) for id in siguiente] == [marca + 1]
+
+
+def test_bloque_reparte_ids_consecutivos_de_ancho_fijo(persistencia):
+    bloque = GestorIDs.reservar_bloque("cita", 3)
+    ids = list(bloque)
+
+    assert len(ids) == 3 and bloque.restantes == 0
+    assert [numero(id) for id in ids] == list(range(numero(ids[0]), numero(ids[0]) + 3))
+    assert len({len(id) for id in ids}) == 1 and sorted(ids) == ids
+    with pytest.raises(ValueError):
+        bloque.siguiente()
+    assert numero(GestorIDs.generar_id("cita")) > numero(ids[-1])
@@ -0,0 +1,138 @@
+"""
+PRUEBAS DE LA IMPORTACIÓN MASIVA
+Filas aceptadas, rechazos y archivo de errores con el número de línea
+"""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from identificadores import GestorIDs
+from importacion import ImportadorMasivo
+from sistema import SistemaCitasMedicas
+from validacion import ValidadorRegistros
+
+
+def escribir(ruta, lineas):
+    ruta.write_text("\n".join(lineas) + "\n", encoding="utf-8")
+    return str(ruta)
+
+
+def leer_errores(ruta) -> list:
+    with open(ruta, encoding="utf-8") as archivo:
+        return [json.loads(linea) for linea in archivo]
+
+
+def test_csv_rechaza_filas_invalidas_y_las_anota(tmp_path):
+    sistema = SistemaCitasMedicas()
+    ruta = escribir(tmp_path / "pacientes.csv", [
+        "id,nombre,telefono,edad,email",
+        "PI1,Ana López,555-0000001,30,ana@example.com",
+        "PI2,Luis Pérez,555-0000002,-4,",
+        "PI3,,555-0000003,40,",
+        "PI1,Eva Ruiz,555-0000004,25,",
+        ",Marta Gómez,555-0000005,50,marta@example.com",
+        "PI6,Juan Díaz,555-0000006,61,no-es-email",
+    ])
+    errores = str(tmp_path / "errores.jsonl")
+
+    resumen = ImportadorMasivo(sistema, tamano_lote=2).importar(ruta, "pacientes", errores)
+
+    assert (resumen.leidas, resumen.aceptadas, resumen.rechazadas) == (6, 2, 4)
+    assert sistema.buscar_paciente_por_id("PI1").nombre == "Ana López"
+    assert "Marta Gómez" in [paciente.nombre for paciente in sistema.pacientes]
+    rechazos = leer_errores(errores)
+    assert [rechazo["linea"] for rechazo in rechazos] == [3, 4, 5, 7]
+    assert rechazos[0]["fila"]["id"] == "PI2"
+    assert all(rechazo["error"] for rechazo in rechazos)
+
+
+def test_jsonl_anota_lineas_que_no_son_json_y_citas_sin_paciente(tmp_path):
+    sistema = SistemaCitasMedicas()
+    importador = ImportadorMasivo(sistema)
+    importador.importar(escribir(tmp_path / "pacientes.jsonl", [
+        json.dumps({"id": "PI1", "nombre": "Ana López", "telefono": "555-0000001", "edad": 30}),
+    ]), "pacientes")
+    importador.importar(escribir(tmp_path / "doctores.jsonl", [
+        json.dumps({"id": "DI1", "nombre": "Luis Pérez", "telefono": "555-0000002",
+                    "especialidad": "Neurología"}),
+    ]), "doctores")
+    ruta = escribir(tmp_path / "citas.jsonl", [
+        json.dumps({"id": "CI1", "paciente_id": "PI1", "doctor_id": "DI1",
+                    "fecha": "19/10/2026", "hora": "09:00", "motivo": "Control"}),
+        '{"id": "CI2", "paciente_id":',
+        "",
+        json.dumps({"id": "CI3", "paciente_id": "PX9", "doctor_id": "DI1",
+                    "fecha": "19/10/2026", "hora": "10:00", "motivo": "Control"}),
+        json.dumps({"id": "CI4", "paciente_id": "PI1", "doctor_id": "DI1",
+                    "fecha": "19/10/2026", "hora": "09:00", "motivo": "Control"}),
+    ])
+    errores = str(tmp_path / "errores.jsonl")
+
+    resumen = importador.importar(ruta, "citas", errores)
+
+    assert (resumen.leidas, resumen.aceptadas, resumen.rechazadas) == (4, 1, 3)
+    assert sistema.buscar_cita_por_id("CI1").paciente.id == "PI1"
+    assert sistema.buscar_cita_por_id("CI4") is None
+    rechazos = leer_errores(errores)
+    assert [rechazo["linea"] for rechazo in rechazos] == [2, 4, 5]
+    assert rechazos[0]["fila"] == '{"id": "CI2", "paciente_id":'
+
+
+def test_lineas_json_que_no_son_objetos_van_al_archivo_de_errores(tmp_path):
+    sistema = SistemaCitasMedicas()
+    ruta = escribir(tmp_path / "pacientes.jsonl", [
+        "[1, 2]",
+        json.dumps({"id": "PI1", "nombre": "Ana López", "telefono": "555-0000001", "edad": 30}),
+        '"texto"',
+        "3",
+        "null",
+    ])
+    errores = str(tmp_path / "errores.jsonl")
+
+    resumen = ImportadorMasivo(sistema).importar(ruta, "pacientes", errores)
+
+    assert (resumen.leidas, resumen.aceptadas, resumen.rechazadas) == (5, 1, 4)
+    assert sistema.buscar_paciente_por_id("PI1") is not None
+    rechazos = leer_errores(errores)
+    assert [(rechazo["linea"], rechazo["fila"]) for rechazo in rechazos] == [
+        (1, "[1, 2]"), (3, '"texto"'), (4, "3"), (5, "null")]
+    assert {rechazo["error"] for rechazo in rechazos} == {"Se esperaba un objeto JSON"}
+
+
+def test_ids_explicitos_no_se_repiten_al_generar(tmp_path):
+    sistema = SistemaCitasMedicas()
+    siguiente = GestorIDs.numero_de("paciente", GestorIDs.generar_id("paciente")) + 1
+    explicito = GestorIDs.formatear("P", siguiente + 1)
+    ruta = escribir(tmp_path / "pacientes.csv", [
+        "id,nombre,telefono,edad",
+        ",Ana López,555-0000001,30",
+        f"{explicito},Luis Pérez,555-0000002,40",
+        ",Eva Ruiz,555-0000003,25",
+        ",Marta Gómez,555-0000004,50",
+    ])
+
+    resumen = ImportadorMasivo(sistema).importar(ruta, "pacientes")
+
+    assert resumen.aceptadas == 4
+    generados = [p.id for p in sistema.pacientes if p.id != explicito]
+    assert all(GestorIDs.numero_de("paciente", id) > siguiente + 1 for id in generados)
+    assert GestorIDs.numero_de("paciente", GestorIDs.generar_id("paciente")) > siguiente + 1
+
+
+def test_validador_por_columnas_tolera_filas_malformadas():
+    filas = [{"nombre": "Ana López", "telefono": " 555-000-0001 ", "edad": "30"},
+             [1, 2],
+             {"__error__": "JSON no válido", "__texto__": "{"},
+             {"nombre": "Luis Pérez", "telefono": "12", "edad": "x", "email": "no-es-email"},
+             "texto"]
+
+    errores = ValidadorRegistros().validar("pacientes", filas)
+
+    assert errores[0] == [] and filas[0]["telefono"] == "5550000001"
+    assert errores[1] == errores[4] == ["Se esperaba un objeto"]
+    assert errores[2] == []
+    assert errores[3] == ["Teléfono no válido: 12", "Email no válido: no-es-email",
+                          "La edad debe ser un número válido"]
@@ -0,0 +1,65 @@
+"""
+PRUEBAS DEL ÍNDICE TEMPORAL
+Consultas por rango y agendas del día sobre las cubetas por día
+"""
+
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from entidades import Cita, Doctor, Paciente
+from fechas import IndiceTemporal, MINUTOS_POR_DIA
+from sistema import SistemaCitasMedicas
+
+
+def test_rango_coincide_con_un_recorrido_ordenado():
+    generador = random.Random(12)
+    elementos = [(generador.randrange(20 * MINUTOS_POR_DIA), numero) for numero in range(500)]
+    indice = IndiceTemporal()
+    for inicio, numero in elementos:
+        indice.agregar(inicio, numero)
+    for inicio, numero in elementos[::5]:
+        assert indice.quitar(inicio, numero)
+    assert not indice.quitar(*elementos[0])
+    # Con inicios iguales se conserva el orden de inserción
+    ordenados = sorted((elemento for posicion, elemento in enumerate(elementos) if posicion % 5),
+                       key=lambda elemento: elemento[0])
+
+    assert len(indice) == len(ordenados)
+    assert list(indice) == [numero for _, numero in ordenados]
+    for _ in range(50):
+        desde = generador.randrange(-MINUTOS_POR_DIA, 21 * MINUTOS_POR_DIA)
+        hasta = desde + generador.randrange(3 * MINUTOS_POR_DIA)
+        assert list(indice.entre(desde, hasta)) == [
+            numero for inicio, numero in ordenados if desde <= inicio < hasta]
+    assert indice.del_dia(3) == [
+        numero for inicio, numero in ordenados if inicio // MINUTOS_POR_DIA == 3]
+
+
+def test_agendas_del_sistema_en_orden_y_sin_canceladas():
+    sistema = SistemaCitasMedicas()
+    paciente = Paciente("PT1", "Ana López", "555-0000001", 30)
+    otro = Paciente("PT2", "Eva Ruiz", "555-0000003", 40)
+    primero = Doctor("DT1", "Luis Pérez", "555-0000002", "Neurología")
+    segundo = Doctor("DT2", "Juan Díaz", "555-0000004", "Dermatología")
+    for entidad in (paciente, otro):
+        sistema.agregar_paciente(entidad)
+    for entidad in (primero, segundo):
+        sistema.agregar_doctor(entidad)
+    for id, quien, doctor, fecha, hora in [("CT1", paciente, primero, "20/10/2026", "11:00"),
+                                           ("CT2", otro, segundo, "19/10/2026", "15:00"),
+                                           ("CT3", paciente, primero, "19/10/2026", "09:00"),
+                                           ("CT4", otro, primero, "19/10/2026", "12:00"),
+                                           ("CT5", paciente, segundo, "21/10/2026", "09:00")]:
+        sistema.agregar_cita(Cita(id, quien, doctor, fecha, hora, "Control"))
+    sistema.cancelar_cita("CT4")
+
+    assert [cita.id for cita in sistema.citas_entre("19/10/2026", "20/10/2026")] == [
+        "CT3", "CT4", "CT2", "CT1"]
+    assert [cita.id for cita in sistema.citas_entre("19/10/2026", "21/10/2026", "Programada")] == [
+        "CT3", "CT2", "CT1", "CT5"]
+    assert [cita.id for cita in sistema.agenda_del_dia("19/10/2026")] == ["CT3", "CT2"]
+    assert [cita.id for cita in sistema.agenda_doctor("DT1", "19/10/2026")] == ["CT3"]
+    assert sistema.agenda_del_dia("22/10/2026") == []
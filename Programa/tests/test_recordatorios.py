@@ -0,0 +1,86 @@
+"""
+PRUEBAS DEL PROGRAMADOR DE RECORDATORIOS
+Avisos en orden con un reloj simulado, sin hilo de fondo
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from entidades import Cita, Doctor, Paciente
+from fechas import convertir_a_minutos
+from recordatorios import ProgramadorRecordatorios
+from sistema import SistemaCitasMedicas
+
+
+class Reloj:
+    def __init__(self, fecha: str, hora: str):
+        self.ahora = convertir_a_minutos(fecha, hora)
+
+    def __call__(self) -> float:
+        return self.ahora
+
+
+def preparar():
+    sistema = SistemaCitasMedicas()
+    paciente = Paciente("PA1", "Ana López", "555-0000001", 30)
+    doctor = Doctor("DA1", "Luis Pérez", "555-0000002", "Neurología")
+    sistema.agregar_paciente(paciente)
+    sistema.agregar_doctor(doctor)
+    reloj = Reloj("18/10/2026", "08:00")
+    enviados = []
+    programador = ProgramadorRecordatorios(sistema, enviados.append, antes=(24 * 60, 60),
+                                           reloj=reloj)
+    return sistema, paciente, doctor, reloj, enviados, programador
+
+
+def avisos(enviados) -> list:
+    return [(recordatorio.cita_id, recordatorio.antes) for recordatorio in enviados]
+
+
+def test_avisos_en_orden_y_solo_una_vez():
+    sistema, paciente, doctor, reloj, enviados, programador = preparar()
+    sistema.agregar_cita(Cita("CA1", paciente, doctor, "19/10/2026", "10:00", "Control"))
+    programador.iniciar(en_segundo_plano=False)
+    sistema.agregar_cita(Cita("CA2", paciente, doctor, "19/10/2026", "09:00", "Control"))
+    assert len(programador) == 4
+    assert programador.proximo() == ("18/10/2026", "09:00", "CA2")
+
+    assert programador.despachar_vencidos() == []
+    assert avisos(programador.despachar_vencidos(convertir_a_minutos("18/10/2026", "10:00"))) == [
+        ("CA2", 1440), ("CA1", 1440)]
+    assert programador.despachar_vencidos(convertir_a_minutos("18/10/2026", "10:00")) == []
+    assert avisos(programador.despachar_vencidos(convertir_a_minutos("19/10/2026", "09:30"))) == [
+        ("CA2", 60), ("CA1", 60)]
+
+    assert avisos(enviados) == [("CA2", 1440), ("CA1", 1440), ("CA2", 60), ("CA1", 60)]
+    assert programador.enviados == 4 and len(programador) == 0
+    assert enviados[0].fecha == "19/10/2026" and enviados[0].hora == "09:00"
+    programador.detener()
+
+
+def test_cancelar_quita_los_avisos_pendientes():
+    sistema, paciente, doctor, reloj, enviados, programador = preparar()
+    programador.iniciar(en_segundo_plano=False)
+    sistema.agregar_cita(Cita("CA1", paciente, doctor, "19/10/2026", "10:00", "Control"))
+    sistema.agregar_cita(Cita("CA2", paciente, doctor, "20/10/2026", "10:00", "Control"))
+
+    sistema.cancelar_cita("CA1")
+
+    assert len(programador) == 2
+    programador.despachar_vencidos(convertir_a_minutos("21/10/2026", "00:00"))
+    assert avisos(enviados) == [("CA2", 1440), ("CA2", 60)]
+    programador.detener()
+
+
+def test_cita_cercana_recibe_solo_el_aviso_mas_proximo():
+    sistema, paciente, doctor, reloj, enviados, programador = preparar()
+    programador.iniciar(en_segundo_plano=False)
+    reloj.ahora = convertir_a_minutos("19/10/2026", "08:30")
+
+    sistema.agregar_cita(Cita("CA1", paciente, doctor, "19/10/2026", "09:00", "Control"))
+
+    assert avisos(programador.despachar_vencidos()) == [("CA1", 60)]
+    assert len(programador) == 0
+    programador.detener()
@@ -0,0 +1,79 @@
+"""
+PRUEBAS DE LOS REPORTES PARALELOS
+El reporte repartido entre varios procesos es idéntico al generado en uno solo
+"""
+
+import csv
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from entidades import Cita, Doctor, Paciente
+from reportes import GeneradorReportes
+from sistema import SistemaCitasMedicas
+
+
+@pytest.fixture
+def sistema() -> SistemaCitasMedicas:
+    generador = random.Random(19)
+    sistema = SistemaCitasMedicas()
+    pacientes = [Paciente(f"PR{n:02d}", f"Paciente {n}", f"555-00001{n:02d}", 20 + n)
+                 for n in range(30)]
+    doctores = [Doctor(f"DR{n}", f"Doctor {n}", f"555-00002{n:02d}",
+                       ("Neurología", "Dermatología", "Pediatría")[n % 3]) for n in range(6)]
+    for paciente in pacientes:
+        sistema.agregar_paciente(paciente)
+    for doctor in doctores:
+        sistema.agregar_doctor(doctor)
+    numero = 0
+    for dia in range(19, 31):
+        for doctor in doctores:
+            for hora in generador.sample(["09:00", "10:00", "11:00", "12:00", "15:00"], 3):
+                paciente = generador.choice(pacientes)
+                try:
+                    sistema.agregar_cita(Cita(f"CR{numero:03d}", paciente, doctor,
+                                              f"{dia}/10/2026", hora, "Control"))
+                except ValueError:
+                    continue  # el paciente ya tiene otra cita a esa hora
+                numero += 1
+    for cita_id in generador.sample([f"CR{n:03d}" for n in range(numero)], 20):
+        sistema.cancelar_cita(cita_id)
+    return sistema
+
+
+@pytest.fixture
+def repartir(monkeypatch):
+    # Particiones diminutas y sin umbral para que un conjunto chico use el pool
+    monkeypatch.setattr(GeneradorReportes, "UMBRAL_PARALELO", 0)
+    monkeypatch.setattr(GeneradorReportes, "MIN_CITAS_PARTICION", 7)
+
+
+@pytest.mark.parametrize("armar", [
+    lambda generador: generador.citas_por_doctor(),
+    lambda generador: generador.citas_por_paciente(),
+    lambda generador: generador.resumen_periodo("21/10/2026", "28/10/2026"),
+], ids=["doctores", "pacientes", "periodo"])
+def test_paralelo_igual_a_secuencial(sistema, repartir, armar):
+    secuencial = armar(GeneradorReportes(sistema, procesos=1))
+    paralelo = armar(GeneradorReportes(sistema, procesos=3))
+
+    assert secuencial.filas
+    assert paralelo == secuencial
+
+
+def test_totales_y_archivo_csv(sistema, repartir, tmp_path):
+    reporte = GeneradorReportes(sistema, procesos=2).citas_por_doctor()
+    ruta = str(tmp_path / "doctores.csv")
+    reporte.guardar(ruta)
+
+    citas = list(sistema.citas)
+    assert reporte.totales["citas"] == len(citas)
+    assert reporte.totales["Cancelada"] == 20
+    with open(ruta, encoding="utf-8", newline="") as archivo:
+        filas = list(csv.reader(archivo))
+    assert tuple(filas[0]) == reporte.columnas
+    assert len(filas) - 1 == len(reporte.filas) == len(citas)
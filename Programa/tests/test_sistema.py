@@ -0,0 +1,170 @@
+"""
+PRUEBAS DE SistemaCitasMedicas
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from entidades import Cita, Doctor, Paciente
+from fechas import convertir_a_minutos
+from persistencia_instantanea import RepositorioInstantanea
+from persistencia_sqlite import RepositorioSQLite
+from sistema import SistemaCitasMedicas
+
+
+def sistema_basico():
+    sistema = SistemaCitasMedicas()
+    paciente = Paciente("P1", "Ana López", "555-0000001", 30)
+    doctor = Doctor("D1", "Luis Pérez", "555-0000002", "Cardiología")
+    sistema.agregar_paciente(paciente)
+    sistema.agregar_doctor(doctor)
+    return sistema, paciente, doctor
+
+
+def test_cita_con_id_repetido_no_deja_reservas():
+    sistema, paciente, doctor = sistema_basico()
+    original = Cita("C1", paciente, doctor, "19/10/2026", "09:00", "Control")
+    assert sistema.agregar_cita(original)
+
+    repetida = Cita("C1", paciente, doctor, "19/10/2026", "10:00", "Control")
+    assert not sistema.agregar_cita(repetida)
+
+    assert doctor.esta_disponible(convertir_a_minutos("19/10/2026", "10:00"))
+    assert paciente.obtener_citas_activas() == [original]
+    assert doctor.obtener_citas_activas() == [original]
+    assert repetida not in paciente.citas and repetida not in doctor.citas
+
+
+def test_cargar_lote_descarta_ids_repetidos_sin_reservas():
+    sistema, paciente, doctor = sistema_basico()
+    original = Cita("C1", paciente, doctor, "19/10/2026", "09:00", "Control")
+    repetida = Cita("C1", paciente, doctor, "19/10/2026", "10:00", "Control")
+    assert sistema.cargar_lote(citas=[original, repetida]) == 1
+    assert doctor.esta_disponible(convertir_a_minutos("19/10/2026", "10:00"))
+    assert paciente.obtener_citas_activas() == [original]
+
+
+def test_instantanea_rechaza_escrituras_sin_cambiar_el_estado(tmp_path):
+    sistema, paciente, doctor = sistema_basico()
+    sistema.agregar_cita(Cita("C0", paciente, doctor, "19/10/2026", "09:00", "Control"))
+    ruta = str(tmp_path / "estado.snap")
+    sistema.exportar_instantanea(ruta)
+
+    lectura = SistemaCitasMedicas(RepositorioInstantanea(ruta))
+    try:
+        with pytest.raises(ValueError):
+            lectura.agregar_paciente(Paciente("PX", "Eva Ruiz", "555-0000003", 20))
+        assert lectura.buscar_paciente_por_id("PX") is None
+        with pytest.raises(ValueError):
+            lectura.cancelar_cita("C0")
+        assert lectura.buscar_cita_por_id("C0").estado == "Programada"
+
+        doctor_leido = lectura.buscar_doctor_por_id("D1")
+        with pytest.raises(ValueError):
+            lectura.agregar_cita(Cita("C9", lectura.buscar_paciente_por_id("P1"), doctor_leido,
+                                      "19/10/2026", "10:00", "Control"))
+        assert doctor_leido.esta_disponible(convertir_a_minutos("19/10/2026", "10:00"))
+        assert lectura.buscar_cita_por_id("C9") is None
+    finally:
+        lectura.cerrar()
+
+
+def test_lote_abierto_con_carga_diferida_no_pierde_entidades(tmp_path):
+    sistema = SistemaCitasMedicas(RepositorioSQLite(str(tmp_path / "citas.db")))
+    try:
+        sistema.agregar_paciente(Paciente("P1", "Ana López", "555-0000001", 30))
+        sistema.iniciar_lote()
+        sistema.agregar_paciente(Paciente("P2", "Marta Gómez", "555-0000002", 40))
+        assert [p.id for p in sistema.pacientes] == ["P1", "P2"]
+        sistema.confirmar_lote()
+
+        assert [p.id for p in sistema.pacientes] == ["P1", "P2"]
+        assert len(sistema.pacientes) == 2
+        assert [p.id for p in sistema.buscar_pacientes("Marta")] == ["P2"]
+    finally:
+        sistema.cerrar()
+
+
+def test_cerrar_un_repositorio_sqlite_no_corta_a_otro_de_la_misma_base(tmp_path):
+    ruta = str(tmp_path / "citas.db")
+    primero = RepositorioSQLite(ruta)
+    segundo = RepositorioSQLite(ruta)
+    primero.cerrar()
+    primero.cerrar()  # cerrar dos veces no libera la conexión del otro
+
+    segundo.guardar_paciente(Paciente("P1", "Ana López", "555-0000001", 30))
+    assert [fila[0] for fila in segundo.filas("paciente")] == ["P1"]
+    segundo.cerrar()
+
+    tercero = RepositorioSQLite(ruta)
+    try:
+        assert [fila[0] for fila in tercero.filas("paciente")] == ["P1"]
+    finally:
+        tercero.cerrar()
+
+
+def test_datos_de_ejemplo_solo_en_un_almacenamiento_vacio_y_escribible(tmp_path):
+    assert SistemaCitasMedicas(datos_ejemplo=True).datos_ejemplo_cargados
+    ruta = str(tmp_path / "vacia.snap")
+    SistemaCitasMedicas().exportar_instantanea(ruta)
+    lectura = SistemaCitasMedicas(RepositorioInstantanea(ruta), datos_ejemplo=True)
+    try:
+        assert not lectura.datos_ejemplo_cargados
+        assert len(lectura.pacientes) == 0
+        assert lectura.repositorio.ubicacion == ruta
+    finally:
+        lectura.cerrar()
+    sistema = SistemaCitasMedicas(RepositorioSQLite(str(tmp_path / "citas.db")))
+    sistema.agregar_paciente(Paciente("P1", "Ana López", "555-0000001", 30))
+    sistema.cerrar()
+    con_datos = SistemaCitasMedicas(RepositorioSQLite(str(tmp_path / "citas.db")), datos_ejemplo=True)
+    try:
+        assert not con_datos.datos_ejemplo_cargados
+    finally:
+        con_datos.cerrar()
+
+
+def test_arranque_sin_sqlite_ni_mmap():
+    codigo = ("import sys, main, interfaz; main.SistemaCitasMedicas(datos_ejemplo=True); "
+              "print(sorted({'sqlite3', 'mmap'} & set(sys.modules)))")
+    salida = subprocess.run([sys.executable, "-c", codigo], capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    assert salida.stdout.strip() == "[]"
+
+
+def test_paginar_doctores_por_especialidad_sin_acentos():
+    sistema, _, doctor = sistema_basico()
+    sistema.agregar_doctor(Doctor("D2", "Rosa Díaz", "555-0000004", "Pediatría"))
+    assert sistema.paginar_doctores(especialidad="CARDIOLOGIA").elementos == [doctor]
+
+
+def test_carga_de_doctores_cuenta_solo_citas_programadas():
+    sistema, paciente, doctor = sistema_basico()
+    otro = Doctor("D2", "Rosa Díaz", "555-0000004", "Cardiología")
+    sistema.agregar_doctor(otro)
+    for numero, hora in enumerate(("09:00", "10:00", "11:00"), 1):
+        sistema.agregar_cita(Cita(f"C{numero}", paciente, doctor, "19/10/2026", hora, "Control"))
+    sistema.agregar_cita(Cita("C4", paciente, otro, "20/10/2026", "09:00", "Control"))
+    sistema.agregar_cita(Cita("C5", paciente, doctor, "02/11/2026", "09:00", "Control"))
+    sistema.buscar_cita_por_id("C1").estado = "Completada"
+    sistema.cancelar_cita("C2")
+
+    cargas = sistema.carga_doctores("Cardiología", "19/10/2026", "25/10/2026")
+
+    assert [(d.id, carga) for d, carga in cargas] == [("D1", 1), ("D2", 1)]
+
+
+def test_buscar_por_telefono_en_forma_canonica():
+    sistema = SistemaCitasMedicas()
+    local = Paciente("P1", "Ana López", "(01) 555-0001", 30)
+    internacional = Paciente("P2", "Luis Pérez", "+34 600 000 001", 40)
+    sistema.agregar_paciente(local)
+    sistema.agregar_paciente(internacional)
+    assert sistema.buscar_pacientes("01 555 0001") == [local]
+    assert sistema.buscar_pacientes("+34-600-000-001") == [internacional]
+    assert sistema.buscar_pacientes("34600000001") == []
@@ -0,0 +1,111 @@
+"""
+VALIDACIÓN
+Canonización y validación de emails y teléfonos, individual y por lotes
+"""
+
+from functools import lru_cache
+from typing import List, Optional, Callable
+import re
+
+
+PATRON_EMAIL = re.compile(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}")
+PATRON_TELEFONO = re.compile(r"\+?[0-9 ().-]+")
+NO_DIGITOS = re.compile(r"[^0-9]")
+DIGITOS_TELEFONO = (7, 15)  # mínimo y máximo (E.164)
+
+
+@lru_cache(maxsize=1 << 16)
+def canonizar_email(email: str) -> Optional[str]:
+    """Retorna el email sin espacios y con el dominio en minúsculas, o None si no es válido"""
+    email = email.strip()
+    if not PATRON_EMAIL.fullmatch(email):
+        return None
+    usuario, _, dominio = email.rpartition("@")
+    return f"{usuario}@{dominio.lower()}"
+
+
+@lru_cache(maxsize=1 << 16)
+def canonizar_telefono(telefono: str) -> Optional[str]:
+    """Retorna el teléfono como '+' opcional seguido solo de dígitos, o None si no es válido"""
+    telefono = telefono.strip()
+    if not PATRON_TELEFONO.fullmatch(telefono):
+        return None
+    digitos = NO_DIGITOS.sub("", telefono)
+    if not DIGITOS_TELEFONO[0] <= len(digitos) <= DIGITOS_TELEFONO[1]:
+        return None
+    return "+" + digitos if telefono.startswith("+") else digitos
+
+
+def validar_email(email: str) -> str:
+    canonico = canonizar_email(email)
+    if canonico is None:
+        raise ValueError("Email no válido")
+    return canonico
+
+
+def validar_telefono(telefono: str) -> str:
+    canonico = canonizar_telefono(telefono)
+    if canonico is None:
+        raise ValueError(f"Teléfono no válido (use entre {DIGITOS_TELEFONO[0]} y "
+                         f"{DIGITOS_TELEFONO[1]} dígitos)")
+    return canonico
+
+
+class ValidadorRegistros:
+    """Valida en bloque filas de pacientes o doctores antes de crearlos
+    
+    Trabaja por columnas: cada valor distinto de teléfono o email se valida
+    una sola vez por bloque (y los repetidos entre bloques salen de la caché
+    de canonizar_*). A diferencia de construir las entidades una por una,
+    reporta todos los errores de cada fila y no solo el primero. Las filas
+    válidas quedan con teléfono y email en su forma canónica.
+    """
+    
+    OBLIGATORIOS = {
+        "pacientes": ("nombre", "telefono", "edad"),
+        "doctores": ("nombre", "telefono", "especialidad"),
+    }
+    
+    @staticmethod
+    def _columna(filas: List[dict], campo: str, canonizar: Callable[[str], Optional[str]]) -> list:
+        valores = [str(fila.get(campo) or "").strip() for fila in filas]
+        canonicos = {valor: canonizar(valor) for valor in set(valores) if valor}
+        return [(valor, canonicos.get(valor)) for valor in valores]
+    
+    def validar(self, tipo: str, filas: List[dict]) -> List[List[str]]:
+        """Retorna por cada fila la lista de errores (vacía si la fila es válida)
+        
+        Las filas que no son diccionarios solo reciben su error, y las que ya
+        traen uno de la lectura ("__error__") se dejan como están; las columnas
+        se validan con el resto.
+        """
+        errores: List[List[str]] = [[] if isinstance(fila, dict) else ["Se esperaba un objeto"]
+                                    for fila in filas]
+        validas = [(fila, propios) for fila, propios in zip(filas, errores)
+                   if isinstance(fila, dict) and "__error__" not in fila]
+        filas = [fila for fila, _ in validas]
+        errores_validas = [propios for _, propios in validas]
+        for campo in self.OBLIGATORIOS.get(tipo, ()):
+            for fila, propios in zip(filas, errores_validas):
+                if not str(fila.get(campo) or "").strip():
+                    propios.append(f"El campo '{campo}' es obligatorio")
+        
+        for fila, propios, (valor, canonico) in zip(
+                filas, errores_validas, self._columna(filas, "telefono", canonizar_telefono)):
+            if valor and canonico is None:
+                propios.append(f"Teléfono no válido: {valor}")
+            elif canonico:
+                fila["telefono"] = canonico
+        for fila, propios, (valor, canonico) in zip(
+                filas, errores_validas, self._columna(filas, "email", canonizar_email)):
+            if valor and canonico is None:
+                propios.append(f"Email no válido: {valor}")
+            elif canonico:
+                fila["email"] = canonico
+        
+        if tipo == "pacientes":
+            for fila, propios in zip(filas, errores_validas):
+                edad = str(fila.get("edad") or "").strip()
+                if edad and not (edad.isdigit() and edad.isascii()):
+                    propios.append("La edad debe ser un número válido")
+        return errores